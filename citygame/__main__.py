@@ -1,18 +1,25 @@
 import logging
+import sys
 
 import pygame
 
 from citygame.src.controllers.controller import Controller
 from citygame.src.frameprocessors.performance_overlay import PerformanceOverlay
 from citygame.src.constants.game_constants import GAME_NAME, GAME_FPS, GAME_WIDTH_PX, GAME_HEIGHT_PX
+from citygame.src.constants.world_constants import DEFAULT_MAP_SIZE
 from citygame.src.controllers.scene_controller import SceneController
 from citygame.src.state.game_state import GameState
+from citygame.src.util import map_export
 
 logging.basicConfig(level=logging.INFO)
 
 
 def main():
-    game_state = GameState()
+    # A world seed can be passed to re-create a known world, followed by an optional map size, for example:
+    # python -m citygame 12345 4096
+    world_seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    map_size = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_MAP_SIZE
+    game_state = GameState(map_size, world_seed)
     scene_controller = SceneController(game_state)
 
     overlays = [PerformanceOverlay(game_state, scene_controller)]
@@ -22,5 +29,9 @@ def main():
 
 
 if __name__ == "__main__":
-    pygame.init()
-    main()
+    # Worlds can be exported to images without starting the game, for example: python -m citygame export 12345 4096
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        map_export.main(sys.argv[2:])
+    else:
+        pygame.init()
+        main()
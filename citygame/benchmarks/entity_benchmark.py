@@ -0,0 +1,87 @@
+import logging
+import sys
+import time
+import tracemalloc
+
+import numpy
+
+from citygame.src.state.game_state import GameState
+from citygame.src.state.hero_actor import Hero
+from citygame.src.state.location_actor import Locations
+from citygame.src.state.location_table import LocationTable
+
+LOG = logging.getLogger("entity_benchmark")
+
+DEFAULT_HEROES = 1_000_000
+DEFAULT_LOCATIONS = 100_000
+
+
+def _create_locations(number_of_locations: int) -> Locations:
+    location_points = numpy.random.default_rng(number_of_locations).integers(0, 10_000, (number_of_locations, 2))
+    return Locations(LocationTable(location_points), None)
+
+
+def _create_heroes(number_of_heroes: int, locations: Locations) -> list[Hero]:
+    game_state = GameState()
+    location_ids = numpy.random.default_rng(number_of_heroes).integers(0, len(locations), number_of_heroes)
+    return [Hero(locations[location_id], game_state) for location_id in location_ids.tolist()]
+
+
+def _measure_memory(number_of_heroes: int, number_of_locations: int) -> tuple[float, float]:
+    # Every location is used so each one has its view, which is the most memory locations can take
+    tracemalloc.start()
+    locations = _create_locations(number_of_locations)
+    for _ in locations:
+        pass
+    location_bytes = tracemalloc.get_traced_memory()[0]
+    heroes = _create_heroes(number_of_heroes, locations)
+    hero_bytes = tracemalloc.get_traced_memory()[0] - location_bytes
+    tracemalloc.stop()
+
+    del heroes
+    return hero_bytes / number_of_heroes, location_bytes / number_of_locations
+
+
+def _time(name: str, operations: int, function):
+    start = time.perf_counter()
+    function()
+    elapsed_time = time.perf_counter() - start
+    LOG.info(f"  {name:<40} {elapsed_time:>8.3f} s {int(operations / elapsed_time):>12} operations/s")
+
+
+def main():
+    """
+    Reports the memory taken by heroes and locations, and how fast they are created, hashed and grouped.
+
+    The numbers of heroes and locations can be passed as arguments, for example:
+    python -m citygame.benchmarks.entity_benchmark 1000000 100000
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    number_of_heroes = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_HEROES
+    number_of_locations = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LOCATIONS
+
+    hero_bytes, location_bytes = _measure_memory(number_of_heroes, number_of_locations)
+    LOG.info(f"{number_of_heroes} heroes and {number_of_locations} locations")
+    LOG.info(f"  {'memory per hero':<40} {hero_bytes:>8.0f} bytes")
+    LOG.info(f"  {'memory per location':<40} {location_bytes:>8.0f} bytes")
+
+    locations = _create_locations(number_of_locations)
+    heroes = []
+    _time("create heroes", number_of_heroes, lambda: heroes.extend(_create_heroes(number_of_heroes, locations)))
+
+    # Group the heroes by location like GameState.end_turn, with the locations as keys
+    location_to_heroes = {}
+    _time(
+        "group heroes by location",
+        number_of_heroes,
+        lambda: [location_to_heroes.setdefault(hero.current_location, []).append(hero) for hero in heroes],
+    )
+
+    hero_set = set()
+    _time("add heroes to a set", number_of_heroes, lambda: hero_set.update(heroes))
+    _time("find heroes in a set", number_of_heroes, lambda: [hero in hero_set for hero in heroes])
+    _time("map heroes to their levels", number_of_heroes, lambda: {hero: hero.level for hero in heroes})
+
+
+if __name__ == "__main__":
+    main()
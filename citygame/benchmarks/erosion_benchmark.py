@@ -0,0 +1,48 @@
+import logging
+import sys
+import time
+
+import numpy
+
+from citygame.src.constants.noise_mode_enum import NoiseMode
+from citygame.src.util import maps
+from citygame.src.util.erosion import erode
+
+LOG = logging.getLogger("erosion_benchmark")
+
+DEFAULT_SIZES = [256, 512, 1024, 2048]
+
+
+def _generate_heights(size: int) -> numpy.ndarray:
+    # The heights that erosion runs on when a map is generated, from a fixed seed so the results can be compared
+    noise_matrix = maps._generate_raw_noise(size, size, size, NoiseMode.EXACT)
+    noise_matrix = maps._normalize_noise(noise_matrix, numpy.min(noise_matrix), numpy.ptp(noise_matrix))
+    return maps._apply_gradient(noise_matrix, maps._generate_square_gradient(size, size))
+
+
+def main():
+    """
+    Reports how long it takes to erode maps of growing size and how many of their tiles the erosion changes.
+
+    Map sizes can be passed as arguments, for example: python -m citygame.benchmarks.erosion_benchmark 1024 4096
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("maps").setLevel(logging.WARNING)
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    LOG.info(f"{'size':>6} {'erosion (s)':>12} {'droplets/s':>12} {'tiles changed':>14}")
+    for size in sizes:
+        heights = _generate_heights(size)
+        original_tiles = maps._calculate_tiles(heights)
+
+        start = time.perf_counter()
+        erode(heights, seed=size)
+        erosion_time = time.perf_counter() - start
+
+        tiles_changed = numpy.mean(maps._calculate_tiles(heights) != original_tiles)
+        droplets_per_second = int(size * size * 0.2 / erosion_time)
+        LOG.info(f"{size:>6} {erosion_time:>12.2f} {droplets_per_second:>12} {tiles_changed:>13.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import logging
+import multiprocessing
+import resource
+import sys
+
+LOG = logging.getLogger("memory_benchmark")
+
+DEFAULT_SIZES = [1024, 4096]
+
+
+def _get_peak_rss_mb() -> float:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports the peak in bytes and Linux in kilobytes
+    if sys.platform == "darwin":
+        return peak_rss / 1024 / 1024
+    return peak_rss / 1024
+
+
+class _StageMemoryHandler(logging.Handler):
+    """
+    Records the peak RSS every time map generation logs the start of a stage.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.stage_starts: list[tuple[str, float]] = []
+
+    def emit(self, record: logging.LogRecord):
+        self.stage_starts.append((record.getMessage(), _get_peak_rss_mb()))
+
+
+def _measure_stages(size: int, low_memory: bool) -> tuple[float, list[tuple[str, float]]]:
+    # Imported here so the baseline includes the modules but nothing that generation allocates
+    from citygame.src.util.maps import generate_map
+
+    baseline_rss = _get_peak_rss_mb()
+    handler = _StageMemoryHandler()
+    maps_logger = logging.getLogger("maps")
+    maps_logger.setLevel(logging.INFO)
+    maps_logger.addHandler(handler)
+
+    generate_map(size, size, seed=size, low_memory=low_memory)
+
+    # The peak of a stage is the peak when the next stage starts
+    stage_names = [stage_start[0] for stage_start in handler.stage_starts]
+    stage_peaks = [stage_start[1] for stage_start in handler.stage_starts[1:]] + [_get_peak_rss_mb()]
+    return baseline_rss, list(zip(stage_names, stage_peaks))
+
+
+def main():
+    """
+    Reports the peak RSS of every stage of map generation with and without the low-memory mode.
+
+    Each measurement runs in a new process so the peaks do not include earlier measurements. Only works on platforms
+    with the resource module. Map sizes can be passed as arguments, for example:
+    python -m citygame.benchmarks.memory_benchmark 4096
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    context = multiprocessing.get_context("spawn")
+
+    for size in sizes:
+        peak_increases = []
+        for low_memory in (False, True):
+            with context.Pool(1) as pool:
+                baseline_rss, stages = pool.apply(_measure_stages, (size, low_memory))
+
+            LOG.info(f"{size}x{size} {'low-memory' if low_memory else 'default'} (baseline {baseline_rss:.0f} MB)")
+            for stage_name, stage_peak in stages:
+                LOG.info(f"  {stage_name:<45} {stage_peak:>8.0f} MB")
+            peak_increases.append(max(stage_peak for _, stage_peak in stages) - baseline_rss)
+
+        LOG.info(
+            f"{size}x{size} peak above baseline: default {peak_increases[0]:.0f} MB, "
+            f"low-memory {peak_increases[1]:.0f} MB ({peak_increases[0] / peak_increases[1]:.1f}x less)\n"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import logging
+import random
+import sys
+import time
+
+import numpy
+
+from citygame.src.constants.noise_mode_enum import NoiseMode
+from citygame.src.util.maps import _generate_noise
+
+LOG = logging.getLogger("noise_benchmark")
+
+DEFAULT_SIZES = [256, 512, 1024, 2048]
+
+
+def _time_noise(size: int, noise_mode: NoiseMode) -> tuple[float, numpy.ndarray]:
+    # Use the same noise seed for every mode so the results can be compared
+    random.seed(size)
+
+    start = time.perf_counter()
+    noise_matrix = _generate_noise(size, size, noise_mode)
+    return time.perf_counter() - start, noise_matrix
+
+
+def main():
+    """
+    Compares the time it takes to generate map noise in each noise mode as the map size grows.
+
+    Map sizes can be passed as arguments, for example: python -m citygame.benchmarks.noise_benchmark 512 4096
+    """
+    logging.basicConfig(level=logging.INFO)
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    LOG.info(f"{'size':>6} {'exact (s)':>10} {'multi (s)':>10} {'speedup':>8} {'max error':>10} {'mean error':>11}")
+    for size in sizes:
+        exact_time, exact_matrix = _time_noise(size, NoiseMode.EXACT)
+        multi_time, multi_matrix = _time_noise(size, NoiseMode.MULTI_RESOLUTION)
+
+        error = numpy.abs(multi_matrix - exact_matrix)
+        LOG.info(
+            f"{size:>6} {exact_time:>10.2f} {multi_time:>10.2f} {exact_time / multi_time:>7.2f}x "
+            f"{numpy.max(error):>10.4f} {numpy.mean(error):>11.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import logging
+import sys
+import time
+
+import numpy
+from scipy.spatial import cKDTree
+
+from citygame.src.util.locations import place_locations
+from citygame.src.util.maps import MapWindow
+from citygame.src.util.tile_index import TileIndex
+
+LOG = logging.getLogger("placement_benchmark")
+
+DEFAULT_SIZES = [1024, 2048, 4096, 12000]
+
+# Half the size of the window around the center of the map that is indexed to find the starting position
+STARTING_WINDOW_RADIUS = 128
+
+
+def _generate_buildable_mask(size: int) -> numpy.ndarray:
+    # Buildable land crossed by thin rivers of water, so placement has to work around tiles it cannot use
+    buildable_mask = numpy.ones((size, size), dtype=bool)
+    buildable_mask[:, ::97] = False
+    return buildable_mask
+
+
+def main():
+    """
+    Reports how long it takes to place locations on maps of growing size, up to about 100,000 locations.
+
+    Map sizes can be passed as arguments, for example: python -m citygame.benchmarks.placement_benchmark 2048 8192
+    """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logging.getLogger("maps").setLevel(logging.WARNING)
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+
+    LOG.info(f"{'size':>6} {'locations':>10} {'placement (s)':>14} {'locations/s':>12} {'closest':>8}")
+    for size in sizes:
+        buildable_mask = _generate_buildable_mask(size)
+        # Only index the center of the map, since indexing the whole map needs several times the memory of the mask
+        center = size // 2
+        window = MapWindow(
+            max(center - STARTING_WINDOW_RADIUS, 0),
+            min(center + STARTING_WINDOW_RADIUS, size),
+            max(center - STARTING_WINDOW_RADIUS, 0),
+            min(center + STARTING_WINDOW_RADIUS, size),
+        )
+        window_mask = buildable_mask[window.slices]
+        starting_position = TileIndex(window_mask, window_mask, window).get_nearest_buildable_tile(center, center)
+
+        start = time.perf_counter()
+        location_points = numpy.asarray(place_locations(buildable_mask, starting_position, seed=size))
+        placement_time = time.perf_counter() - start
+
+        closest_distances = cKDTree(location_points).query(location_points, k=2)[0][:, 1]
+        LOG.info(
+            f"{size:>6} {len(location_points):>10} {placement_time:>14.2f} "
+            f"{int(len(location_points) / placement_time):>12} {numpy.min(closest_distances):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
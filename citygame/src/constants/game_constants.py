@@ -3,3 +3,4 @@ GAME_HEIGHT_PX = 720
 GAME_FPS = 120
 GAME_NAME = "City Builder"
 SAVE_FOLDER_NAME = "citygame"
+WORLD_CACHE_FOLDER_NAME = "world_cache"
@@ -1 +1,4 @@
 INITIAL_NUMBER_OF_HEROES = 3
+
+# Name of heroes that are not given one by their world
+DEFAULT_HERO_NAME = "Hero"
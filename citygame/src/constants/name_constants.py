@@ -0,0 +1,264 @@
+# Example words that the names of locations are made up from
+LOCATION_NAME_WORDS = (
+    "abbotsford",
+    "alderney",
+    "amberley",
+    "ashbourne",
+    "ashford",
+    "avondale",
+    "bamburgh",
+    "barrowby",
+    "beckford",
+    "belford",
+    "berwick",
+    "blackmoor",
+    "bramwell",
+    "brancaster",
+    "brightwater",
+    "brockley",
+    "bromyard",
+    "burnham",
+    "calder",
+    "camborne",
+    "carlow",
+    "castlerigg",
+    "chalfont",
+    "cheswick",
+    "clareby",
+    "coldstream",
+    "corbridge",
+    "crawley",
+    "cresswell",
+    "dalby",
+    "darnell",
+    "denholm",
+    "dunmore",
+    "dunstan",
+    "durnford",
+    "eastwick",
+    "edgeley",
+    "elmstead",
+    "everdon",
+    "falkirk",
+    "farleigh",
+    "fenwick",
+    "fernhill",
+    "foxley",
+    "frampton",
+    "garrow",
+    "glenmoor",
+    "goldcliff",
+    "grantham",
+    "greystone",
+    "hadleigh",
+    "halsted",
+    "harrowgate",
+    "hartwell",
+    "hawkridge",
+    "helmsley",
+    "highmoor",
+    "holbrook",
+    "ilford",
+    "inverness",
+    "ironbridge",
+    "kelso",
+    "kendal",
+    "kerrow",
+    "kingsbury",
+    "kirkwall",
+    "lambourn",
+    "langdale",
+    "larkhill",
+    "ledbury",
+    "linwood",
+    "lockerby",
+    "longford",
+    "malton",
+    "marlow",
+    "melrose",
+    "merriford",
+    "middleham",
+    "millbrook",
+    "morwick",
+    "netherby",
+    "newhaven",
+    "northam",
+    "oakham",
+    "oldcastle",
+    "orford",
+    "otterburn",
+    "padstow",
+    "pembury",
+    "penrith",
+    "pickering",
+    "quarrendon",
+    "ravenglass",
+    "redmire",
+    "ripley",
+    "rochdale",
+    "rosedale",
+    "rushmere",
+    "saltburn",
+    "sandwick",
+    "selby",
+    "shaldon",
+    "sherborne",
+    "silverdale",
+    "stanmore",
+    "stockbridge",
+    "stonehaven",
+    "sudbury",
+    "swanage",
+    "tamworth",
+    "thornbury",
+    "tilford",
+    "torbay",
+    "trellick",
+    "tynemouth",
+    "ulverston",
+    "upwood",
+    "valemont",
+    "walsham",
+    "warwick",
+    "wedmore",
+    "westerham",
+    "whitby",
+    "wickham",
+    "willowby",
+    "winterton",
+    "woodbridge",
+    "wrexham",
+    "yarmouth",
+    "yelverton",
+)
+
+# Example words that the names of heroes are made up from
+HERO_NAME_WORDS = (
+    "adela",
+    "aldric",
+    "alwin",
+    "amara",
+    "anselm",
+    "ariana",
+    "arlo",
+    "astrid",
+    "bastian",
+    "beatrix",
+    "bertram",
+    "brenna",
+    "brom",
+    "caius",
+    "calla",
+    "cedric",
+    "celeste",
+    "corin",
+    "dagny",
+    "darian",
+    "delia",
+    "doran",
+    "edda",
+    "edmund",
+    "elowen",
+    "elric",
+    "emeric",
+    "esme",
+    "falk",
+    "fenna",
+    "florian",
+    "freya",
+    "garrick",
+    "gilda",
+    "godric",
+    "greta",
+    "gwendolyn",
+    "halvard",
+    "helga",
+    "hilda",
+    "hugo",
+    "idris",
+    "ingrid",
+    "isolde",
+    "ivor",
+    "jorah",
+    "justina",
+    "kaelen",
+    "kara",
+    "konrad",
+    "lark",
+    "leona",
+    "leoric",
+    "liesel",
+    "lorcan",
+    "magnus",
+    "maren",
+    "matilda",
+    "merrick",
+    "mira",
+    "nadia",
+    "nevin",
+    "nora",
+    "odalys",
+    "olaf",
+    "orla",
+    "oswin",
+    "perrin",
+    "petra",
+    "quentin",
+    "quilla",
+    "ragnar",
+    "rhoswen",
+    "roland",
+    "rowena",
+    "seren",
+    "sigrid",
+    "soren",
+    "sybil",
+    "talia",
+    "tamsin",
+    "theodric",
+    "thora",
+    "tobias",
+    "ulric",
+    "una",
+    "valen",
+    "vesna",
+    "viggo",
+    "wendel",
+    "wilhelmina",
+    "wren",
+    "xander",
+    "yara",
+    "yorick",
+    "zelda",
+    "zoran",
+)
+
+# Ways to tell apart locations with the same made-up name, used once the made-up names run out
+LOCATION_NAME_VARIANTS = (
+    "Upper {}",
+    "Lower {}",
+    "Great {}",
+    "Little {}",
+    "Old {}",
+    "New {}",
+    "North {}",
+    "South {}",
+    "East {}",
+    "West {}",
+    "{} Vale",
+    "{} Cross",
+)
+
+# Ways to tell apart heroes with the same made-up name, used once the made-up names run out
+HERO_NAME_VARIANTS = (
+    "{} the Bold",
+    "{} the Brave",
+    "{} the Wise",
+    "{} the Swift",
+    "{} the Young",
+    "{} the Elder",
+    "{} the Tall",
+    "{} the Red",
+    "{} the Grey",
+    "{} the Kind",
+)
@@ -0,0 +1,12 @@
+from enum import Enum, auto
+
+
+class NoiseMode(Enum):
+    """
+    Enum cataloging the ways the map noise can be computed.
+    """
+
+    # Every octave at full resolution. Matches the noise library exactly.
+    EXACT = auto()
+    # Low-frequency octaves on coarse grids that are upsampled. Faster but only approximately equal to EXACT.
+    MULTI_RESOLUTION = auto()
@@ -1,6 +1,34 @@
+import os
+
 DISTANCE_BETWEEN_LOCATIONS = 50
 MINIMUM_DISTANCE_BETWEEN_LOCATIONS = 30
 
 DEFAULT_MAP_SIZE = 300
 
 LOCATION_DOT_RADIUS = 5
+
+# Most processes used to generate the terrain of a new world. Small worlds are generated in the calling process.
+WORLD_GENERATION_PROCESSES = os.cpu_count() or 1
+
+# Worlds at least this large are generated lazily one chunk at a time as they are viewed
+CHUNKED_WORLD_MAP_SIZE = 2048
+# Size of the square chunks of a chunked world
+WORLD_CHUNK_SIZE = 256
+# Number of chunks of a chunked world kept in memory. Chunks that have not been used for the longest are evicted first.
+MAXIMUM_LOADED_WORLD_CHUNKS = 64
+
+# Whether worlds that are not chunked only calculate the regions and borders of locations once they are revealed, so
+# worlds with many locations are ready to play without calculating every region first
+LAZY_REGIONS = False
+
+# Whether locations are neighbors when their regions touch instead of when they are closer than
+# DISTANCE_BETWEEN_LOCATIONS + 1. Only worlds that are neither chunked nor have lazy regions know every region up front,
+# so other worlds cannot be created with it.
+REGION_NEIGHBORS = False
+
+# Whether the terrain of new worlds is eroded by water. Chunked worlds are never eroded, since the water can run across
+# the whole map.
+ERODE_TERRAIN = False
+
+# Whether new worlds have rivers. Chunked worlds never have rivers, since the flow is calculated over the whole map.
+ADD_RIVERS = False
@@ -61,8 +61,7 @@ class GameScene(Scene):
         mouse_y_abs = mouse_pos[1] - 1
 
         # Reset hover state
-        for location in self.game_state.world.locations:
-            location.hover = False
+        self.game_state.world.location_table.hovers[:] = False
         for hero_rect in self.hero_panel.hero_rects:
             hero_rect.hover = False
 
@@ -19,6 +19,10 @@ HERO_TEXT_SPACING = 5
 HERO_TEXT_SIZE = 14
 HERO_TEXT_FONT = BASIC_FONT
 
+REGION_TEXT_SIZE = 16
+# Number of the most common tiles of the hovered region that are listed
+REGION_TERRAIN_TYPES_SHOWN = 3
+
 
 class GeneralInformationPanel(Panel):
     """
@@ -48,6 +52,7 @@ class GeneralInformationPanel(Panel):
             render_font_center_horizontal(
                 surface, f"{hover_location.name} - Level {hover_location.level}", size=24, y=20, color=Color("white")
             )
+            self._render_region_statistics(surface, hover_location.id)
 
         # TODO better handling of too many events
         # Events
@@ -63,3 +68,16 @@ class GeneralInformationPanel(Panel):
             color=Color("white"),
             font=HERO_TEXT_FONT,
         )
+
+    def _render_region_statistics(self, surface: Surface, region: int):
+        # Chunked worlds do not have statistics of their regions, and worlds with lazy regions only of revealed regions
+        region_statistics = self.game_state.world.region_statistics
+        if region_statistics is None or region_statistics.areas[region] == 0:
+            return
+
+        terrain_shares = region_statistics.get_terrain_shares(region)[:REGION_TERRAIN_TYPES_SHOWN]
+        terrain_text = ", ".join(f"{tile.name.replace('_', ' ').title()} {share:.0%}" for tile, share in terrain_shares)
+        render_font_center_horizontal(
+            surface, f"{region_statistics.areas[region]} tiles", size=REGION_TEXT_SIZE, y=50, color=Color("white")
+        )
+        render_font_center_horizontal(surface, terrain_text, size=REGION_TEXT_SIZE, y=70, color=Color("white"))
@@ -1,5 +1,4 @@
 import logging
-from dataclasses import dataclass
 from typing import List, TYPE_CHECKING, Optional
 
 import pygame
@@ -9,8 +8,12 @@ from pygame.event import Event
 from citygame.src.interfaces.panel import Panel
 from citygame.src.state.game_state import GameState
 from citygame.src.state.hero_actor import Hero
-from citygame.src.state.location_actor import Location
-from citygame.src.util.fonts import BASIC_FONT, render_lines_upper_left, render_lines_upper_right, get_rect_for_lines
+from citygame.src.util.fonts import (
+    BASIC_FONT,
+    render_lines_upper_left,
+    render_lines_upper_right,
+    get_height_for_line_count,
+)
 
 if TYPE_CHECKING:
     from citygame.src.controllers.scene_controller import SceneController
@@ -21,6 +24,8 @@ HERO_TEXT_BORDER = 5
 HERO_TEXT_SPACING = 5
 HERO_TEXT_SIZE = 14
 HERO_TEXT_FONT = BASIC_FONT
+# Lines of information on the left side of a hero, which is the taller side
+HERO_TEXT_LINES = 4
 
 
 class HeroPanel(Panel):
@@ -35,13 +40,13 @@ class HeroPanel(Panel):
         self.mouse_y = None
         self.hover_hero_rect: Optional[HeroRect] = None
 
-        self.hero_rect_height = get_rect_for_lines(
+        self.hero_rect_height = get_height_for_line_count(
             border=HERO_TEXT_BORDER,
             spacing=HERO_TEXT_SPACING,
-            lines=self._get_hero_information_left(Hero(Location(0, 0, 0, None), self.game_state)),
+            line_count=HERO_TEXT_LINES,
             size=HERO_TEXT_SIZE,
             font=HERO_TEXT_FONT,
-        ).height
+        )
 
         self.hero_rects: List[HeroRect] = []
         self._set_hero_rects()
@@ -145,8 +150,10 @@ class HeroPanel(Panel):
             self.hero_rects.append(hero_rect)
 
 
-@dataclass
 class HeroRect:
-    rect: pygame.Rect
-    hero: Hero
-    hover: bool = False
+    __slots__ = ("rect", "hero", "hover")
+
+    def __init__(self, rect: pygame.Rect, hero: Hero, hover: bool = False):
+        self.rect = rect
+        self.hero = hero
+        self.hover = hover
@@ -8,11 +8,16 @@ from pygame.event import Event
 from citygame.src.constants.location_state_enum import LocationState
 from citygame.src.interfaces.panel import Panel
 from citygame.src.state.game_state import GameState
+from citygame.src.util.maps import MapWindow
 
 if TYPE_CHECKING:
     from citygame.src.controllers.scene_controller import SceneController
 
 BACKGROUND_COLOR = "black"
+HOVER_BORDER_COLOR = [255, 255, 0]
+
+# Speed at which the arrow keys scroll maps larger than the panel, in tiles per second
+MAP_SCROLL_SPEED = 600
 
 
 class MapPanel(Panel):
@@ -24,19 +29,41 @@ class MapPanel(Panel):
         super().__init__(game_state, scene_controller, panel_width, panel_height)
         self.log = logging.getLogger(self.__class__.__name__)
 
-        self.map_surface = Surface((self.game_state.map_size, self.game_state.map_size))
+        # Maps larger than the panel are shown through a view that can be scrolled
+        map_size = self.game_state.map_size
+        self.map_surface = Surface((min(map_size, panel_width), min(map_size, panel_height)))
         self.map_offset_x = abs(panel_width - self.map_surface.get_width()) // 2
         self.map_offset_y = abs(panel_height - self.map_surface.get_height()) // 2
 
+        # Start with the view centered on the starting location
+        self.view_x = 0.0
+        self.view_y = 0.0
+        if self.game_state.world:
+            starting_location = self.game_state.world.starting_location
+            self._scroll_view(
+                starting_location.x - self.map_surface.get_width() // 2,
+                starting_location.y - self.map_surface.get_height() // 2,
+            )
+
+    def _scroll_view(self, delta_x: float, delta_y: float):
+        self.view_x = min(max(self.view_x + delta_x, 0), self.game_state.map_size - self.map_surface.get_width())
+        self.view_y = min(max(self.view_y + delta_y, 0), self.game_state.map_size - self.map_surface.get_height())
+
+    def _get_view(self) -> MapWindow:
+        view_x = int(self.view_x)
+        view_y = int(self.view_y)
+        return MapWindow(view_x, view_x + self.map_surface.get_width(), view_y, view_y + self.map_surface.get_height())
+
     def process_input(self, events: List[Event], mouse_x: int, mouse_y: int):
-        # Take into account the position within the window when processing mouse position on the map
-        mouse_x = mouse_x - self.map_offset_x
-        mouse_y = mouse_y - self.map_offset_y
+        # Take into account the position within the window and the view when processing mouse position on the map
+        view = self._get_view()
+        mouse_x = mouse_x - self.map_offset_x + view.x_start
+        mouse_y = mouse_y - self.map_offset_y + view.y_start
 
         # See if any locations are the new hover location and deal with mouse actions on that location
         self.game_state.world.hover_location = None
-        if 0 <= mouse_x < self.game_state.map_size and 0 <= mouse_y < self.game_state.map_size:
-            hover_region = self.game_state.world.region_matrix[mouse_x][mouse_y]
+        if view.x_start <= mouse_x < view.x_end and view.y_start <= mouse_y < view.y_end:
+            hover_region = self.game_state.world.get_region(mouse_x, mouse_y)
             if hover_region != -1:
                 hover_location = self.game_state.world.locations[hover_region]
                 if hover_location.location_state != LocationState.HIDDEN:
@@ -63,34 +90,42 @@ class MapPanel(Panel):
             self.game_state.world.hover_location.hover = True
 
     def update(self, time_delta: float):
-        pass
+        # Scroll the view with the arrow keys
+        pressed_keys = pygame.key.get_pressed()
+        scroll_distance = MAP_SCROLL_SPEED * time_delta
+        self._scroll_view(
+            scroll_distance * (pressed_keys[pygame.K_RIGHT] - pressed_keys[pygame.K_LEFT]),
+            scroll_distance * (pressed_keys[pygame.K_DOWN] - pressed_keys[pygame.K_UP]),
+        )
 
     def render(self, surface: Surface):
+        view = self._get_view()
+        view_offset = (-view.x_start, -view.y_start)
+
         # Render geography first
-        self.game_state.world.render_geography(self.map_surface)
+        self.game_state.world.render_geography(self.map_surface, view)
 
         # Render roads as we want them to show up below locations
-        self.game_state.world.render_roads(self.map_surface)
+        self.game_state.world.render_roads(self.map_surface, view)
 
         # Render selected hero path if necessary
         if self.game_state.selected_hero:
-            self.game_state.selected_hero.render_path(self.map_surface, pygame.Color("red"))
+            self.game_state.selected_hero.render_path(self.map_surface, pygame.Color("red"), view_offset)
 
         # Render hover hero path if necessary
         if self.game_state.hover_hero:
-            self.game_state.hover_hero.render_path(self.map_surface, pygame.Color("yellow"))
+            self.game_state.hover_hero.render_path(self.map_surface, pygame.Color("yellow"), view_offset)
 
         # Render the locations above the roads
-        self.game_state.world.render_locations(self.map_surface)
+        self.game_state.world.render_locations(self.map_surface, view)
 
         # Render the hover location above the static map image
         if self.game_state.world.hover_location:
-            border_points = self.game_state.world.location_to_border_points[self.game_state.world.hover_location.id]
-            for border_point in border_points:
-                point_tuple = (border_point[0], border_point[1])
-                pygame.draw.line(self.map_surface, pygame.Color("yellow"), point_tuple, point_tuple)
+            border_polylines = self.game_state.world.get_border_polylines(self.game_state.world.hover_location, view)
+            for polyline in border_polylines:
+                pygame.draw.lines(self.map_surface, HOVER_BORDER_COLOR, True, (polyline - (view.x_start, view.y_start)))
 
-            self.game_state.world.hover_location.render(self.map_surface, hover=True)
+            self.game_state.world.hover_location.render(self.map_surface, hover=True, offset=view_offset)
 
         # Render the map surface to the map panel, centered
         surface.blit(self.map_surface, (self.map_offset_x, self.map_offset_y))
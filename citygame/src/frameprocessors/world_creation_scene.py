@@ -1,6 +1,8 @@
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, TYPE_CHECKING
 
+import pygame.surfarray
+import pygame.transform
 from pygame import Surface
 from pygame.event import Event
 
@@ -20,6 +22,10 @@ BACKGROUND_COLOR = (0, 0, 0)
 
 TEXT_SIZE = 48
 
+# Largest size of the preview of the world being created
+PREVIEW_SIZE_PX = 480
+PREVIEW_MARGIN_PX = 20
+
 
 class WorldCreationScene(Scene):
     """
@@ -31,23 +37,27 @@ class WorldCreationScene(Scene):
 
         self.progress_bar = ProgressBar()
 
+        # Surface of the most recent preview so it is only scaled when the preview changes
+        self.preview = None
+        self.preview_surface: Optional[Surface] = None
+
         # We only need one thread running in the background to generate the world
         self.executor_pool = ThreadPoolExecutor(1)
         self.map_generation_future = self.executor_pool.submit(
-            self.generate_new_world_state, self.progress_bar, self.game_state.map_size
+            self.generate_new_world_state, self.progress_bar, self.game_state.map_size, self.game_state.world_seed
         )
 
     @staticmethod
-    def generate_new_world_state(progress_bar: ProgressBar, map_size: int) -> GameState:
-        new_game_state = GameState()
+    def generate_new_world_state(progress_bar: ProgressBar, map_size: int, world_seed: Optional[int]) -> GameState:
+        new_game_state = GameState(map_size, world_seed)
 
         # Generate the world
-        new_game_state.world = WorldState(progress_bar, map_size=map_size)
+        new_game_state.world = WorldState(progress_bar, map_size=map_size, seed=world_seed)
 
         # Generate heroes
         new_game_state.heroes = []
-        for i in range(INITIAL_NUMBER_OF_HEROES):
-            new_game_state.heroes.append(Hero(new_game_state.world.starting_location, new_game_state))
+        for name in new_game_state.world.generate_hero_names(INITIAL_NUMBER_OF_HEROES):
+            new_game_state.heroes.append(Hero(new_game_state.world.starting_location, new_game_state, name))
 
         return new_game_state
 
@@ -63,13 +73,36 @@ class WorldCreationScene(Scene):
             self.executor_pool.shutdown()
             self.scene_controller.change_active_scene(SceneEnum.Game)
 
+    def _update_preview_surface(self):
+        preview = self.progress_bar.preview
+        if preview is self.preview:
+            return
+
+        self.preview = preview
+        # Scale the preview up or down to fill the preview area while keeping its proportions
+        scale = PREVIEW_SIZE_PX / max(preview.shape[0], preview.shape[1])
+        self.preview_surface = pygame.transform.scale(
+            pygame.surfarray.make_surface(preview),
+            (round(preview.shape[0] * scale), round(preview.shape[1] * scale)),
+        )
+
     def render(self, screen: Surface):
         screen.fill(BACKGROUND_COLOR)
 
+        # The world is generated in another thread, so use the preview it has made so far
+        if self.progress_bar.preview is not None:
+            self._update_preview_surface()
+
         progress = int(self.progress_bar.progress * 100)
         progress_text = f"{progress}%"
         progress_text_rect = BASIC_FONT.get_rect(progress_text, size=TEXT_SIZE)
         progress_text_rect.center = screen.get_rect().center
+
+        if self.preview_surface:
+            preview_rect = self.preview_surface.get_rect()
+            preview_rect.midtop = (screen.get_rect().centerx, PREVIEW_MARGIN_PX)
+            screen.blit(self.preview_surface, preview_rect)
+            progress_text_rect.midtop = (screen.get_rect().centerx, preview_rect.bottom + PREVIEW_MARGIN_PX)
         BASIC_FONT.render_to(screen, progress_text_rect, progress_text, "white", size=TEXT_SIZE)
 
         task_text = f"{self.progress_bar.current_task}"
@@ -8,6 +8,9 @@ class Actor(ABC):
     An actor is an object in the game.
     """
 
+    # Empty so actors that define __slots__ do not get a __dict__ from this class
+    __slots__ = ()
+
     def __init__(self):
         pass
 
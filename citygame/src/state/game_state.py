@@ -5,6 +5,8 @@ import pickle
 import random
 from typing import Optional, List
 
+import numpy
+
 from citygame.src.constants.location_state_enum import LocationState
 from citygame.src.constants.world_constants import DEFAULT_MAP_SIZE
 from citygame.src.state.hero_actor import Hero
@@ -13,7 +15,6 @@ from citygame.src.state.world_state import WorldState
 from citygame.src.util.hero_util import get_xp_for_location_victory
 from citygame.src.util.paths import get_save_file_directory
 
-
 LOG = logging.getLogger("GameState")
 
 
@@ -22,13 +23,17 @@ class GameState:
     Class meant to hold the entire game state.
     """
 
-    def __init__(self, map_size: int = DEFAULT_MAP_SIZE):
+    def __init__(self, map_size: int = DEFAULT_MAP_SIZE, world_seed: Optional[int] = None):
         self.map_size = map_size
+        # The seed of the world to create. A random seed is used if not given.
+        self.world_seed = world_seed
 
         # The world state is generated async by the world creation scene
         self.world: WorldState = None
 
         self.heroes: List[Hero] = []
+        # Heroes are numbered in the order they are created
+        self.next_hero_id = 0
         self.selected_hero: Optional[Hero] = None
         self.hover_hero: Optional[Hero] = None
 
@@ -37,20 +42,25 @@ class GameState:
     def set_state(self, new_game_state: "GameState"):
         self.__dict__.update(new_game_state.__dict__)
 
-    def end_turn(self):
-        location_to_heroes = dict()
-        for location in self.world.locations:
-            location_to_heroes[location] = []
+    def create_hero_id(self) -> int:
+        hero_id = self.next_hero_id
+        self.next_hero_id += 1
+        return hero_id
 
+    def end_turn(self):
+        location_id_to_heroes = dict()
         for hero in self.heroes:
             hero.end_turn()
-
-            if hero.current_location in location_to_heroes:
-                location_to_heroes[hero.current_location].append(hero)
-
-        for location in location_to_heroes:
-            heroes = location_to_heroes[location]
-            self.battle(location, heroes)
+            location_id_to_heroes.setdefault(hero.current_location.id, []).append(hero)
+
+        # Only the locations with heroes and the discovered and explored locations, which regress without heroes, can
+        # be affected by a battle
+        location_ids = numpy.union1d(
+            self.world.location_table.get_ids_in_states(LocationState.DISCOVERED, LocationState.EXPLORED),
+            numpy.array(list(location_id_to_heroes), dtype=numpy.int64),
+        )
+        for location_id in location_ids.tolist():
+            self.battle(self.world.locations[location_id], location_id_to_heroes.get(location_id, []))
 
     def battle(self, location: Location, heroes: List[Hero]):
         # Ignore locations that are hidden or already conquered
@@ -1,12 +1,11 @@
-import math
-import random
-import uuid
 from typing import List, Optional, TYPE_CHECKING
 
+import numpy
 import pygame.draw_py
 from pygame import Color
 from pygame.surface import Surface
 
+from citygame.src.constants.hero_constants import DEFAULT_HERO_NAME
 from citygame.src.constants.location_state_enum import LocationState
 from citygame.src.interfaces.actor import Actor
 from citygame.src.state.location_actor import Location
@@ -22,12 +21,28 @@ class Hero(Actor):
     Representation of a hero.
     """
 
-    def __init__(self, starting_location: Location, game_state: "GameState"):
+    # Games can have very many heroes, so they do not get a __dict__
+    __slots__ = (
+        "game_state",
+        "id",
+        "xp",
+        "level",
+        "hp",
+        "max_hp",
+        "victories",
+        "defeats",
+        "name",
+        "current_location",
+        "move_path",
+        "destination",
+    )
+
+    def __init__(self, starting_location: Location, game_state: "GameState", name: str = DEFAULT_HERO_NAME):
         super().__init__()
 
         self.game_state = game_state
 
-        self.id = str(uuid.uuid4())
+        self.id = game_state.create_hero_id()
 
         self.xp = 0
         self.level = 1
@@ -38,8 +53,7 @@ class Hero(Actor):
         self.victories = 0
         self.defeats = 0
 
-        # TODO Hero name generation
-        self.name = f"Hero {random.randint(0, 99)}"
+        self.name = name
 
         self.current_location = starting_location
 
@@ -55,12 +69,15 @@ class Hero(Actor):
     def render(self, surface: Surface):
         render_font_center(surface, f"{self.name} Lv. {self.level}", 14, Color("white"))
 
-    def render_path(self, surface: Surface, color: Color):
+    def render_path(self, surface: Surface, color: Color, offset: tuple[int, int] = (0, 0)):
         if self.destination:
             current_location = self.current_location
             for path_location in self.move_path:
                 pygame.draw.line(
-                    surface, color, (current_location.x, current_location.y), (path_location.x, path_location.y)
+                    surface,
+                    color,
+                    (current_location.x + offset[0], current_location.y + offset[1]),
+                    (path_location.x + offset[0], path_location.y + offset[1]),
                 )
                 current_location = path_location
 
@@ -124,75 +141,42 @@ class Hero(Actor):
             self.move_path = []
 
     def _calculate_path_to_destination(self, destination: Location, locations: List[Location]) -> List[Location]:
-        location_set = set()
-
-        location_to_distance = dict()
-        location_to_previous_location = dict()
-        for location in locations:
-            # Do not consider hidden locations
-            if location.location_state == LocationState.HIDDEN:
-                continue
-
-            location_to_distance[location] = math.inf
-            location_to_previous_location[location] = None
-            location_set.add(location)
-
-        location_to_distance[self.current_location] = 0
-
-        while len(location_set) > 0:
-            minimum_distance_location = next(iter(location_set))
-            minimum_distance = location_to_distance[minimum_distance_location]
-            for location in location_set:
-                if location_to_distance[location] < minimum_distance:
-                    minimum_distance_location = location
-                    minimum_distance = location_to_distance[location]
-
-            location_set.remove(minimum_distance_location)
-
-            # Break out of the loop if we have reached our destination
-            if minimum_distance_location == destination:
-                break
-
-            # Heroes can only move through conquered locations bue we should always be able to move from the current
-            # location regardless of its state
-            if (
-                minimum_distance_location.location_state == LocationState.CONQUERED
-                or minimum_distance_location == self.current_location
-            ):
-                for neighbor in minimum_distance_location.neighbors:
+        # Every road is as long, so a breadth-first search over the ids of the locations finds the shortest path
+        world_state = self.current_location.world_state
+        location_states = world_state.location_table.states
+        hidden = LocationState.HIDDEN.value
+        conquered = LocationState.CONQUERED.value
+
+        previous_location_ids = numpy.full(len(locations), -1, dtype=numpy.int64)
+        previous_location_ids[self.current_location.id] = self.current_location.id
+        frontier = [self.current_location.id]
+        while len(frontier) > 0 and previous_location_ids[destination.id] == -1:
+            next_frontier = []
+            for location_id in frontier:
+                # Heroes can only move through conquered locations bue we should always be able to move from the current
+                # location regardless of its state
+                if location_states[location_id] != conquered and location_id != self.current_location.id:
+                    continue
+
+                start, end = world_state.neighbor_offsets[location_id], world_state.neighbor_offsets[location_id + 1]
+                for neighbor_id in world_state.neighbor_indices[start:end].tolist():
                     # Do not consider hidden locations
-                    if neighbor.location_state == LocationState.HIDDEN:
-                        continue
+                    if previous_location_ids[neighbor_id] == -1 and location_states[neighbor_id] != hidden:
+                        previous_location_ids[neighbor_id] = location_id
+                        next_frontier.append(neighbor_id)
+            frontier = next_frontier
 
-                    # TODO calculate actual distance between location and its neighbor based on geography
-                    alt = location_to_distance[minimum_distance_location] + 1
-                    if alt < location_to_distance[neighbor]:
-                        location_to_distance[neighbor] = alt
-                        location_to_previous_location[neighbor] = minimum_distance_location
-
-        # Build up the path by grabbing the previous location starting with the destination
+        # Build up the path by grabbing the previous location starting with the destination. We don't need to add the
+        # current location to the path as we are already there.
         path = []
-        location_pointer = destination
-        if location_to_previous_location[destination] or destination == self.current_location:
-            while location_pointer:
-                # We don't need to add the current location to the path as we are already there
-                if location_pointer == self.current_location:
-                    break
-
-                path.insert(0, location_pointer)
-                location_pointer = location_to_previous_location[location_pointer]
+        if previous_location_ids[destination.id] != -1:
+            location_id = destination.id
+            while location_id != self.current_location.id:
+                path.insert(0, locations[location_id])
+                location_id = int(previous_location_ids[location_id])
 
         return path
 
-    def __eq__(self, other):
-        if type(other) is type(self):
-            return self.id == other.id
-        else:
-            return False
-
-    def __hash__(self):
-        return hash(self.id)
-
     def __str__(self):
         return f"({self.name} - Lv. {self.level}"
 
@@ -1,10 +1,11 @@
-from typing import List, TYPE_CHECKING
+from typing import List, Optional, Sequence, TYPE_CHECKING
 
 from pygame import gfxdraw, Color
 from pygame.surface import Surface
 
 from citygame.src.constants.location_state_enum import LocationState
 from citygame.src.constants.world_constants import LOCATION_DOT_RADIUS
+from citygame.src.state.location_table import LocationTable
 
 if TYPE_CHECKING:
     from citygame.src.state.game_state import WorldState
@@ -15,57 +16,105 @@ LOCATION_DOT_OUTLINE_COLOR_HOVER = Color("purple")
 
 class Location:
     """
-    Representation of a location.
+    Representation of a location, as a view of its row of the location table of its world.
+
+    Every location of a world has one view, so locations are compared and hashed by identity.
     """
 
-    def __init__(self, location_id: int, x: int, y: int, world_state: "WorldState"):
+    # Views only keep the row and never get other attributes, so they do not need a __dict__
+    __slots__ = ("id", "location_table", "world_state")
+
+    def __init__(self, location_id: int, location_table: LocationTable, world_state: "WorldState"):
         super().__init__()
         self.id = location_id
-        self.x = x
-        self.y = y
+        self.location_table = location_table
         self.world_state = world_state
 
-        self.name = f"({x},{y})"
+    @property
+    def x(self) -> int:
+        return int(self.location_table.x[self.id])
+
+    @property
+    def y(self) -> int:
+        return int(self.location_table.y[self.id])
+
+    @property
+    def name(self) -> str:
+        return self.location_table.get_name(self.id)
+
+    @property
+    def level(self) -> int:
+        return int(self.location_table.levels[self.id])
+
+    @property
+    def terrain_difficulty(self) -> float:
+        # Multiplies the danger of the location, from the terrain of its region
+        return float(self.location_table.terrain_difficulties[self.id])
 
-        self.level = 1
-        self.danger_points = 100
-        self.initial_danger_points = self.danger_points
+    @property
+    def danger_points(self) -> int:
+        return int(self.location_table.danger_points[self.id])
 
-        self.location_state = LocationState.HIDDEN
-        self.starting_location = False
+    @danger_points.setter
+    def danger_points(self, danger_points: int):
+        self.location_table.danger_points[self.id] = danger_points
 
-        self.neighbors: List["Location"] = []
+    @property
+    def initial_danger_points(self) -> int:
+        return int(self.location_table.initial_danger_points[self.id])
+
+    @property
+    def location_state(self) -> LocationState:
+        return self.location_table.get_state(self.id)
+
+    @property
+    def starting_location(self) -> bool:
+        return bool(self.location_table.starting_locations[self.id])
+
+    @property
+    def hover(self) -> bool:
+        return bool(self.location_table.hovers[self.id])
+
+    @hover.setter
+    def hover(self, hover: bool):
+        self.location_table.hovers[self.id] = hover
+
+    def render(self, surface: Surface, hover: bool, offset: tuple[int, int] = (0, 0)):
+        # The offset is added to the location's coordinates, for surfaces that do not start at the corner of the map
+        x = self.x + offset[0]
+        y = self.y + offset[1]
 
-    def render(self, surface: Surface, hover: bool):
         dot_color = LocationState.get_rgb_color(self.location_state)
-        gfxdraw.filled_circle(surface, self.x, self.y, LOCATION_DOT_RADIUS, dot_color)
+        gfxdraw.filled_circle(surface, x, y, LOCATION_DOT_RADIUS, dot_color)
 
         outline_color = LOCATION_DOT_OUTLINE_COLOR
         if hover:
             outline_color = LOCATION_DOT_OUTLINE_COLOR_HOVER
-        gfxdraw.circle(surface, self.x, self.y, LOCATION_DOT_RADIUS, outline_color)
+        gfxdraw.circle(surface, x, y, LOCATION_DOT_RADIUS, outline_color)
 
     def set_as_starting_location(self):
-        self.starting_location = True
-        self.location_state = LocationState.CONQUERED
+        self.location_table.starting_locations[self.id] = True
+        self.set_location_state(LocationState.CONQUERED)
 
     def set_location_state(self, location_state: LocationState):
-        self.location_state = location_state
+        self.location_table.set_state(self.id, location_state)
 
-    def set_neighbors(self, neighbors: List["Location"]):
-        self.neighbors = neighbors
+    @property
+    def neighbors(self) -> List["Location"]:
+        # The world keeps the neighbors of every location in shared arrays
+        return self.world_state.get_neighbors(self)
 
     def set_name(self, name: str):
-        self.name = name
+        self.location_table.names[self.id] = name
 
-    @staticmethod
-    def _get_danger_level(level: int):
-        return 100 * level + 100
+    def set_region_movement_cost(self, movement_cost: float):
+        """
+        Sets the average cost of moving across the region of the location, which makes rough regions more dangerous.
+        """
+        self.location_table.set_region_movement_costs([self.id], [movement_cost])
 
     def set_level(self, level: int):
-        self.level = level
-        self.danger_points = self._get_danger_level(level)
-        self.initial_danger_points = self.danger_points
+        self.location_table.set_levels(self.id, level)
 
     def victory(self):
         self.danger_points -= 100
@@ -85,17 +134,36 @@ class Location:
         if self.danger_points == self.initial_danger_points:
             self.world_state.location_regress(self)
 
-    def __eq__(self, other):
-        if type(other) is type(self):
-            return (self.id == other.id) and (self.x == other.x) and (self.y == other.y)
-        else:
-            return False
-
-    def __hash__(self):
-        return hash((self.id, self.x, self.y))
-
     def __str__(self):
         return f"{self.name} - ({self.x}, {self.y}) - {self.location_state}"
 
     def __repr__(self):
         return self.__str__()
+
+
+class Locations(Sequence[Location]):
+    """
+    The locations of a world, indexed by location id.
+
+    A location is only created the first time it is used, and is then kept so every location has one view of its row.
+    Worlds with many locations then only keep objects for the few locations that the game has used.
+    """
+
+    def __init__(self, location_table: LocationTable, world_state: "WorldState"):
+        self.location_table = location_table
+        self.world_state = world_state
+        self._locations: List[Optional[Location]] = [None] * len(location_table)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[location_id] for location_id in range(len(self))[index]]
+
+        location_id = range(len(self))[index]
+        location = self._locations[location_id]
+        if location is None:
+            location = Location(location_id, self.location_table, self.world_state)
+            self._locations[location_id] = location
+        return location
@@ -0,0 +1,88 @@
+from typing import Iterable, List, Optional
+
+import numpy
+from numpy import ndarray
+
+from citygame.src.constants.location_state_enum import LocationState
+
+# Extra share of danger for each point of average movement cost of a region above the cost of grassland
+DANGER_PER_MOVEMENT_COST = 0.25
+
+# Location states by their value, which is what the table stores
+_LOCATION_STATES = {location_state.value: location_state for location_state in LocationState}
+
+
+class LocationTable:
+    """
+    The fields of every location of a world in parallel arrays indexed by location id.
+
+    Location objects are views of one row of the table, and anything that needs the fields of many locations at once
+    reads the arrays directly.
+    """
+
+    def __init__(self, location_points: Iterable[tuple[int, int]]):
+        location_points = numpy.asarray(location_points, dtype=numpy.int32).reshape(-1, 2)
+        number_of_locations = len(location_points)
+
+        self.x = numpy.ascontiguousarray(location_points[:, 0])
+        self.y = numpy.ascontiguousarray(location_points[:, 1])
+        # Locations without a name are named after their coordinates
+        self.names: List[Optional[str]] = [None] * number_of_locations
+
+        self.levels = numpy.ones(number_of_locations, dtype=numpy.int32)
+        # Multiplies the danger of each location, from the terrain of its region
+        self.terrain_difficulties = numpy.ones(number_of_locations)
+        self.danger_points = numpy.full(number_of_locations, 100, dtype=numpy.int32)
+        self.initial_danger_points = self.danger_points.copy()
+
+        self.states = numpy.full(number_of_locations, LocationState.HIDDEN.value, dtype=numpy.int8)
+        self.starting_locations = numpy.zeros(number_of_locations, dtype=bool)
+        self.hovers = numpy.zeros(number_of_locations, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def get_state(self, location_id: int) -> LocationState:
+        return _LOCATION_STATES[int(self.states[location_id])]
+
+    def set_state(self, location_id: int, location_state: LocationState):
+        self.states[location_id] = location_state.value
+
+    def get_ids_in_states(self, *location_states: LocationState) -> ndarray:
+        """
+        Returns the ids of the locations in any of the states, in order.
+        """
+        return numpy.flatnonzero(numpy.isin(self.states, [location_state.value for location_state in location_states]))
+
+    def get_levels(self, location_ids) -> ndarray:
+        return self.levels[location_ids]
+
+    def set_levels(self, location_ids, levels):
+        """
+        Sets the levels of the locations, which resets their danger to the danger of the level.
+        """
+        levels = numpy.asarray(levels, dtype=numpy.int32)
+        self.levels[location_ids] = levels
+        # Truncated like int(), since the danger is never negative
+        self.danger_points[location_ids] = ((100 * levels + 100) * self.terrain_difficulties[location_ids]).astype(
+            numpy.int32
+        )
+        self.initial_danger_points[location_ids] = self.danger_points[location_ids]
+
+    def set_region_movement_costs(self, location_ids, movement_costs):
+        """
+        Sets the average cost of moving across the regions of the locations, which makes rough regions more dangerous.
+        Costs that are not finite, like those of regions without tiles, are ignored.
+        """
+        location_ids = numpy.arange(len(self))[location_ids]
+        movement_costs = numpy.broadcast_to(numpy.asarray(movement_costs, dtype=numpy.float64), location_ids.shape)
+        is_finite = numpy.isfinite(movement_costs)
+        self.terrain_difficulties[location_ids[is_finite]] = 1 + DANGER_PER_MOVEMENT_COST * numpy.maximum(
+            movement_costs[is_finite] - 1, 0
+        )
+
+    def get_name(self, location_id: int) -> str:
+        name = self.names[location_id]
+        if name is None:
+            return f"({self.x[location_id]},{self.y[location_id]})"
+        return name
@@ -1,39 +1,120 @@
+import logging
 import math
-from typing import List, Set, Optional
+from typing import Dict, List, Set, Optional
 
+import numpy
 import pygame.draw
+import pygame.surfarray
+from numpy import ndarray
 from pygame import Surface
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import shortest_path
+from scipy.spatial import cKDTree
 
 from citygame.src.constants.location_state_enum import LocationState
-from citygame.src.constants.world_constants import DISTANCE_BETWEEN_LOCATIONS
-from citygame.src.state.location_actor import Location
-from citygame.src.util.locations import calculate_locations, calculate_regions, calculate_borders
+from citygame.src.constants.world_constants import (
+    ADD_RIVERS,
+    CHUNKED_WORLD_MAP_SIZE,
+    DISTANCE_BETWEEN_LOCATIONS,
+    ERODE_TERRAIN,
+    LAZY_REGIONS,
+    MAXIMUM_LOADED_WORLD_CHUNKS,
+    REGION_NEIGHBORS,
+    WORLD_CHUNK_SIZE,
+    WORLD_GENERATION_PROCESSES,
+)
+from citygame.src.state.location_actor import Location, Locations
+from citygame.src.state.location_table import LocationTable
+from citygame.src.util.contours import trace_region_contours
+from citygame.src.util.landmasses import Landmasses, label_landmasses
+from citygame.src.util.locations import (
+    LocationRegion,
+    calculate_border_arrays,
+    calculate_location_region,
+    calculate_locations,
+    calculate_regions,
+    find_close_location_pairs,
+    find_closest_locations,
+)
+from citygame.src.util.lru_cache import LruCache
 from citygame.src.util.map_tile import MapTile
-from citygame.src.util.maps import generate_map
+from citygame.src.util.maps import MapWindow, downsample_map, generate_map, generate_map_previews, generate_seed
+from citygame.src.util.names import HERO_NAME_MODEL, LOCATION_NAME_MODEL, NameGenerator
 from citygame.src.util.progress_bar import ProgressBar
+from citygame.src.util.region_graph import RegionAdjacency, build_adjacency_arrays
+from citygame.src.util.region_statistics import RegionStatistics, calculate_region_statistics
+from citygame.src.util.tile_index import TileIndex
+from citygame.src.util.world_cache import CachedWorld, load_world, save_world
+from citygame.src.util.world_chunks import WorldChunk, WorldChunks
+
+LOG = logging.getLogger("WorldState")
 
 NEIGHBOR_LINE_COLOR = [25, 25, 25]
 
+# Number of region outlines kept to highlight regions again without tracing them
+MAXIMUM_CACHED_BORDER_POLYLINES = 64
+
 
 class WorldState:
     """
     Representation of a world.
     """
 
-    def __init__(self, progress_bar: ProgressBar, map_size):
+    def __init__(
+        self,
+        progress_bar: ProgressBar,
+        map_size,
+        processes: int = WORLD_GENERATION_PROCESSES,
+        seed: Optional[int] = None,
+        chunked: Optional[bool] = None,
+        lazy_regions: Optional[bool] = None,
+        region_neighbors: Optional[bool] = None,
+    ):
         self.map_size = map_size
 
-        self._generate_world(progress_bar, map_size)
+        # The same seed always creates the same world
+        self.seed = generate_seed() if seed is None else seed
+        LOG.info(f"World seed: {self.seed}")
+        # Names of locations and heroes, which are unique within the world
+        self.name_generator = NameGenerator(self.seed)
+
+        # Worlds that were cached or prepared ahead of time are opened from memory-mapped files, so they never need to
+        # fit in memory
+        cached_world = None
+        if not chunked:
+            progress_bar.set_progress(0.0, "Loading cached world...")
+            cached_world = load_world(self.seed, map_size, map_size)
+
+        # Chunked worlds only generate the chunks that are viewed or next to discovered locations. Large worlds that
+        # are not cached are chunked unless told otherwise.
+        if chunked is None:
+            chunked = cached_world is None and map_size >= CHUNKED_WORLD_MAP_SIZE
+        self.chunked = chunked
+        self.world_chunks: Optional[WorldChunks] = None
+        # Worlds with lazy regions only calculate the region of a location when it is revealed, so they are ready to
+        # play sooner whatever the number of locations. Chunked worlds already calculate regions as chunks are loaded.
+        self.lazy_regions = not self.chunked and (LAZY_REGIONS if lazy_regions is None else lazy_regions)
+        # The regions of the revealed locations of worlds with lazy regions, by location id
+        self.location_regions: Dict[int, LocationRegion] = {}
+        # Locations are neighbors when they are close enough, or when their regions touch if asked for. Only whole
+        # worlds know every region up front.
+        self.region_neighbors = REGION_NEIGHBORS if region_neighbors is None else region_neighbors
+        if self.region_neighbors and (self.chunked or self.lazy_regions):
+            raise ValueError("Only worlds that are not chunked and do not have lazy regions can have region neighbors")
+
+        self._generate_world(progress_bar, map_size, processes, cached_world)
 
         self.hover_location: Optional[Location] = None
-
-        self.surface_offset_x = 0
-        self.surface_offset_y = 0
-
-        self.locations_surface = Surface((map_size, map_size), pygame.SRCALPHA, 32)
-        self.locations_surface = self.locations_surface.convert_alpha()
-        self.location_roads_surface = Surface((map_size, map_size), pygame.SRCALPHA, 32)
-        self.location_roads_surface = self.location_roads_surface.convert_alpha()
+        # Outlines of the regions that were highlighted recently, by location id and the window they were traced in
+        self.border_polylines: LruCache[List[ndarray]] = LruCache(MAXIMUM_CACHED_BORDER_POLYLINES)
+
+        # Chunked worlds and worlds opened from memory-mapped files draw the locations in view every frame instead of
+        # keeping surfaces of the whole map
+        if not self.draw_per_view:
+            self.locations_surface = Surface((map_size, map_size), pygame.SRCALPHA, 32)
+            self.locations_surface = self.locations_surface.convert_alpha()
+            self.location_roads_surface = Surface((map_size, map_size), pygame.SRCALPHA, 32)
+            self.location_roads_surface = self.location_roads_surface.convert_alpha()
         self.locations_to_draw: Set[Location] = set()
 
         self.starting_location.set_as_starting_location()
@@ -71,6 +152,8 @@ class WorldState:
     def location_conquered(self, location: Location):
         self.locations_to_draw.add(location)
         location.set_location_state(LocationState.CONQUERED)
+        if self.lazy_regions:
+            self._reveal_region(location)
 
         # Now that we have conquered the location we discover the neighbors
         for neighbor in location.neighbors:
@@ -78,6 +161,11 @@ class WorldState:
             if neighbor.location_state == LocationState.HIDDEN:
                 neighbor.set_location_state(LocationState.DISCOVERED)
 
+                if self.chunked:
+                    self._load_chunks_around(neighbor)
+                if self.lazy_regions:
+                    self._reveal_region(neighbor)
+
             self.locations_to_draw.add(neighbor)
 
         self._redraw_locations()
@@ -85,6 +173,9 @@ class WorldState:
         self._redraw_location_roads()
 
     def _redraw_locations(self):
+        if self.draw_per_view:
+            return
+
         self.locations_surface = Surface((self.map_size, self.map_size), pygame.SRCALPHA, 32)
         self.locations_surface = self.locations_surface.convert_alpha()
 
@@ -92,6 +183,9 @@ class WorldState:
             location.render(self.locations_surface, hover=False)
 
     def _redraw_location_roads(self):
+        if self.draw_per_view:
+            return
+
         self.location_roads_surface = Surface((self.map_size, self.map_size), pygame.SRCALPHA, 32)
         self.location_roads_surface = self.location_roads_surface.convert_alpha()
         for location in self.locations_to_draw:
@@ -104,104 +198,363 @@ class WorldState:
                     self.location_roads_surface, NEIGHBOR_LINE_COLOR, [location.x, location.y], [neighbor.x, neighbor.y]
                 )
 
-    def get_locations(self) -> List[Location]:
+    @property
+    def tile_index(self) -> Optional[TileIndex]:
+        """
+        The nearest buildable tiles and distances to water, for placing anything new on the map. It is only calculated
+        when it is first used, since the distance transforms of the whole map need several times the memory of the
+        tiles.
+        """
+        if self._tile_index is None and self.map_tiles is not None:
+            self._tile_index = TileIndex.from_tiles(numpy.asarray(self.map_tiles))
+        return self._tile_index
+
+    def get_locations(self) -> Locations:
         return self.locations
 
-    def render_geography(self, surface: Surface):
+    def generate_hero_names(self, count: int) -> List[str]:
+        return self.name_generator.generate(count, HERO_NAME_MODEL)
+
+    def get_neighbors(self, location: Location) -> List[Location]:
+        start, end = self.neighbor_offsets[location.id], self.neighbor_offsets[location.id + 1]
+        return [self.locations[i] for i in self.neighbor_indices[start:end].tolist()]
+
+    def get_region(self, x: int, y: int) -> int:
+        if self.chunked:
+            return self.world_chunks.get_region(x, y)
+        if self.lazy_regions:
+            # The tile is in the region of the closest location if it is on the land of the starting landmass
+            if self.landmasses.get_landmass(x, y) != self.starting_landmass:
+                return -1
+            return int(find_closest_locations(numpy.array([[x, y]]), self.location_tree)[0])
+        return int(self.region_matrix[x][y])
+
+    def get_border_polylines(self, location: Location, view: MapWindow) -> List[ndarray]:
+        """
+        Returns the outlines of the location's region as closed polylines of map coordinates of shape (points, 2).
+
+        Chunked worlds only trace the region in the chunks around the view, which can cut it off outside of the view.
+        """
+        if self.chunked:
+            window = self._get_chunk_window_around(view)
+        else:
+            window = self._get_region_window(location)
+        if window is None:
+            return []
+
+        return self.border_polylines.get((location.id, window), lambda: self._trace_border_polylines(location, window))
+
+    def _get_chunk_window_around(self, view: MapWindow) -> MapWindow:
+        # Include a tile around the view so outlines cut off at the edge of the window are never in the view
+        chunk_size = self.world_chunks.chunk_size
+        return MapWindow(
+            max(view.x_start - 1, 0) // chunk_size * chunk_size,
+            min(math.ceil((view.x_end + 1) / chunk_size) * chunk_size, self.map_size),
+            max(view.y_start - 1, 0) // chunk_size * chunk_size,
+            min(math.ceil((view.y_end + 1) / chunk_size) * chunk_size, self.map_size),
+        )
+
+    def _get_region_window(self, location: Location) -> Optional[MapWindow]:
+        if self.lazy_regions:
+            location_region = self.location_regions.get(location.id)
+            return None if location_region is None else location_region.window
+
+        # Every tile of a region is between its outermost border points
+        start, end = self.border_offsets[location.id], self.border_offsets[location.id + 1]
+        if start == end:
+            return None
+
+        border_points = self.border_points[start:end]
+        x_start, y_start = numpy.min(border_points, axis=0).tolist()
+        x_end, y_end = (numpy.max(border_points, axis=0) + 1).tolist()
+        return MapWindow(x_start, x_end, y_start, y_end)
+
+    def _trace_border_polylines(self, location: Location, window: MapWindow) -> List[ndarray]:
+        if self.chunked:
+            region_matrix = self.world_chunks.get_region_matrix(window)
+        elif self.lazy_regions:
+            region_matrix = self.location_regions[location.id].region_matrix
+        else:
+            region_matrix = self.region_matrix[window.slices]
+        return trace_region_contours(region_matrix, location.id, window)
+
+    # The render methods draw the part of the map in the view, with the corner of the view at the corner of the surface
+    def render_geography(self, surface: Surface, view: MapWindow):
         if self.map_size < surface.get_width() or self.map_size < surface.get_height():
             surface.fill(MapTile.get_rgb_value(MapTile.DEEP_WATER.value))
 
-        self.surface_offset_x = abs(surface.get_width() - self.map_size) // 2
-        self.surface_offset_y = abs(surface.get_height() - self.map_size) // 2
+        if self.chunked:
+            for chunk in self.world_chunks.get_chunks_in_window(view):
+                surface.blit(
+                    self._get_chunk_surface(chunk),
+                    (chunk.window.x_start - view.x_start, chunk.window.y_start - view.y_start),
+                )
+            return
+
+        if self.draw_per_view:
+            for window in self._get_tile_windows_in(view):
+                surface.blit(
+                    self._get_tiles_surface(window), (window.x_start - view.x_start, window.y_start - view.y_start)
+                )
+            return
 
-        surface.blit(self.map_surface, (self.surface_offset_x, self.surface_offset_y))
+        surface.blit(self.map_surface, (-view.x_start, -view.y_start))
 
-    def render_roads(self, surface: Surface):
+    def render_roads(self, surface: Surface, view: MapWindow):
         # Draw the neighboring location lines first so the location bubbles will be drawn over them
-        surface.blit(self.location_roads_surface, (self.surface_offset_x, self.surface_offset_y))
+        if not self.draw_per_view:
+            surface.blit(self.location_roads_surface, (-view.x_start, -view.y_start))
+            return
 
-    def render_locations(self, surface: Surface):
-        # Draw the locations surface
-        surface.blit(self.locations_surface, (self.surface_offset_x, self.surface_offset_y))
-
-    def _generate_world(self, progress_bar: ProgressBar, map_size):
-        progress_bar.set_progress(0.0, "Generating tiles...")
-        self.map_tiles = generate_map(map_size, map_size)
+        for location in self._get_locations_to_draw_near(view):
+            if location.location_state != LocationState.CONQUERED:
+                continue
 
-        progress_bar.set_progress(0.3, "Generating locations...")
-        location_points = calculate_locations(self.map_tiles)
+            for neighbor in location.neighbors:
+                pygame.draw.line(
+                    surface,
+                    NEIGHBOR_LINE_COLOR,
+                    [location.x - view.x_start, location.y - view.y_start],
+                    [neighbor.x - view.x_start, neighbor.y - view.y_start],
+                )
 
-        progress_bar.set_progress(0.6, "Calculating regions...")
-        self.region_matrix = calculate_regions(location_points, self.map_tiles)
-        self.location_to_border_points = calculate_borders(location_points, self.region_matrix)
+    def render_locations(self, surface: Surface, view: MapWindow):
+        # Draw the locations surface
+        if not self.draw_per_view:
+            surface.blit(self.locations_surface, (-view.x_start, -view.y_start))
+            return
+
+        for location in self._get_locations_to_draw_near(view):
+            location.render(surface, hover=False, offset=(-view.x_start, -view.y_start))
+
+    def _get_locations_to_draw_near(self, view: MapWindow) -> List[Location]:
+        # Include locations just outside of the view whose roads reach into it
+        margin = DISTANCE_BETWEEN_LOCATIONS + 1
+        return [
+            location
+            for location in self.locations_to_draw
+            if view.x_start - margin <= location.x < view.x_end + margin
+            and view.y_start - margin <= location.y < view.y_end + margin
+        ]
+
+    def _get_chunk_surface(self, chunk: WorldChunk) -> Surface:
+        return self.chunk_surfaces.get(
+            chunk.window, lambda: pygame.surfarray.make_surface(MapTile.get_rgb_image(chunk.map_tiles))
+        )
+
+    def _get_tile_windows_in(self, view: MapWindow) -> List[MapWindow]:
+        # The squares of the map that the view overlaps, which line up with the chunks of chunked worlds
+        first_x = max(view.x_start, 0) // WORLD_CHUNK_SIZE * WORLD_CHUNK_SIZE
+        first_y = max(view.y_start, 0) // WORLD_CHUNK_SIZE * WORLD_CHUNK_SIZE
+        return [
+            MapWindow(x, min(x + WORLD_CHUNK_SIZE, self.map_size), y, min(y + WORLD_CHUNK_SIZE, self.map_size))
+            for x in range(first_x, min(view.x_end, self.map_size), WORLD_CHUNK_SIZE)
+            for y in range(first_y, min(view.y_end, self.map_size), WORLD_CHUNK_SIZE)
+        ]
+
+    def _get_tiles_surface(self, window: MapWindow) -> Surface:
+        # Only the tiles of the window are read from the memory-mapped file
+        return self.chunk_surfaces.get(
+            window, lambda: pygame.surfarray.make_surface(MapTile.get_rgb_image(self.map_tiles[window.slices]))
+        )
+
+    def _load_chunks_around(self, location: Location):
+        # Generate the chunks around newly discovered locations so they are ready before they are viewed
+        margin = DISTANCE_BETWEEN_LOCATIONS
+        self.world_chunks.get_chunks_in_window(
+            MapWindow(location.x - margin, location.x + margin + 1, location.y - margin, location.y + margin + 1)
+        )
+
+    def _reveal_region(self, location: Location):
+        # Calculate the region of a newly revealed location and the statistics and danger that come from it
+        if location.id in self.location_regions:
+            return
+
+        location_region = calculate_location_region(
+            location.id,
+            self.location_tree,
+            self._get_starting_land_mask,
+            self.map_size,
+            self.map_size,
+            bounding_box=self.landmasses.get_bounding_box(self.starting_landmass),
+        )
+        self.location_regions[location.id] = location_region
+
+        window = location_region.window
+        region_statistics = calculate_region_statistics(
+            numpy.where(location_region.region_matrix == location.id, 0, -1), self.map_tiles[window.slices], 1, window
+        )
+        self.region_statistics.set_region(location.id, region_statistics, 0)
+        location.set_region_movement_cost(float(region_statistics.get_average_movement_costs()[0]))
+        location.set_level(location.level)
+
+    def _get_starting_land_mask(self, window: MapWindow) -> ndarray:
+        return self.landmasses.get_mask(self.starting_landmass, window)
+
+    def _generate_world(self, progress_bar: ProgressBar, map_size, processes: int, cached_world: Optional[CachedWorld]):
+        if self.chunked:
+            location_points = self._generate_chunked_world(progress_bar, map_size)
+        elif self.lazy_regions:
+            location_points = self._generate_lazy_world(progress_bar, map_size, processes, cached_world)
+        else:
+            location_points = self._generate_whole_world(progress_bar, map_size, processes, cached_world)
 
         progress_bar.set_progress(0.8, "Calculating location graph...")
-        # Create the location objects
-        self.locations: List[Location] = []
-        for i in range(len(location_points)):
-            location_coordinates = location_points[i]
-            self.locations.append(Location(i, location_coordinates[0], location_coordinates[1], self))
-
-        # Calculate neighbors for each location
-        for i in range(len(self.locations)):
-            current_neighbors = []
-            current_location = self.locations[i]
-            # TODO Generate real names
-            current_location.set_name(f"Location {i}")
-
-            x1 = current_location.x
-            y1 = current_location.y
-
-            for j in range(len(self.locations)):
-                # Do not calculate a point as a neighbor of itself
-                if i == j:
-                    continue
-
-                other_location = self.locations[j]
-                x2 = other_location.x
-                y2 = other_location.y
-                distance = math.sqrt(math.pow(x2 - x1, 2) + math.pow(y2 - y1, 2))
-                if distance < (DISTANCE_BETWEEN_LOCATIONS + 1):
-                    current_neighbors.append(other_location)
-
-            # Now set the neighbors
-            current_location.set_neighbors(current_neighbors)
+        # The fields of the locations are kept in the table, and the location objects are views of its rows
+        self.location_table = LocationTable(location_points)
+        self.location_table.names = self.name_generator.generate(len(location_points), LOCATION_NAME_MODEL)
+        self.locations = Locations(self.location_table, self)
+
+        if self.region_neighbors:
+            neighbor_pairs = self.region_adjacency.pairs
+        else:
+            neighbor_pairs = find_close_location_pairs(location_points, DISTANCE_BETWEEN_LOCATIONS + 1)
+        # The neighbors of location i are neighbor_indices[neighbor_offsets[i]:neighbor_offsets[i + 1]]
+        self.neighbor_offsets, self.neighbor_indices = build_adjacency_arrays(neighbor_pairs, len(self.locations))
+
+        # The terrain of the regions makes their locations more or less dangerous
+        if self.region_statistics is not None:
+            self.location_table.set_region_movement_costs(
+                slice(None), self.region_statistics.get_average_movement_costs()
+            )
 
         self.starting_location = self.locations[0]
 
         # Calculate location levels
-        self._calculate_level(self.starting_location)
+        self._calculate_levels()
 
-        progress_bar.set_progress(0.8, "Saving map image...")
-        # Create a map surface so that we can simply draw the surface each frame instead of each tile
-        self.map_surface = Surface((map_size, map_size))
-        for x in range(self.map_size):
-            for y in range(self.map_size):
-                tile_color = MapTile.get_rgb_value(self.map_tiles[x][y])
-                pygame.draw.line(self.map_surface, tile_color, [x, y], [x, y])
+        # The map of a world opened from memory-mapped files is drawn from the part of it in view, so it is never read
+        # into memory as a whole
+        self.draw_per_view = self.chunked or isinstance(self.map_tiles, numpy.memmap)
+        self.chunk_surfaces: LruCache[Surface] = LruCache(MAXIMUM_LOADED_WORLD_CHUNKS)
+        if not self.draw_per_view:
+            progress_bar.set_progress(0.8, "Saving map image...")
+            # Create a map surface so that we can simply draw the surface each frame instead of each tile
+            self.map_surface = pygame.surfarray.make_surface(MapTile.get_rgb_image(self.map_tiles))
 
         progress_bar.set_progress(1.0, "Done!")
 
-    @staticmethod
-    def _calculate_level(starting_location: Location):
-        starting_location.set_level(1)
-
-        locations_visited = {starting_location}
-        most_recently_visited = {starting_location}
-        distance = 0
-        while True:
-            newly_visited = set()
-            for location in most_recently_visited:
-                location.set_level(distance)
-                for neighbor in location.neighbors:
-                    # Do not re-visit points
-                    if neighbor in locations_visited:
-                        continue
-
-                    locations_visited.add(neighbor)
-                    newly_visited.add(neighbor)
-
-            distance += 1
-            most_recently_visited = newly_visited
-            if len(most_recently_visited) == 0:
-                return
+    def _generate_whole_world(
+        self, progress_bar: ProgressBar, map_size, processes: int, cached_world: Optional[CachedWorld]
+    ) -> List[tuple[int, int]]:
+        if cached_world is None:
+            map_tiles, landmasses, location_points = self._generate_tiles_and_locations(
+                progress_bar, map_size, processes
+            )
+
+            progress_bar.set_progress(0.6, "Calculating regions...")
+            region_matrix = calculate_regions(location_points, map_tiles, landmasses=landmasses)
+            border_points, border_offsets = calculate_border_arrays(
+                location_points, region_matrix, landmasses=landmasses
+            )
+
+            cached_world = CachedWorld.from_generated_world(
+                map_tiles, location_points, region_matrix, border_points, border_offsets, landmasses=landmasses
+            )
+            save_world(self.seed, map_size, map_size, cached_world)
+        else:
+            progress_bar.set_preview(MapTile.get_rgb_image(downsample_map(cached_world.map_tiles)))
+
+        # Only the landmass of the starting location has locations and regions
+        self.landmasses: Optional[Landmasses] = cached_world.landmasses
+        self._tile_index: Optional[TileIndex] = None
+        self.map_tiles = cached_world.map_tiles
+        self.region_matrix = cached_world.region_matrix
+        # The border points of location i are border_points[border_offsets[i]:border_offsets[i + 1]]
+        self.border_points = cached_world.border_points
+        self.border_offsets = cached_world.border_offsets
+        self.region_adjacency: Optional[RegionAdjacency] = cached_world.region_adjacency
+        self.region_statistics: Optional[RegionStatistics] = cached_world.region_statistics
+        return cached_world.get_location_points()
+
+    def _generate_lazy_world(
+        self, progress_bar: ProgressBar, map_size, processes: int, cached_world: Optional[CachedWorld]
+    ) -> List[tuple[int, int]]:
+        # Only the tiles and locations of a cached world are used. New worlds are not cached, since the cache has the
+        # regions of every location.
+        if cached_world is None:
+            map_tiles, landmasses, location_points = self._generate_tiles_and_locations(
+                progress_bar, map_size, processes
+            )
+        else:
+            map_tiles = cached_world.map_tiles
+            progress_bar.set_preview(MapTile.get_rgb_image(downsample_map(map_tiles)))
+            landmasses = cached_world.landmasses
+            location_points = cached_world.get_location_points()
+
+        self.landmasses = landmasses
+        self._tile_index = None
+        self.map_tiles = map_tiles
+        # Regions are calculated one location at a time as they are revealed
+        self.region_matrix = None
+        self.border_points = None
+        self.border_offsets = None
+        self.region_adjacency = None
+        self.region_statistics = RegionStatistics.empty(len(location_points))
+        self.location_tree = cKDTree(location_points)
+        self.starting_landmass = landmasses.get_landmass(*location_points[0])
+        return location_points
+
+    def _generate_tiles_and_locations(
+        self, progress_bar: ProgressBar, map_size, processes: int
+    ) -> tuple[ndarray, Landmasses, List[tuple[int, int]]]:
+        self._show_map_previews(progress_bar, map_size)
+
+        map_tiles = generate_map(
+            map_size,
+            map_size,
+            processes=processes,
+            seed=self.seed,
+            progress_callback=progress_bar.track_task(0.05, 0.3, "Generating tiles..."),
+            erosion=ERODE_TERRAIN,
+            rivers=ADD_RIVERS,
+        )
+        progress_bar.set_preview(MapTile.get_rgb_image(downsample_map(map_tiles)))
+        landmasses = label_landmasses(map_tiles)
+
+        location_points = calculate_locations(
+            map_tiles,
+            seed=self.seed,
+            progress_callback=progress_bar.track_task(0.3, 0.6, "Generating locations..."),
+            landmasses=landmasses,
+        )
+        return map_tiles, landmasses, location_points
+
+    def _show_map_previews(self, progress_bar: ProgressBar, map_size):
+        # Show a rough picture of the map right away and refine it before generating the map itself
+        progress_bar.set_progress(0.0, "Sketching map...")
+        for preview_tiles in generate_map_previews(map_size, map_size, seed=self.seed):
+            progress_bar.set_preview(MapTile.get_rgb_image(preview_tiles))
+
+    def _generate_chunked_world(self, progress_bar: ProgressBar, map_size) -> List[tuple[int, int]]:
+        self._show_map_previews(progress_bar, map_size)
+
+        progress_bar.set_progress(0.05, "Estimating terrain...")
+        self.world_chunks = WorldChunks(map_size, self.seed)
+
+        location_points = self.world_chunks.calculate_locations(
+            progress_callback=progress_bar.track_task(0.1, 0.6, "Generating locations...")
+        )
+
+        # Tiles, regions and borders are only kept for the loaded chunks, so the landmasses of the whole map are unknown
+        self.landmasses = None
+        self._tile_index = None
+        self.map_tiles = None
+        self.region_matrix = None
+        self.border_points = None
+        self.border_offsets = None
+        self.region_adjacency = None
+        self.region_statistics = None
+        return location_points
+
+    def _calculate_levels(self):
+        # The level of a location is the number of roads between it and the starting location. Locations that cannot
+        # be reached keep their level.
+        number_of_locations = len(self.locations)
+        neighbor_graph = csr_matrix(
+            (numpy.ones(len(self.neighbor_indices)), self.neighbor_indices, self.neighbor_offsets),
+            shape=(number_of_locations, number_of_locations),
+        )
+        distances = shortest_path(neighbor_graph, unweighted=True, indices=self.starting_location.id)
+        is_reachable = numpy.isfinite(distances)
+        self.location_table.set_levels(numpy.flatnonzero(is_reachable), distances[is_reachable])
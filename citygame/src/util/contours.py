@@ -0,0 +1,168 @@
+"""
+Contour polylines of the regions of a map.
+
+The outline of a region is traced with marching squares: every square of four neighbouring tiles that has tiles both
+inside and outside of the region gets a line segment between the midpoints of its sides where the region starts or
+ends. Segments are oriented so the region is always on the same side, which links them into closed polylines without
+ambiguity. The polylines follow every step of the tiles, so they are then simplified with Douglas-Peucker, which drops
+points that are within a tolerance of the line between the points kept around them.
+"""
+
+from typing import List, Optional
+
+import numpy
+from numpy import ndarray
+
+from citygame.src.util.maps import MapWindow
+
+# Maximum distance in tiles between a simplified polyline and the contour it was simplified from
+CONTOUR_TOLERANCE = 0.5
+
+# Offsets of the midpoints of the sides of a square from its first corner. Side i goes from corner i to corner i + 1,
+# with the corners in the order (0, 0), (1, 0), (1, 1), (0, 1).
+_SIDE_MIDPOINTS = numpy.array([[0.5, 0.0], [1.0, 0.5], [0.5, 1.0], [0.0, 0.5]])
+
+
+def _build_segment_table() -> List[List[tuple[int, int]]]:
+    # Each run of corners inside of the region gets a segment from the side where the run starts to the side where it
+    # ends. Corners that only touch diagonally are separate runs, so regions are connected along the sides of tiles.
+    segment_table = []
+    for case in range(16):
+        is_inside = [bool(case & (1 << corner)) for corner in range(4)]
+        segments = []
+        for corner in range(4):
+            if is_inside[corner] and not is_inside[corner - 1]:
+                last_corner = corner
+                while is_inside[(last_corner + 1) % 4]:
+                    last_corner += 1
+                segments.append(((corner - 1) % 4, last_corner % 4))
+        segment_table.append(segments)
+    return segment_table
+
+
+_SEGMENT_TABLE = _build_segment_table()
+
+
+def trace_contours(mask: ndarray) -> List[ndarray]:
+    """
+    Traces the outlines of the areas of a mask.
+
+    Tiles outside of the mask count as outside of the areas, so every outline is closed. Tile (x, y) is at (x, y) and
+    outlines run halfway between the tiles inside and outside of an area.
+
+    Returns:
+        A closed polyline of shape (points, 2) for every outline. The last point connects back to the first point.
+    """
+    padded_mask = numpy.pad(mask.astype(numpy.uint8), 1)
+    cases = padded_mask[:-1, :-1] | padded_mask[1:, :-1] << 1 | padded_mask[1:, 1:] << 2 | padded_mask[:-1, 1:] << 3
+
+    # Only the squares with tiles both inside and outside of an area have segments. The first corner of square (x, y)
+    # of the padded mask is tile (x - 1, y - 1).
+    is_crossed = (cases != 0) & (cases != 15)
+    crossed_squares = numpy.argwhere(is_crossed) - 1
+    if len(crossed_squares) == 0:
+        return []
+    crossed_cases = cases[is_crossed]
+
+    starts = []
+    ends = []
+    for case in numpy.unique(crossed_cases).tolist():
+        squares = crossed_squares[crossed_cases == case]
+        for start_side, end_side in _SEGMENT_TABLE[case]:
+            starts.append(squares + _SIDE_MIDPOINTS[start_side])
+            ends.append(squares + _SIDE_MIDPOINTS[end_side])
+    starts = numpy.concatenate(starts)
+    ends = numpy.concatenate(ends)
+
+    # Every midpoint starts exactly one segment, so the next segment is the one starting where a segment ends
+    start_keys = _get_point_keys(starts, mask.shape[1])
+    start_order = numpy.argsort(start_keys)
+    next_segments = start_order[numpy.searchsorted(start_keys[start_order], _get_point_keys(ends, mask.shape[1]))]
+
+    polylines = []
+    is_traced = numpy.zeros(len(starts), dtype=bool)
+    next_segments = next_segments.tolist()
+    for first_segment in range(len(starts)):
+        if is_traced[first_segment]:
+            continue
+
+        polyline_segments = []
+        segment = first_segment
+        while not is_traced[segment]:
+            is_traced[segment] = True
+            polyline_segments.append(segment)
+            segment = next_segments[segment]
+        polylines.append(starts[polyline_segments])
+
+    return polylines
+
+
+def _get_point_keys(points: ndarray, height: int) -> ndarray:
+    # Midpoints are on a grid of half tiles from (-0.5, -0.5) to (width - 0.5, height - 0.5)
+    doubled_points = numpy.rint(points * 2).astype(numpy.int64) + 1
+    return doubled_points[:, 0] * (2 * height + 1) + doubled_points[:, 1]
+
+
+def simplify_polyline(points: ndarray, tolerance: float = CONTOUR_TOLERANCE, closed: bool = True) -> ndarray:
+    """
+    Simplifies a polyline with Douglas-Peucker, keeping its first point and, for open polylines, its last point.
+
+    Closed polylines are split at the point furthest from the first point, and both halves are simplified as open
+    polylines.
+    """
+    if len(points) <= 2:
+        return points
+
+    if closed:
+        furthest_point = int(numpy.argmax(numpy.sum((points - points[0]) ** 2, axis=1)))
+        first_half = simplify_polyline(points[slice(furthest_point + 1)], tolerance, closed=False)
+        second_half = simplify_polyline(
+            numpy.concatenate((points[furthest_point:], points[:1])), tolerance, closed=False
+        )
+        return numpy.concatenate((first_half, second_half[1:-1]))
+
+    is_kept = numpy.zeros(len(points), dtype=bool)
+    is_kept[0] = is_kept[-1] = True
+    ranges = [(0, len(points) - 1)]
+    while len(ranges) > 0:
+        first, last = ranges.pop()
+        if last - first < 2:
+            continue
+
+        distances = _get_distances_to_line(points[slice(first + 1, last)], points[first], points[last])
+        furthest_point = int(numpy.argmax(distances))
+        if distances[furthest_point] > tolerance:
+            furthest_point += first + 1
+            is_kept[furthest_point] = True
+            ranges.append((first, furthest_point))
+            ranges.append((furthest_point, last))
+
+    return points[is_kept]
+
+
+def _get_distances_to_line(points: ndarray, line_start: ndarray, line_end: ndarray) -> ndarray:
+    line = line_end - line_start
+    length = numpy.hypot(*line)
+    offsets = points - line_start
+    if length == 0:
+        return numpy.hypot(offsets[:, 0], offsets[:, 1])
+    return numpy.abs(line[0] * offsets[:, 1] - line[1] * offsets[:, 0]) / length
+
+
+def trace_region_contours(
+    region_matrix: ndarray, region: int, window: Optional[MapWindow] = None, tolerance: float = CONTOUR_TOLERANCE
+) -> List[ndarray]:
+    """
+    Traces the simplified outlines of a region in a window of a map.
+
+    Args:
+        region_matrix: the regions of the window, indexed by [x - window.x_start][y - window.y_start]
+        region: the region to trace
+        window: the window of the map that the regions are of, or the whole map if not given
+        tolerance: the maximum distance between the simplified outlines and the tiles of the region
+
+    Returns:
+        A closed polyline of map coordinates of shape (points, 2) for every outline of the region
+    """
+    offset = (0, 0) if window is None else (window.x_start, window.y_start)
+    return [simplify_polyline(polyline, tolerance) + offset for polyline in trace_contours(region_matrix == region)]
@@ -0,0 +1,190 @@
+"""
+Hydraulic erosion of heightmaps.
+
+Water droplets start at random tiles and run downhill. A fast droplet going downhill picks up sediment, and a slow one
+or one going uphill drops it, which carves valleys and smooths slopes. Droplets are simulated in batches as arrays of
+particles, so every step of a batch is a handful of array operations instead of a loop over droplets. Droplets of a
+batch see the heights from the start of each step, not the changes of the other droplets in the same step.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy
+from numpy import ndarray
+
+LOG = logging.getLogger("maps")
+
+# Number of droplets simulated together. Larger batches are faster but use more memory.
+EROSION_BATCH_SIZE = 1 << 16
+# Minimum number of tiles for every droplet of a batch. Droplets of a batch that meet erode the same tiles without
+# seeing each other's changes, so crowded batches can dig runaway holes.
+TILES_PER_BATCH_DROPLET = 16
+
+
+@dataclass(frozen=True)
+class ErosionParameters:
+    """
+    Parameters of the droplet simulation.
+    """
+
+    # Number of droplets for every tile of the map
+    droplets_per_tile: float = 0.2
+    # Maximum number of steps of a droplet
+    lifetime: int = 30
+    # How much a droplet keeps its direction instead of following the slope, between 0 and 1
+    inertia: float = 0.05
+    # How much sediment a droplet can carry for its speed, water and slope
+    sediment_capacity_factor: float = 4.0
+    minimum_sediment_capacity: float = 0.01
+    # Share of the free capacity picked up and of the excess sediment dropped at each step
+    erode_speed: float = 0.3
+    deposit_speed: float = 0.3
+    # Share of the water that evaporates at each step
+    evaporate_speed: float = 0.01
+    gravity: float = 4.0
+
+
+def erode(heights: ndarray, seed: Optional[int] = None, parameters: ErosionParameters = ErosionParameters()):
+    """
+    Erodes a heightmap indexed by [x][y] in place.
+
+    Args:
+        heights: the heights, which must be C-contiguous. Memory-mapped heights work but are much slower.
+        seed: the seed of the droplet positions. The same seed and heights always erode the same way.
+        parameters: the parameters of the simulation
+    """
+    if not heights.flags.c_contiguous:
+        raise ValueError("Expected C-contiguous heights")
+
+    width, height = heights.shape
+    if width < 2 or height < 2:
+        return
+
+    random_generator = numpy.random.default_rng(seed)
+    droplets = int(width * height * parameters.droplets_per_tile)
+    LOG.info(f"Simulating {droplets} erosion droplets...")
+
+    maximum_batch_size = max(1, min(EROSION_BATCH_SIZE, width * height // TILES_PER_BATCH_DROPLET))
+    for batch_start in range(0, droplets, maximum_batch_size):
+        batch_size = min(maximum_batch_size, droplets - batch_start)
+        _simulate_droplets(heights, random_generator, batch_size, parameters)
+
+
+def _interpolate(flat_heights: ndarray, index: ndarray, height: int, x_offset: ndarray, y_offset: ndarray):
+    """
+    Returns the height and the gradient at points inside cells, from the heights at the four corners of each cell.
+    """
+    height_00 = flat_heights[index]
+    height_10 = flat_heights[index + height]
+    height_01 = flat_heights[index + 1]
+    height_11 = flat_heights[index + height + 1]
+
+    gradient_x = (height_10 - height_00) * (1 - y_offset) + (height_11 - height_01) * y_offset
+    gradient_y = (height_01 - height_00) * (1 - x_offset) + (height_11 - height_10) * x_offset
+    interpolated_height = height_00 * (1 - x_offset) * (1 - y_offset) + height_10 * x_offset * (1 - y_offset)
+    interpolated_height += height_01 * (1 - x_offset) * y_offset + height_11 * x_offset * y_offset
+    return interpolated_height, gradient_x, gradient_y
+
+
+def _simulate_droplets(
+    heights: ndarray, random_generator: numpy.random.Generator, droplets: int, parameters: ErosionParameters
+):
+    width, height = heights.shape
+    flat_heights = heights.reshape(-1)
+
+    # Droplets start inside a cell so the four corners of the cell are on the map
+    position_x = random_generator.uniform(0, width - 1, droplets)
+    position_y = random_generator.uniform(0, height - 1, droplets)
+    direction_x = numpy.zeros(droplets)
+    direction_y = numpy.zeros(droplets)
+    speed = numpy.ones(droplets)
+    water = numpy.ones(droplets)
+    sediment = numpy.zeros(droplets)
+
+    for _ in range(parameters.lifetime):
+        node_x = position_x.astype(numpy.int64)
+        node_y = position_y.astype(numpy.int64)
+        index = node_x * height + node_y
+        x_offset = position_x - node_x
+        y_offset = position_y - node_y
+        current_height, gradient_x, gradient_y = _interpolate(flat_heights, index, height, x_offset, y_offset)
+
+        # Follow the slope downhill, keeping some of the previous direction
+        direction_x = direction_x * parameters.inertia - gradient_x * (1 - parameters.inertia)
+        direction_y = direction_y * parameters.inertia - gradient_y * (1 - parameters.inertia)
+        length = numpy.hypot(direction_x, direction_y)
+        moving = length > 0
+        direction_x = numpy.divide(direction_x, length, out=numpy.zeros_like(direction_x), where=moving)
+        direction_y = numpy.divide(direction_y, length, out=numpy.zeros_like(direction_y), where=moving)
+        position_x = position_x + direction_x
+        position_y = position_y + direction_y
+
+        # Droplets that stop or leave the map are done
+        alive = moving & (position_x >= 0) & (position_x < width - 1) & (position_y >= 0) & (position_y < height - 1)
+        if not numpy.any(alive):
+            return
+        (
+            position_x,
+            position_y,
+            direction_x,
+            direction_y,
+            speed,
+            water,
+            sediment,
+            index,
+            x_offset,
+            y_offset,
+            current_height,
+        ) = (
+            values[alive]
+            for values in (
+                position_x,
+                position_y,
+                direction_x,
+                direction_y,
+                speed,
+                water,
+                sediment,
+                index,
+                x_offset,
+                y_offset,
+                current_height,
+            )
+        )
+
+        new_node_x = position_x.astype(numpy.int64)
+        new_node_y = position_y.astype(numpy.int64)
+        new_height = _interpolate(
+            flat_heights, new_node_x * height + new_node_y, height, position_x - new_node_x, position_y - new_node_y
+        )[0]
+        height_change = new_height - current_height
+
+        # Fast droplets with a lot of water going steeply downhill can carry the most sediment
+        capacity = numpy.maximum(
+            -height_change * speed * water * parameters.sediment_capacity_factor, parameters.minimum_sediment_capacity
+        )
+        depositing = (sediment > capacity) | (height_change > 0)
+        # Going uphill fills the pit behind the droplet up to its new height, if it has enough sediment
+        deposit = numpy.where(
+            height_change > 0,
+            numpy.minimum(height_change, sediment),
+            (sediment - capacity) * parameters.deposit_speed,
+        )
+        # Never erode more than the height change, so the droplet does not dig a hole behind it
+        erosion = numpy.minimum((capacity - sediment) * parameters.erode_speed, -height_change)
+        change = numpy.where(depositing, deposit, -erosion)
+        sediment = sediment - change
+
+        # Spread the change over the corners of the cell the droplet left
+        for corner_index, weight in (
+            (index, (1 - x_offset) * (1 - y_offset)),
+            (index + height, x_offset * (1 - y_offset)),
+            (index + 1, (1 - x_offset) * y_offset),
+            (index + height + 1, x_offset * y_offset),
+        ):
+            numpy.add.at(flat_heights, corner_index, (change * weight).astype(flat_heights.dtype))
+
+        speed = numpy.sqrt(numpy.maximum(speed * speed + height_change * parameters.gravity, 0))
+        water = water * (1 - parameters.evaporate_speed)
@@ -98,6 +98,11 @@ def get_rect_for_lines(
     return pygame.Rect(0, 0, max_x + border, max_y + border)
 
 
+def get_height_for_line_count(border: int, spacing: int, line_count: int, size: int, font=BASIC_FONT) -> int:
+    # Every line fits in the sized height of the font, so the lines themselves are not needed
+    return border * 2 + line_count * font.get_sized_height(size) + (line_count - 1) * spacing
+
+
 def render_with_outline(
     screen: Surface,
     font,
@@ -0,0 +1,65 @@
+"""
+Connected areas of land.
+
+Locations are placed on the landmass closest to the center of the map. Labelling the landmasses once lets placement,
+regions and borders skip the tiles of every other landmass, and the bounding box of a landmass limits the work to the
+part of the map it covers.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+from numpy import ndarray
+from scipy import ndimage
+
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.maps import MapWindow
+
+LOG = logging.getLogger("maps")
+
+# Label of the tiles that are not on any landmass
+NO_LANDMASS = 0
+
+
+@dataclass
+class Landmasses:
+    """
+    The landmasses of a map. Land tiles are connected to the four tiles next to them.
+
+    labels is indexed by [x][y] and has the landmass of every tile, numbered from 1, or NO_LANDMASS for water. The
+    bounding box of landmass i is bounding_boxes[i - 1].
+    """
+
+    labels: ndarray
+    bounding_boxes: List[MapWindow]
+
+    def __len__(self) -> int:
+        return len(self.bounding_boxes)
+
+    def get_landmass(self, x: int, y: int) -> int:
+        return int(self.labels[x, y])
+
+    def get_bounding_box(self, landmass: int) -> MapWindow:
+        return self.bounding_boxes[landmass - 1]
+
+    def get_mask(self, landmass: int, window: Optional[MapWindow] = None) -> ndarray:
+        """
+        Returns whether each tile of the window is on the landmass, indexed by [x - window.x_start][y - window.y_start].
+        The window is the whole map if not given.
+        """
+        if window is None:
+            window = MapWindow.full(*self.labels.shape)
+        return self.labels[window.slices] == landmass
+
+
+def label_landmasses(map_tiles: ndarray) -> Landmasses:
+    LOG.info("Labelling landmasses...")
+    labels, number_of_landmasses = ndimage.label(MapTile.get_land_mask(map_tiles))
+    bounding_boxes = [
+        MapWindow(x_slice.start, x_slice.stop, y_slice.start, y_slice.stop)
+        for x_slice, y_slice in ndimage.find_objects(labels)
+    ]
+    LOG.info(f"Landmasses found: {number_of_landmasses}")
+
+    return Landmasses(labels, bounding_boxes)
@@ -1,278 +1,500 @@
 import logging
 import math
-import multiprocessing
 import random
-from multiprocessing import Pool
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import Callable, List, Optional
 
 import numpy
-from PIL import Image
 from numpy import ndarray
+from scipy.spatial import cKDTree
 
 from citygame.src.constants.world_constants import DISTANCE_BETWEEN_LOCATIONS, MINIMUM_DISTANCE_BETWEEN_LOCATIONS
+from citygame.src.util.landmasses import Landmasses
 from citygame.src.util.map_tile import MapTile
-from citygame.src.util.maps import generate_map
+from citygame.src.util.maps import MapWindow, STREAMING_BAND_SIZE, split_into_row_bands
+from citygame.src.util.tile_index import TileIndex, find_nearest_buildable_tile
 
 LOG = logging.getLogger("maps")
 
+# Number of closest locations compared when assigning regions, so ties can go to the location with the highest index
+CLOSEST_LOCATION_CANDIDATES = 4
+
+# Distance from a location to the sides of the first window searched for its region when regions are calculated one
+# location at a time
+REGION_SEARCH_RADIUS = DISTANCE_BETWEEN_LOCATIONS
+
+# Region id used outside of the map when looking for borders. It differs from every region, including -1.
+OUTSIDE_OF_MAP_REGION = -2
+
+
+def _get_region_dtype(number_of_locations: int) -> type:
+    # Region ids are location indices, with -1 for tiles that are not in a region
+    return numpy.int16 if number_of_locations <= numpy.iinfo(numpy.int16).max else numpy.int32
+
+
+def _get_starting_landmass(locations: list[tuple[int, int]], landmasses: Optional[Landmasses]) -> Optional[int]:
+    # The first location is the starting location
+    if landmasses is None or len(locations) == 0:
+        return None
+    return landmasses.get_landmass(*locations[0])
+
+
+def _get_landmass_window(
+    locations: list[tuple[int, int]], landmasses: Optional[Landmasses], map_shape: tuple[int, int]
+) -> MapWindow:
+    """
+    Returns the bounding box of the landmass of the starting location, or the whole map if there are no landmasses.
+    """
+    starting_landmass = _get_starting_landmass(locations, landmasses)
+    if starting_landmass is None:
+        return MapWindow.full(*map_shape)
+    return landmasses.get_bounding_box(starting_landmass)
+
+
+def _split_window_into_row_bands(window: MapWindow, band_size: int) -> List[MapWindow]:
+    bands = split_into_row_bands(window.x_end - window.x_start, window.y_end - window.y_start, band_size)
+    return [
+        MapWindow(band.x_start + window.x_start, band.x_end + window.x_start, window.y_start, window.y_end)
+        for band in bands
+    ]
+
+
+def calculate_regions(
+    locations: list[tuple[int, int]],
+    map_tiles: ndarray,
+    output_path: Optional[str] = None,
+    landmasses: Optional[Landmasses] = None,
+) -> ndarray:
+    """
+    Assigns every land tile to the region of its closest location. Ties go to the location with the highest index.
+
+    Args:
+        locations: the points of the locations
+        map_tiles: the tiles of the map
+        output_path: stream the regions to a .npy file at this path one band of rows at a time instead of calculating
+            them in memory. The tiles can then be a memory-mapped file too.
+        landmasses: the landmasses of the map. Only the tiles on the landmass of the starting location are given a
+            region if they are given.
+
+    Returns:
+        A matrix of location indices indexed by [x][y], with -1 for tiles that are not in a region. It is a read-only
+        memory-mapped file if output_path was given.
+    """
+    LOG.info("Calculating regions...")
 
-def _find_closest_valid_position(starting_location, map_tiles) -> tuple[int, int]:
-    lx = starting_location[0]
-    ly = starting_location[1]
-
-    for i in range(1, map_tiles.shape[0] // 2 - 2):
-        # Upper and lower row
-        for x in range(lx - i, lx + i + 1):
-            location = (x, ly - i)
-            if _location_is_on_valid_tile(location, map_tiles):
-                return location
-
-            location = (x, ly + i)
-            if _location_is_on_valid_tile(location, map_tiles):
-                return location
-
-        # Left and right columns
-        for y in range(ly - i + 1, ly + i):
-            location = (lx - i, y)
-            if _location_is_on_valid_tile(location, map_tiles):
-                return location
-
-            location = (lx + i, y)
-            if _location_is_on_valid_tile(location, map_tiles):
-                return location
-
-
-def _location_is_too_close_to_existing_locations(new_location, existing_locations, minimum_distance: int) -> bool:
-    x1 = new_location[0]
-    y1 = new_location[1]
-
-    for existing_location in existing_locations:
-        x2 = existing_location[0]
-        y2 = existing_location[1]
-        distance = math.sqrt(math.pow(x2 - x1, 2) + math.pow(y2 - y1, 2))
-
-        if distance < minimum_distance:
-            return True
-
-    return False
-
-
-def _location_is_on_valid_tile(location, map_tiles: ndarray) -> bool:
-    return MapTile.is_buildable_tile(map_tiles[location[0]][location[1]])
-
-
-def _location_is_valid(
-    location, existing_locations, map_tiles: ndarray, minimum_distance_between_locations: int
-) -> bool:
-    # Do not check locations outside of the map
-    if location[0] < 0 or location[0] >= map_tiles.shape[0]:
-        return False
-    if location[1] < 0 or location[1] >= map_tiles.shape[1]:
-        return False
-
-    tile_valid = _location_is_on_valid_tile(location, map_tiles)
-    distance_valid = not _location_is_too_close_to_existing_locations(
-        location, existing_locations, minimum_distance_between_locations
-    )
-    return tile_valid and distance_valid
-
+    if output_path is not None:
+        return _calculate_regions_to_file(locations, map_tiles, output_path, landmasses)
 
-def calculate_regions(locations: list[tuple[int, int]], map_tiles: ndarray) -> ndarray:
-    LOG.info("Calculating regions...")
+    region_dtype = _get_region_dtype(len(locations))
+    region_matrix = numpy.full(map_tiles.shape, -1, dtype=region_dtype)
+    location_tree = cKDTree(numpy.asarray(locations).reshape(-1, 2))
+    starting_landmass = _get_starting_landmass(locations, landmasses)
 
-    region_matrix = numpy.zeros_like(map_tiles)
-    region_matrix.fill(-1)
-
-    # Set the minimum distance around each location so we don't have to calculate distance against all locations
-    for i in range(len(locations)):
-        location = locations[i]
-        minimum_distance_between_borders = MINIMUM_DISTANCE_BETWEEN_LOCATIONS // 2
-        starting_x = location[0] - minimum_distance_between_borders
-        starting_y = location[1] - minimum_distance_between_borders
-        for x in range(starting_x, starting_x + MINIMUM_DISTANCE_BETWEEN_LOCATIONS):
-            for y in range(starting_y, starting_y + MINIMUM_DISTANCE_BETWEEN_LOCATIONS):
-                if x < 0 or x >= map_tiles.shape[0] or y < 0 or y >= map_tiles.shape[1]:
-                    continue
-
-                if not MapTile.is_land(map_tiles[x][y]):
-                    continue
-
-                distance = math.sqrt(math.pow(x - location[0], 2) + math.pow(y - location[1], 2))
-                if distance < minimum_distance_between_borders:
-                    region_matrix[x][y] = i
-
-    # For the remaining tiles, calculate distance to all locations and pick the closest one
-    points_to_process = []
-    for x in range(region_matrix.shape[0]):
-        for y in range(region_matrix.shape[1]):
-            if MapTile.is_land(map_tiles[x][y]) and region_matrix[x][y] == -1:
-                points_to_process.append((x, y, locations, region_matrix))
-    with Pool(multiprocessing.cpu_count()) as p:
-        result = p.map(_calculate_region_for_point, points_to_process)
-        for i in range(len(result)):
-            point = points_to_process[i]
-            x = point[0]
-            y = point[1]
-            region_matrix[x][y] = result[i]
+    # Query the closest locations of a band of tiles at a time to bound the memory of the query results
+    landmass_window = _get_landmass_window(locations, landmasses, map_tiles.shape)
+    for band in _split_window_into_row_bands(landmass_window, STREAMING_BAND_SIZE):
+        region_matrix[band.slices] = _calculate_band_regions(
+            band, map_tiles, location_tree, starting_landmass, landmasses, region_dtype
+        )
 
     return region_matrix
 
 
-def _calculate_region_for_point(input_tuple: tuple[int, int, list[tuple[int, int]], ndarray]) -> int:
-    x = input_tuple[0]
-    y = input_tuple[1]
-    locations = input_tuple[2]
+def _calculate_band_regions(
+    band: MapWindow,
+    map_tiles: ndarray,
+    location_tree: cKDTree,
+    starting_landmass: Optional[int],
+    landmasses: Optional[Landmasses],
+    region_dtype: type,
+) -> ndarray:
+    if starting_landmass is None:
+        land_mask = MapTile.get_land_mask(map_tiles[band.slices])
+    else:
+        land_mask = landmasses.get_mask(starting_landmass, band)
+
+    band_regions = numpy.full(land_mask.shape, -1, dtype=region_dtype)
+    if location_tree.n > 0:
+        land_points = numpy.argwhere(land_mask) + (band.x_start, band.y_start)
+        band_regions[land_mask] = find_closest_locations(land_points, location_tree)
+    return band_regions
+
+
+def find_closest_locations(
+    points: ndarray, location_tree: cKDTree, candidates: int = CLOSEST_LOCATION_CANDIDATES
+) -> ndarray:
+    """
+    Returns the index of the closest location to each point. Ties go to the location with the highest index.
+    """
+    distances, indices = location_tree.query(points, k=min(candidates, location_tree.n))
+    if indices.ndim == 1:
+        return indices
+
+    # Of the candidates at the closest distance pick the one with the highest index
+    is_closest = distances == distances[:, :1]
+    closest_locations = numpy.max(numpy.where(is_closest, indices, -1), axis=1)
+
+    # Locations that were not candidates can be just as close when every candidate is, so compare more of them
+    is_tied = is_closest[:, -1]
+    if candidates < location_tree.n and numpy.any(is_tied):
+        closest_locations[is_tied] = find_closest_locations(
+            numpy.asarray(points)[is_tied], location_tree, candidates * 2
+        )
+    return closest_locations
+
+
+def _calculate_regions_to_file(
+    locations: list[tuple[int, int]], map_tiles: ndarray, output_path: str, landmasses: Optional[Landmasses]
+) -> ndarray:
+    region_dtype = _get_region_dtype(len(locations))
+    region_matrix = numpy.lib.format.open_memmap(output_path, mode="w+", dtype=region_dtype, shape=map_tiles.shape)
+    location_tree = cKDTree(numpy.asarray(locations).reshape(-1, 2))
+    starting_landmass = _get_starting_landmass(locations, landmasses)
+
+    for band in split_into_row_bands(*map_tiles.shape, STREAMING_BAND_SIZE):
+        region_matrix[band.slices] = _calculate_band_regions(
+            band, map_tiles, location_tree, starting_landmass, landmasses, region_dtype
+        )
+
+    region_matrix.flush()
+    del region_matrix
+    return numpy.load(output_path, mmap_mode="r")
+
+
+@dataclass
+class LocationRegion:
+    """
+    The region of one location, in a window of the map around the location that contains the whole region.
+
+    region_matrix is indexed by [x - window.x_start][y - window.y_start] and has the index of the location for the tiles
+    of the region and -1 for every other tile. border_points has the map coordinates of the tiles of the region that are
+    next to a tile of another region or the edge of the map.
+    """
+
+    window: MapWindow
+    region_matrix: ndarray
+    border_points: ndarray
+
+
+def calculate_location_region(
+    location_index: int,
+    location_tree: cKDTree,
+    get_land_mask: Callable[[MapWindow], ndarray],
+    width: int,
+    height: int,
+    bounding_box: Optional[MapWindow] = None,
+) -> LocationRegion:
+    """
+    Calculates the region of one location without calculating the regions of the rest of the map.
+
+    The tiles closest to a location form a convex area, and its land is the region. Windows around the location that
+    double in size are searched until the land of the area no longer reaches the sides of the window inside of the
+    bounding box. Ties go to the location with the highest index, like calculate_regions.
+
+    Args:
+        location_index: the index of the location
+        location_tree: a KD-tree of the points of every location
+        get_land_mask: returns whether each tile of a window can be in a region, like the land of the starting landmass
+        width: the width of the map
+        height: the height of the map
+        bounding_box: the window that every tile of a region is in, like the bounding box of the starting landmass. It
+            is the whole map if not given.
+    """
+    if bounding_box is None:
+        bounding_box = MapWindow.full(width, height)
+
+    x, y = location_tree.data[location_index].astype(int).tolist()
+    radius = REGION_SEARCH_RADIUS
+    while True:
+        window = MapWindow(
+            max(x - radius, bounding_box.x_start),
+            min(x + radius + 1, bounding_box.x_end),
+            max(y - radius, bounding_box.y_start),
+            min(y + radius + 1, bounding_box.y_end),
+        )
+        window_shape = (window.x_end - window.x_start, window.y_end - window.y_start)
+        window_points = numpy.argwhere(numpy.ones(window_shape, dtype=bool)) + (window.x_start, window.y_start)
+        is_closest = (find_closest_locations(window_points, location_tree) == location_index).reshape(window_shape)
+        is_in_region = is_closest & get_land_mask(window)
+
+        reaches_side = (
+            (window.x_start > bounding_box.x_start and numpy.any(is_in_region[0]))
+            or (window.x_end < bounding_box.x_end and numpy.any(is_in_region[-1]))
+            or (window.y_start > bounding_box.y_start and numpy.any(is_in_region[:, 0]))
+            or (window.y_end < bounding_box.y_end and numpy.any(is_in_region[:, -1]))
+        )
+        if not reaches_side:
+            break
+        radius *= 2
+
+    region_matrix = numpy.where(is_in_region, location_index, -1).astype(numpy.int32)
+    # The region is inside of the window, so only the sides of the window at the edge of the bounding box can touch it,
+    # and the tiles beyond those sides are never in the region
+    border_mask = calculate_padded_border_mask(numpy.pad(region_matrix, 1, constant_values=OUTSIDE_OF_MAP_REGION))
+    border_points = (numpy.argwhere(border_mask) + (window.x_start, window.y_start)).astype(numpy.int32)
+
+    return LocationRegion(window=window, region_matrix=region_matrix, border_points=border_points)
+
+
+def calculate_border_mask(region_matrix: ndarray, window: MapWindow) -> ndarray:
+    """
+    Finds the tiles of a window that are in a region and next to a tile of a different region. The edge of the map
+    counts as a different region.
+    """
+    width, height = region_matrix.shape
+    # Include the tiles just outside of the window, or pad with the outside of the map at its edges
+    halo_window = MapWindow(
+        max(window.x_start - 1, 0),
+        min(window.x_end + 1, width),
+        max(window.y_start - 1, 0),
+        min(window.y_end + 1, height),
+    )
+    padding = (
+        (int(window.x_start == 0), int(window.x_end == width)),
+        (int(window.y_start == 0), int(window.y_end == height)),
+    )
+    padded_regions = numpy.pad(region_matrix[halo_window.slices], padding, constant_values=OUTSIDE_OF_MAP_REGION)
+
+    return calculate_padded_border_mask(padded_regions)
+
+
+def calculate_padded_border_mask(padded_regions: ndarray) -> ndarray:
+    """
+    Finds the tiles in a region and next to a tile of a different region, ignoring the outermost tiles of the padded
+    regions. The result is two tiles smaller than the padded regions in each dimension.
+    """
+    regions = padded_regions[1:-1, 1:-1]
+    is_border = (
+        (regions != padded_regions[:-2, 1:-1])
+        | (regions != padded_regions[2:, 1:-1])
+        | (regions != padded_regions[1:-1, :-2])
+        | (regions != padded_regions[1:-1, 2:])
+    )
+    return is_border & (regions != -1)
 
-    nodes = numpy.asarray(locations)
-    distance_array = numpy.sum((nodes - (x, y)) ** 2, axis=1)
 
-    minimum_distance = distance_array[0]
-    chosen_index = 0
-    for i in range(len(locations)):
-        if distance_array[i] <= minimum_distance:
-            minimum_distance = distance_array[i]
-            chosen_index = i
+def calculate_border_arrays(
+    locations, region_matrix: ndarray, output_path: Optional[str] = None, landmasses: Optional[Landmasses] = None
+) -> tuple[ndarray, ndarray]:
+    """
+    Finds the border points of every region one band of rows at a time.
 
-    return chosen_index
+    The points of each region are sorted by x and then by y. Tiles at the edge of the map are always border points,
+    since the outside of the map counts as a different region.
 
+    Args:
+        locations: the points of the locations
+        region_matrix: the regions of the map, which can be a memory-mapped file
+        output_path: stream the border points to a .npy file at this path instead of keeping them in memory
+        landmasses: the landmasses of the map. Only the bounding box of the landmass of the starting location is
+            searched for borders if they are given.
 
-def calculate_borders(locations, region_matrix: ndarray) -> Dict[int, List[tuple[int, int]]]:
+    Returns:
+        The border points of every location one after another, and the offsets of each location in them. The border
+        points of location i are border_points[border_offsets[i]:border_offsets[i + 1]].
+    """
     LOG.info("Calculating borders...")
 
-    location_to_border_points = dict()
-
-    for i in range(len(locations)):
-        location_to_border_points[i] = []
-
-    for x in range(region_matrix.shape[0]):
-        for y in range(region_matrix.shape[1]):
-            if region_matrix[x][y] == -1:
-                continue
-
-            if _is_border_title(x, y, region_matrix):
-                location = region_matrix[x][y]
-                location_to_border_points[location].append((x, y))
-
-    return location_to_border_points
-
-
-def _is_border_title(x: int, y: int, region_matrix: ndarray) -> bool:
-    region = region_matrix[x][y]
-
-    if region_matrix[x - 1][y] != region:
-        return True
-    if region_matrix[x + 1][y] != region:
-        return True
-    if region_matrix[x][y - 1] != region:
-        return True
-    if region_matrix[x][y + 1] != region:
-        return True
-
-    return False
-
+    bands = _split_window_into_row_bands(
+        _get_landmass_window(locations, landmasses, region_matrix.shape), STREAMING_BAND_SIZE
+    )
 
-def calculate_locations(map_tiles: ndarray) -> list[tuple[int, int]]:
+    # Count the border points of each region first so each region's points can be written to their final place
+    border_counts = numpy.zeros(len(locations), dtype=numpy.int64)
+    for band in bands:
+        band_regions = region_matrix[band.slices][calculate_border_mask(region_matrix, band)]
+        border_counts += numpy.bincount(band_regions, minlength=len(locations))
+    border_offsets = numpy.concatenate(([0], numpy.cumsum(border_counts)))
+
+    border_points_shape = (int(border_offsets[-1]), 2)
+    if output_path is None:
+        border_points = numpy.empty(border_points_shape, dtype=numpy.int32)
+    else:
+        border_points = numpy.lib.format.open_memmap(
+            output_path, mode="w+", dtype=numpy.int32, shape=border_points_shape
+        )
+
+    next_positions = border_offsets[:-1].copy()
+    for band in bands:
+        border_mask = calculate_border_mask(region_matrix, band)
+        band_points = numpy.argwhere(border_mask) + (band.x_start, band.y_start)
+        band_regions = region_matrix[band.slices][border_mask]
+
+        # Group the points by region while keeping their order within each region
+        order = numpy.argsort(band_regions, kind="stable")
+        sorted_regions = band_regions[order]
+        band_counts = numpy.bincount(band_regions, minlength=len(locations))
+        ranks = numpy.arange(len(order)) - (numpy.cumsum(band_counts) - band_counts)[sorted_regions]
+        border_points[next_positions[sorted_regions] + ranks] = band_points[order]
+        next_positions += band_counts
+
+    if output_path is not None:
+        border_points.flush()
+        del border_points
+        border_points = numpy.load(output_path, mmap_mode="r")
+
+    return border_points, border_offsets
+
+
+def find_close_location_pairs(location_points, maximum_distance: float) -> ndarray:
+    """
+    Returns the pairs of locations that are less than the maximum distance apart, as an array of shape (pairs, 2) with
+    the smaller location index first.
+    """
+    location_points = numpy.asarray(location_points, dtype=numpy.int64).reshape(-1, 2)
+    pairs = cKDTree(location_points).query_pairs(maximum_distance, output_type="ndarray")
+
+    # The query includes the pairs exactly at the maximum distance
+    squared_distances = numpy.sum((location_points[pairs[:, 0]] - location_points[pairs[:, 1]]) ** 2, axis=1)
+    return pairs[squared_distances < maximum_distance**2]
+
+
+def calculate_locations(
+    map_tiles: ndarray,
+    seed: Optional[int] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    landmasses: Optional[Landmasses] = None,
+    tile_index: Optional[TileIndex] = None,
+) -> list[tuple[int, int]]:
+    """
+    Places locations on the buildable tiles of a map. If the landmasses are given, locations are only placed on the
+    landmass of the starting location.
+
+    The starting location is the buildable tile closest to the center of the map. It is looked up in the tile index of
+    the whole map if one is given, or searched for around the center otherwise.
+    """
+    width, height = map_tiles.shape
+    if tile_index is None:
+        starting_position = find_nearest_buildable_tile(
+            lambda window: map_tiles[window.slices], width, height, width // 2, height // 2
+        )
+    else:
+        starting_position = tile_index.get_nearest_buildable_tile(width // 2, height // 2)
+    if starting_position is None:
+        raise ValueError("The map has no buildable tiles")
+
+    buildable_mask = MapTile.get_buildable_mask(map_tiles)
+    if landmasses is not None:
+        buildable_mask &= landmasses.get_mask(landmasses.get_landmass(*starting_position))
+
+    return place_locations(buildable_mask, starting_position, seed, progress_callback)
+
+
+def place_locations(
+    buildable_mask,
+    starting_position: tuple[int, int],
+    seed: Optional[int] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+) -> list[tuple[int, int]]:
+    """
+    Places locations on the buildable tiles of a map.
+
+    Locations are placed like Poisson disk sampling: new locations are tried DISTANCE_BETWEEN_LOCATIONS away from a
+    random location that can still place new ones, and must be at least MINIMUM_DISTANCE_BETWEEN_LOCATIONS away from
+    every other location. Every placed location marks the tiles too close to it in a mask of the map, so checking a
+    candidate is one lookup whatever the number of locations around it. The mask needs one byte for every tile.
+
+    Args:
+        buildable_mask: whether each tile is buildable. Anything with a shape that can be indexed by [x, y] with arrays
+            of coordinates works, so the tiles do not all have to be generated up front.
+        starting_position: the buildable tile of the first location, which is the starting location
+        seed: the seed of the placement. The same seed always places the same locations.
+        progress_callback: called with the share of the placed locations that can no longer place new locations,
+            which only increases and reaches 1 when placement is done
+    """
     LOG.info("Generating locations...")
 
-    # Add an initial seed location close to the center of the map.
-    starting_point = (map_tiles.shape[0] // 2, map_tiles.shape[1] // 2)
-    closest_valid_starting_point = _find_closest_valid_position(starting_point, map_tiles)
-    locations = [closest_valid_starting_point]
+    # Use a separate generator so the same seed always places the same locations
+    random_generator = random.Random(seed)
+    width, height = buildable_mask.shape
+    too_close_mask = _TooCloseMask(width, height, MINIMUM_DISTANCE_BETWEEN_LOCATIONS)
+
+    # Add an initial seed location at the starting position
+    locations = [starting_position]
+    too_close_mask.add(*starting_position)
 
     # Some locations may be in a place where no further locations can be added from.
     # Those locations should no longer be used as seeds to generate new locations.
-    seed_locations = {closest_valid_starting_point}
+    seed_locations = [starting_position]
 
     # Constants to use when placing locations
     max_angle_iterations = 360
-    angle_increment = 2.0 * math.pi / max_angle_iterations
+    progress = 0.0
+    angle_offsets = numpy.arange(1, max_angle_iterations + 1) * (2.0 * math.pi / max_angle_iterations)
+    # Candidates at the angle offsets from angle 0, which are rotated to the random starting angle of each seed
+    candidate_cos = numpy.cos(angle_offsets) * DISTANCE_BETWEEN_LOCATIONS
+    candidate_sin = numpy.sin(angle_offsets) * DISTANCE_BETWEEN_LOCATIONS
+    # Candidates are DISTANCE_BETWEEN_LOCATIONS from the seed location give or take a tile, so seeds at least this far
+    # from the edges of the map never have candidates outside of it
+    edge_distance = DISTANCE_BETWEEN_LOCATIONS + 1
 
     # Keep generating locations as long as we have seeds to use
     while len(seed_locations) > 0:
         # Pick a random seed location to use as a start point
-        seed_location = random.choice(tuple(seed_locations))
-        seed_x = seed_location[0]
-        seed_y = seed_location[1]
-
-        # Start at a random angle and progressively add to the angle until we find a location that is valid or we run
-        # out of attempts.
-        angle = 2.0 * math.pi * random.random()
-        placed_new_location = False
-        for k in range(max_angle_iterations):
-            angle = (angle + angle_increment) % (2.0 * math.pi)
-            new_location_x = int(seed_x + math.cos(angle) * DISTANCE_BETWEEN_LOCATIONS)
-            new_location_y = int(seed_y - math.sin(angle) * DISTANCE_BETWEEN_LOCATIONS)
-            new_location = (new_location_x, new_location_y)
-
-            if _location_is_valid(new_location, locations, map_tiles, MINIMUM_DISTANCE_BETWEEN_LOCATIONS):
-                locations.append(new_location)
-                seed_locations.add(new_location)
-                placed_new_location = True
-                # We found a valid location so we don't need to continue adding to the angle
-                break
-
-        # If we did not find a valid location then this seed location is no longer able to place new locations.
-        # Remove it from the seed set so we don't try to use it again.
-        if not placed_new_location:
-            seed_locations.remove(seed_location)
+        seed_index = random_generator.randrange(len(seed_locations))
+        seed_x, seed_y = seed_locations[seed_index]
+
+        # Try every angle in turn starting at a random angle, and use the first candidate that is valid
+        angle = 2.0 * math.pi * random_generator.random()
+        angle_cos = math.cos(angle)
+        angle_sin = math.sin(angle)
+        # Truncate towards zero like int()
+        candidate_x = numpy.trunc(seed_x + candidate_cos * angle_cos - candidate_sin * angle_sin).astype(numpy.int32)
+        candidate_y = numpy.trunc(seed_y - candidate_sin * angle_cos - candidate_cos * angle_sin).astype(numpy.int32)
+
+        if edge_distance <= seed_x < width - edge_distance and edge_distance <= seed_y < height - edge_distance:
+            is_valid = too_close_mask.is_far_enough(candidate_x, candidate_y)
+        else:
+            is_valid = (candidate_x >= 0) & (candidate_x < width) & (candidate_y >= 0) & (candidate_y < height)
+            is_valid[is_valid] = too_close_mask.is_far_enough(candidate_x[is_valid], candidate_y[is_valid])
+        is_valid[is_valid] = buildable_mask[candidate_x[is_valid], candidate_y[is_valid]]
+
+        first_valid = is_valid.argmax()
+        if is_valid[first_valid]:
+            new_location = (int(candidate_x[first_valid]), int(candidate_y[first_valid]))
+            locations.append(new_location)
+            too_close_mask.add(*new_location)
+            seed_locations.append(new_location)
+        else:
+            # If we did not find a valid location then this seed location is no longer able to place new locations.
+            # Remove it from the seeds by moving the last seed into its place, so we don't try to use it again.
+            seed_locations[seed_index] = seed_locations[-1]
+            seed_locations.pop()
+
+            if progress_callback is not None:
+                progress = max(progress, 1.0 - len(seed_locations) / len(locations))
+                progress_callback(progress)
 
     LOG.info(f"Locations placed: {len(locations)}")
 
     return locations
 
 
-def main():
-    size = 500
-    map_tiles = generate_map(size, size)
-
-    locations = calculate_locations(map_tiles)
-    region_matrix = calculate_regions(locations, map_tiles)
-    borders = calculate_borders(locations, region_matrix)
-
-    LOG.info("Done!")
-
-    # Visualize locations
-    for location in locations:
-        map_tiles[location[0]][location[1]] = 99
-        map_tiles[location[0]][location[1] + 1] = 99
-        map_tiles[location[0]][location[1] - 1] = 99
-        map_tiles[location[0] + 1][location[1]] = 99
-        map_tiles[location[0] - 1][location[1]] = 99
-
-    rgb_value_matrix = numpy.zeros(map_tiles.shape + (3,))
-    for x in range(rgb_value_matrix.shape[0]):
-        for y in range(rgb_value_matrix.shape[1]):
-            rgb_value_matrix[x][y] = MapTile.get_rgb_value(map_tiles[x][y])
-
-    image = Image.fromarray(rgb_value_matrix.astype("uint8"), "RGB")
-    image.show()
-
-    # Visualize regions
-    color_list = []
-    for i in range(len(locations)):
-        color_list.append([random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)])
-
-    color_matrix = numpy.zeros(region_matrix.shape + (3,))
-    for x in range(region_matrix.shape[0]):
-        for y in range(region_matrix.shape[1]):
-            region = region_matrix[x][y]
-            if region == -1:
-                color_matrix[x][y] = MapTile.get_rgb_value(MapTile.DEEP_WATER.value)
-            else:
-                color_matrix[x][y] = color_list[region]
-
-    color_list = []
-    for i in range(len(locations)):
-        color_list.append([random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)])
-    for location, border_points in borders.items():
-        color = color_list[location]
-        for border_point in border_points:
-            color_matrix[border_point[0]][border_point[1]] = color
-
-    image = Image.fromarray(color_matrix.astype("uint8"), "RGB")
-    image.show()
-
-
-if __name__ == "__main__":
-    logging.basicConfig(level=logging.INFO)
-    main()
+class _TooCloseMask:
+    """
+    Whether each tile of a map is less than a minimum distance from one of the points added so far.
+    """
+
+    def __init__(self, width: int, height: int, minimum_distance: int):
+        self.minimum_distance = minimum_distance
+        self._is_too_close = numpy.zeros((width, height), dtype=bool)
+        # The tiles less than the minimum distance from the tile at the center of the disk
+        offsets = numpy.arange(-minimum_distance, minimum_distance + 1)
+        self._disk = numpy.square(offsets[:, None]) + numpy.square(offsets[None, :]) < minimum_distance**2
+
+    def add(self, x: int, y: int):
+        width, height = self._is_too_close.shape
+        radius = self.minimum_distance
+        window = MapWindow(
+            max(x - radius, 0), min(x + radius + 1, width), max(y - radius, 0), min(y + radius + 1, height)
+        )
+        disk_window = MapWindow(
+            window.x_start - x + radius,
+            window.x_end - x + radius,
+            window.y_start - y + radius,
+            window.y_end - y + radius,
+        )
+        self._is_too_close[window.slices] |= self._disk[disk_window.slices]
+
+    def is_far_enough(self, x: ndarray, y: ndarray) -> ndarray:
+        return ~self._is_too_close[x, y]
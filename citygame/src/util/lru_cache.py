@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, TypeVar
+
+V = TypeVar("V")
+
+
+class LruCache(Generic[V]):
+    """
+    Keeps the most recently used values up to a maximum number, evicting the least recently used value first.
+
+    Values are created on first use, so the cache is pickled empty.
+    """
+
+    def __init__(self, maximum_size: int):
+        if maximum_size <= 0:
+            raise ValueError("Expected maximum_size > 0")
+
+        self.maximum_size = maximum_size
+        self._values: OrderedDict[Hashable, V] = OrderedDict()
+
+    def get(self, key: Hashable, create_value: Callable[[], V]) -> V:
+        """
+        Returns the value of the key, creating it with create_value if it is not cached.
+        """
+        if key in self._values:
+            self._values.move_to_end(key)
+            return self._values[key]
+
+        value = create_value()
+        self._values[key] = value
+        while len(self._values) > self.maximum_size:
+            self._values.popitem(last=False)
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_values"] = OrderedDict()
+        return state
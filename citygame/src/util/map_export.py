@@ -0,0 +1,152 @@
+"""
+Export of worlds to PNG images.
+
+Each layer of a world is drawn and written one strip of image rows at a time, so exporting a huge world only needs
+memory for a strip of it. The world is read from the world cache, and is prepared in the cache first if it is not there.
+Images have x going right and y going down, like the map in the game.
+"""
+
+import argparse
+import logging
+import os
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy
+from numpy import ndarray
+
+from citygame.src.constants.world_constants import DEFAULT_MAP_SIZE, LOCATION_DOT_RADIUS
+from citygame.src.util.locations import calculate_border_mask
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.maps import MapWindow
+from citygame.src.util.png_writer import PngWriter
+from citygame.src.util.world_cache import CachedWorld, load_world, prepare_world
+
+LOG = logging.getLogger("MapExport")
+
+# Number of image rows drawn and written at a time
+EXPORT_STRIP_ROWS = 256
+
+LOCATION_RGB_VALUE = [255, 0, 0]
+
+TILES_LAYER = "tiles"
+REGIONS_LAYER = "regions"
+BORDERS_LAYER = "borders"
+LOCATIONS_LAYER = "locations"
+EXPORT_LAYERS = (TILES_LAYER, REGIONS_LAYER, BORDERS_LAYER, LOCATIONS_LAYER)
+
+
+def get_region_palette(number_of_locations: int, seed: Optional[int] = None) -> ndarray:
+    """
+    Returns a random color for every region. The colors only depend on the seed.
+
+    Tiles that are not in a region have region -1, which is the last color: the color of deep water.
+    """
+    region_palette = numpy.random.default_rng(seed).integers(0, 256, (number_of_locations + 1, 3), dtype=numpy.uint8)
+    region_palette[-1] = MapTile.get_rgb_value(MapTile.DEEP_WATER.value)
+    return region_palette
+
+
+def _draw_tiles(world: CachedWorld, window: MapWindow, region_palette: ndarray) -> ndarray:
+    return MapTile.get_rgb_image(world.map_tiles[window.slices])
+
+
+def _draw_regions(world: CachedWorld, window: MapWindow, region_palette: ndarray) -> ndarray:
+    return region_palette[world.region_matrix[window.slices]]
+
+
+def _draw_borders(world: CachedWorld, window: MapWindow, region_palette: ndarray) -> ndarray:
+    image = _draw_tiles(world, window, region_palette)
+    border_mask = calculate_border_mask(world.region_matrix, window)
+    image[border_mask] = region_palette[world.region_matrix[window.slices][border_mask]]
+    return image
+
+
+def _draw_locations(world: CachedWorld, window: MapWindow, region_palette: ndarray) -> ndarray:
+    image = _draw_tiles(world, window, region_palette)
+
+    # Only the locations close enough to the window can have a dot in it
+    location_points = numpy.asarray(world.location_points).reshape(-1, 2)
+    is_close = (location_points[:, 1] >= window.y_start - LOCATION_DOT_RADIUS) & (
+        location_points[:, 1] < window.y_end + LOCATION_DOT_RADIUS
+    )
+    dot_points = (location_points[is_close][:, None, :] + _get_dot_offsets()[None, :, :]).reshape(-1, 2)
+
+    dot_points = dot_points[window.contains(dot_points)]
+    image[dot_points[:, 0] - window.x_start, dot_points[:, 1] - window.y_start] = LOCATION_RGB_VALUE
+    return image
+
+
+def _get_dot_offsets() -> ndarray:
+    # Offsets of the tiles in a location dot from the location
+    offsets = numpy.argwhere(numpy.ones((2 * LOCATION_DOT_RADIUS + 1,) * 2, dtype=bool)) - LOCATION_DOT_RADIUS
+    return offsets[numpy.sum(offsets**2, axis=1) <= LOCATION_DOT_RADIUS**2]
+
+
+_LAYER_DRAWERS: Dict[str, Callable[[CachedWorld, MapWindow, ndarray], ndarray]] = {
+    TILES_LAYER: _draw_tiles,
+    REGIONS_LAYER: _draw_regions,
+    BORDERS_LAYER: _draw_borders,
+    LOCATIONS_LAYER: _draw_locations,
+}
+
+
+def export_world(
+    world: CachedWorld,
+    output_directory: str,
+    layers: Sequence[str] = EXPORT_LAYERS,
+    seed: Optional[int] = None,
+    strip_rows: int = EXPORT_STRIP_ROWS,
+) -> List[str]:
+    """
+    Writes a PNG image of every layer of a world to the output directory, named after the layer.
+
+    Args:
+        world: the world to export. Its arrays can be memory-mapped files.
+        output_directory: the directory of the images, which must exist
+        layers: the layers to export
+        seed: the seed of the region colors
+        strip_rows: the number of image rows drawn at a time
+
+    Returns:
+        The paths of the images
+    """
+    width, height = world.map_tiles.shape
+    region_palette = get_region_palette(len(world.location_points), seed)
+
+    image_paths = []
+    for layer in layers:
+        image_path = os.path.join(output_directory, f"{layer}.png")
+        LOG.info(f"Exporting {layer} to {image_path}...")
+
+        draw_layer = _LAYER_DRAWERS[layer]
+        with PngWriter(image_path, width, height) as png_writer:
+            for y_start in range(0, height, strip_rows):
+                window = MapWindow(0, width, y_start, min(y_start + strip_rows, height))
+                # The images are indexed by [x][y], and the rows of a PNG go along x
+                png_writer.write_rows(draw_layer(world, window, region_palette).transpose(1, 0, 2))
+
+        image_paths.append(image_path)
+
+    return image_paths
+
+
+def main(arguments: Optional[List[str]] = None):
+    """
+    Exports a world, for example: python -m citygame export <seed> <map size> --output exports
+    """
+    parser = argparse.ArgumentParser(prog="python -m citygame export", description="Export a world to PNG images.")
+    parser.add_argument("seed", type=int, help="the seed of the world")
+    parser.add_argument("map_size", type=int, nargs="?", default=DEFAULT_MAP_SIZE, help="the size of the map")
+    parser.add_argument("--output", default=".", help="the directory to write the images to")
+    parser.add_argument(
+        "--layers", nargs="+", choices=EXPORT_LAYERS, default=list(EXPORT_LAYERS), help="the layers to export"
+    )
+    arguments = parser.parse_args(arguments)
+
+    world = load_world(arguments.seed, arguments.map_size, arguments.map_size)
+    if world is None:
+        prepare_world(arguments.seed, arguments.map_size, arguments.map_size)
+        world = load_world(arguments.seed, arguments.map_size, arguments.map_size)
+
+    os.makedirs(arguments.output, exist_ok=True)
+    export_world(world, arguments.output, arguments.layers, seed=arguments.seed)
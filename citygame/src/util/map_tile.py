@@ -1,5 +1,8 @@
 from enum import Enum, auto
-from typing import List, Union
+from typing import List, Sequence, Union
+
+import numpy
+from numpy import ndarray
 
 
 class MapTile(Enum):
@@ -10,55 +13,96 @@ class MapTile(Enum):
     FOREST = auto()
     MOUNTAIN = auto()
     SNOW = auto()
+    RIVER = auto()
 
     @staticmethod
     def get_rgb_value(tile: Union[int, float]) -> List[int]:
-        tile = int(tile)
-
-        if tile == MapTile.DEEP_WATER.value:
-            return [0, 62, 173]
-        elif tile == MapTile.SHALLOW_WATER.value:
-            return [9, 82, 200]
-        elif tile == MapTile.BEACH.value:
-            return [238, 214, 175]
-        elif tile == MapTile.GRASSLAND.value:
-            return [34, 139, 34]
-        elif tile == MapTile.FOREST.value:
-            return [0, 100, 0]
-        elif tile == MapTile.MOUNTAIN.value:
-            return [139, 137, 137]
-        elif tile == MapTile.SNOW.value:
-            return [255, 250, 250]
-        else:
-            return [255, 0, 0]
+        return TILE_PALETTE[_get_lookup_index(tile)].tolist()
 
     @staticmethod
     def is_buildable_tile(tile: Union[int, float]) -> bool:
-        tile = int(tile)
-
-        if tile == MapTile.DEEP_WATER.value:
-            return False
-        elif tile == MapTile.SHALLOW_WATER.value:
-            return False
-        elif tile == MapTile.BEACH.value:
-            return False
-        elif tile == MapTile.GRASSLAND.value:
-            return True
-        elif tile == MapTile.FOREST.value:
-            return True
-        elif tile == MapTile.MOUNTAIN.value:
-            return False
-        elif tile == MapTile.SNOW.value:
-            return False
-        else:
-            return False
+        return bool(BUILDABLE_MASK[_get_lookup_index(tile)])
 
     @staticmethod
     def is_land(tile: Union[int, float]) -> bool:
-        tile = int(tile)
+        return bool(LAND_MASK[_get_lookup_index(tile)])
+
+    @staticmethod
+    def get_movement_cost(tile: Union[int, float]) -> float:
+        return float(MOVEMENT_COST[_get_lookup_index(tile)])
+
+    @staticmethod
+    def get_rgb_image(map_tiles: ndarray) -> ndarray:
+        """
+        Returns the colors of a tile matrix as an array of RGB values with an extra last dimension of size 3.
+        """
+        return numpy.take(TILE_PALETTE, map_tiles, axis=0, mode="clip")
+
+    @staticmethod
+    def get_buildable_mask(map_tiles: ndarray) -> ndarray:
+        return numpy.take(BUILDABLE_MASK, map_tiles, mode="clip")
+
+    @staticmethod
+    def get_land_mask(map_tiles: ndarray) -> ndarray:
+        return numpy.take(LAND_MASK, map_tiles, mode="clip")
+
+    @staticmethod
+    def get_movement_cost_matrix(map_tiles: ndarray) -> ndarray:
+        """
+        Returns the cost of moving across every tile of a tile matrix, for road building and path finding.
+        """
+        return numpy.take(MOVEMENT_COST, map_tiles, mode="clip")
+
+    @staticmethod
+    def from_thresholds(values: ndarray, thresholds: Sequence[float], tiles: Sequence["MapTile"]) -> ndarray:
+        """
+        Converts values to tiles using increasing thresholds.
+
+        Values below the first threshold become the first tile and values at or above the last threshold become the last
+        tile. Values between thresholds i - 1 and i become tile i, so there must be one more tile than thresholds.
+        """
+        tile_values = numpy.array([tile.value for tile in tiles], dtype=numpy.uint8)
+        return tile_values[numpy.digitize(values, thresholds)]
+
+
+# Color of any value that is not a tile
+UNKNOWN_TILE_RGB_VALUE = [255, 0, 0]
+
+# Properties of each tile: color, is land, is buildable, movement cost. Rivers count as land so regions extend across
+# them, but crossing one costs a bridge or a ford. Open water cannot be crossed.
+_TILE_PROPERTIES = {
+    MapTile.DEEP_WATER: ([0, 62, 173], False, False, numpy.inf),
+    MapTile.SHALLOW_WATER: ([9, 82, 200], False, False, numpy.inf),
+    MapTile.BEACH: ([238, 214, 175], True, False, 1.5),
+    MapTile.GRASSLAND: ([34, 139, 34], True, True, 1.0),
+    MapTile.FOREST: ([0, 100, 0], True, True, 2.0),
+    MapTile.MOUNTAIN: ([139, 137, 137], True, False, 4.0),
+    MapTile.SNOW: ([255, 250, 250], True, False, 6.0),
+    MapTile.RIVER: ([64, 164, 223], True, False, 8.0),
+}
+
+# Index of the lookup arrays for values that are not a tile. Tile values start at 1, so the entry at index 0 is also an
+# unknown tile. Out of range values are clipped to one of the two.
+_UNKNOWN_TILE_INDEX = max(tile.value for tile in MapTile) + 1
+
+
+def _build_lookup_array(property_index: int, unknown_value, dtype) -> ndarray:
+    lookup_array = numpy.array([unknown_value] * (_UNKNOWN_TILE_INDEX + 1), dtype=dtype)
+    for tile, properties in _TILE_PROPERTIES.items():
+        lookup_array[tile.value] = properties[property_index]
+    return lookup_array
+
+
+# Lookup arrays indexed by tile value
+TILE_PALETTE = _build_lookup_array(0, UNKNOWN_TILE_RGB_VALUE, numpy.uint8)
+# Anything that is not water counts as land
+LAND_MASK = _build_lookup_array(1, True, bool)
+BUILDABLE_MASK = _build_lookup_array(2, False, bool)
+MOVEMENT_COST = _build_lookup_array(3, numpy.inf, numpy.float64)
+
 
-        if tile == MapTile.DEEP_WATER.value:
-            return False
-        elif tile == MapTile.SHALLOW_WATER.value:
-            return False
-        return True
+def _get_lookup_index(tile: Union[int, float]) -> int:
+    tile = int(tile)
+    if 0 < tile < _UNKNOWN_TILE_INDEX:
+        return tile
+    return _UNKNOWN_TILE_INDEX
@@ -1,29 +1,135 @@
 import logging
 import math
+import os
 import random
+import tempfile
+from dataclasses import dataclass
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Iterator, List, Optional
 
-import noise
 import numpy
-from PIL import Image
 from numpy.core.records import ndarray
 
+from citygame.src.constants.noise_mode_enum import NoiseMode
+from citygame.src.util.erosion import erode
 from citygame.src.util.map_tile import MapTile
+from citygame.src.util.rivers import calculate_rivers
+from citygame.src.util.simplex import snoise2_grid, snoise2_grid_multiresolution
 
 LOG = logging.getLogger("maps")
 
+NOISE_SCALE = 100.0
+NOISE_PERSISTENCE = 0.5
+NOISE_LACUNARITY = 2.0
+NOISE_REPEAT = 1048576
+
+# We need to ensure that we do not exceed the repeat value factoring in scale or the map could have repeated sections
+# which look odd.
+_MAXIMUM_NOISE_BASE = int(NOISE_REPEAT / NOISE_SCALE)
+
+# Size of the square chunks the map is split into when it is generated by multiple processes or in low-memory mode
+PARALLEL_CHUNK_SIZE = 256
+# Number of chunks each process needs to work on for a pool of processes to be worth starting. Smaller maps are
+# generated in the calling process, since starting the processes takes longer than generating them.
+MINIMUM_CHUNKS_PER_PROCESS = 4
+
+# Number of tiles in each band of rows when a map is streamed to disk
+STREAMING_BAND_SIZE = 1 << 20
+
+# Number of tiles sampled along each side of a map to estimate its terrain statistics
+TERRAIN_STATISTICS_SAMPLES = 512
+
+# Number of tiles along the longest side of the first and the last preview of a map being generated
+MAP_PREVIEW_MINIMUM_SIZE = 64
+MAP_PREVIEW_MAXIMUM_SIZE = 512
+
+# Share of the progress of generating a map taken by each stage
+NOISE_PROGRESS = 0.8
+GRADIENT_PROGRESS = 0.1
+
+# Height below which tiles are water
+WATER_THRESHOLD = -0.9
+
+# Types of the height and tile matrices of a map. Tile values are small so they always fit in a byte.
+HEIGHTS_DTYPE = numpy.float64
+LOW_MEMORY_HEIGHTS_DTYPE = numpy.float32
+TILES_DTYPE = numpy.uint8
+
+
+@dataclass(frozen=True)
+class MapWindow:
+    """
+    A rectangular part of a map. The end coordinates are exclusive.
+    """
+
+    x_start: int
+    x_end: int
+    y_start: int
+    y_end: int
+
+    @staticmethod
+    def full(width: int, height: int) -> "MapWindow":
+        return MapWindow(0, width, 0, height)
+
+    @property
+    def slices(self) -> tuple[slice, slice]:
+        return slice(self.x_start, self.x_end), slice(self.y_start, self.y_end)
+
+    def contains(self, points: ndarray) -> ndarray:
+        """
+        Returns whether each point of an array of shape (points, 2) is inside of the window.
+        """
+        return (
+            (points[:, 0] >= self.x_start)
+            & (points[:, 0] < self.x_end)
+            & (points[:, 1] >= self.y_start)
+            & (points[:, 1] < self.y_end)
+        )
+
+
+def split_into_row_bands(width: int, height: int, band_size: int) -> List[MapWindow]:
+    """
+    Splits a map into windows of whole rows with about band_size tiles each.
+
+    Rows are contiguous in memory, so working through a memory-mapped matrix one band at a time reads it in order.
+    """
+    rows_per_band = max(1, band_size // max(1, height))
+    return [
+        MapWindow(x_start, min(x_start + rows_per_band, width), 0, height) for x_start in range(0, width, rows_per_band)
+    ]
+
+
+def _split_into_windows(width: int, height: int, chunk_size: int) -> List[MapWindow]:
+    windows = []
+    for x_start in range(0, width, chunk_size):
+        for y_start in range(0, height, chunk_size):
+            windows.append(
+                MapWindow(x_start, min(x_start + chunk_size, width), y_start, min(y_start + chunk_size, height))
+            )
+    return windows
+
+
+def _generate_square_gradient(width: int, height: int, window: Optional[MapWindow] = None) -> ndarray:
+    window = window or MapWindow.full(width, height)
+    return _calculate_square_gradient(
+        width, height, numpy.arange(window.x_start, window.x_end), numpy.arange(window.y_start, window.y_end)
+    )
+
 
-def _generate_square_gradient(width: int, height: int) -> ndarray:
+def _calculate_square_gradient(width: int, height: int, x_indices: ndarray, y_indices: ndarray) -> ndarray:
     center_x = width // 2
     center_y = height // 2
-    gradient_matrix = numpy.zeros((width, height))
 
     # Generate a square gradient by using the maximum of the horizontal and vertical distance from the center.
-    for x in range(width):
-        for y in range(height):
-            gradient_matrix[x][y] = max(abs(x - center_x), abs(y - center_y))
+    gradient_matrix = numpy.maximum(
+        numpy.abs(x_indices - center_x)[:, None],
+        numpy.abs(y_indices - center_y)[None, :],
+    ).astype(float)
 
-    # Normalize the gradient values as floats between [0, 1]
-    normalized_gradient_matrix = gradient_matrix / numpy.max(gradient_matrix)
+    # Normalize the gradient values as floats between [0, 1]. The largest distance is always at the edge of the map.
+    maximum_distance = max(center_x, width - 1 - center_x, center_y, height - 1 - center_y)
+    normalized_gradient_matrix = gradient_matrix / maximum_distance
 
     # Square each value in the gradient so that the center of the map has very low values but the outer edges maintain
     # values close to 1.
@@ -35,44 +141,70 @@ def _generate_square_gradient(width: int, height: int) -> ndarray:
     return normalized_gradient_matrix
 
 
-def _generate_noise(width: int, height: int) -> ndarray:
-    noise_matrix = numpy.zeros((width, height))
+def generate_seed() -> int:
+    # Larger seeds would generate the same maps as smaller ones
+    return random.randint(0, _MAXIMUM_NOISE_BASE)
 
-    scale = 100.0
-    octaves = int(math.log(width, 2))
-    frequency = 0.5
-    amplitude = 2.0
-    repeat = 1048576
 
-    # We need to ensure that we do not exceed the repeat value factoring in scale or the map could have repeated
-    # sections which look odd.
-    base = random.randint(0, int(repeat / scale))
+def _generate_noise_base(seed: Optional[int] = None) -> int:
+    if seed is None:
+        seed = generate_seed()
+
+    base = seed % (_MAXIMUM_NOISE_BASE + 1)
     LOG.info(f"Map seed: {base}")
+    return base
+
+
+def _get_noise_arguments(width: int, base: int) -> dict:
+    return dict(
+        octaves=int(math.log(width, 2)),
+        persistence=NOISE_PERSISTENCE,
+        lacunarity=NOISE_LACUNARITY,
+        repeatx=NOISE_REPEAT,
+        repeaty=NOISE_REPEAT,
+        base=base,
+    )
 
-    for x in range(width):
-        for y in range(height):
-            noise_matrix[x][y] = noise._simplex.noise2(
-                x / scale,
-                y / scale,
-                octaves=octaves,
-                persistence=frequency,
-                lacunarity=amplitude,
-                repeatx=repeat,
-                repeaty=repeat,
-                base=base,
-            )
 
+def _generate_raw_noise(
+    width: int, height: int, base: int, noise_mode: NoiseMode, window: Optional[MapWindow] = None
+) -> ndarray:
+    """
+    Computes the noise of a window of the map before it is normalized.
+
+    Each value only depends on its position, so windows computed separately line up exactly with the whole map.
+    """
+    window = window or MapWindow.full(width, height)
+    noise_arguments = _get_noise_arguments(width, base)
+
+    # The exact mode matches calling noise._simplex.noise2 for every pixel
+    if noise_mode == NoiseMode.MULTI_RESOLUTION:
+        x_indices = range(window.x_start, window.x_end)
+        y_indices = range(window.y_start, window.y_end)
+        return snoise2_grid_multiresolution(x_indices, y_indices, NOISE_SCALE, **noise_arguments)
+
+    x_coordinates = numpy.arange(window.x_start, window.x_end) / NOISE_SCALE
+    y_coordinates = numpy.arange(window.y_start, window.y_end) / NOISE_SCALE
+    return snoise2_grid(x_coordinates, y_coordinates, **noise_arguments)
+
+
+def _normalize_noise(noise_matrix: ndarray, minimum: float, noise_range: float) -> ndarray:
     # Normalize the matrix values as floats between [-1, 1]
-    normalized_noise_matrix = 2.0 * (noise_matrix - numpy.min(noise_matrix)) / numpy.ptp(noise_matrix) - 1
+    return 2.0 * (noise_matrix - minimum) / noise_range - 1
 
-    return normalized_noise_matrix
 
+def _generate_noise(width: int, height: int, noise_mode: NoiseMode = NoiseMode.EXACT) -> ndarray:
+    noise_matrix = _generate_raw_noise(width, height, _generate_noise_base(), noise_mode)
+    return _normalize_noise(noise_matrix, numpy.min(noise_matrix), numpy.ptp(noise_matrix))
 
-def _calculate_tiles(noise_matrix: ndarray, water_threshold: float = -0.9) -> ndarray:
-    map_tiles = numpy.zeros(noise_matrix.shape)
 
+def _calculate_tiles(
+    noise_matrix: ndarray, water_threshold: float = WATER_THRESHOLD, max_height: Optional[float] = None
+) -> ndarray:
     # Calculate the maximum height as a reference point for the higher-level terrain
-    max_height = numpy.max(noise_matrix)
+    if max_height is None:
+        max_height = numpy.max(noise_matrix)
+    max_height = float(max_height)
 
     # Calculate tile threshold values once so we do not do it for every tile
     deep_water_threshold = water_threshold - 0.25
@@ -81,74 +213,511 @@ def _calculate_tiles(noise_matrix: ndarray, water_threshold: float = -0.9) -> nd
     snow_threshold = max_height - 0.3
     mountain_threshold = max_height - 0.6
 
-    for x in range(noise_matrix.shape[0]):
-        for y in range(noise_matrix.shape[1]):
-            # Default type
-            map_tiles[x][y] = MapTile.FOREST.value
-
-            # Lower-level terrain based on difference from the water threshold
-            if noise_matrix[x][y] < deep_water_threshold:
-                map_tiles[x][y] = MapTile.DEEP_WATER.value
-            elif noise_matrix[x][y] < water_threshold:
-                map_tiles[x][y] = MapTile.SHALLOW_WATER.value
-            elif noise_matrix[x][y] < beach_threshold:
-                map_tiles[x][y] = MapTile.BEACH.value
-            elif noise_matrix[x][y] < grassland_threshold:
-                map_tiles[x][y] = MapTile.GRASSLAND.value
-
-            # Higher level terrain based on difference from the maximum height
-            if noise_matrix[x][y] > snow_threshold:
-                map_tiles[x][y] = MapTile.SNOW.value
-            elif noise_matrix[x][y] > mountain_threshold:
-                map_tiles[x][y] = MapTile.MOUNTAIN.value
-
-    map_tiles = map_tiles.astype(int)
+    # Higher-level terrain wins over lower-level terrain, so no lower-level threshold can be above the mountain
+    # threshold. The higher-level tiles start above their threshold rather than at it.
+    mountain_threshold = numpy.nextafter(mountain_threshold, numpy.inf)
+    snow_threshold = numpy.nextafter(snow_threshold, numpy.inf)
+    lower_thresholds = numpy.minimum(
+        [deep_water_threshold, water_threshold, beach_threshold, grassland_threshold], mountain_threshold
+    )
+
+    map_tiles = MapTile.from_thresholds(
+        noise_matrix,
+        [*lower_thresholds, mountain_threshold, snow_threshold],
+        [
+            MapTile.DEEP_WATER,
+            MapTile.SHALLOW_WATER,
+            MapTile.BEACH,
+            MapTile.GRASSLAND,
+            MapTile.FOREST,
+            MapTile.MOUNTAIN,
+            MapTile.SNOW,
+        ],
+    )
+
     return map_tiles
 
 
 def _apply_gradient(noise_matrix: ndarray, gradient_matrix: ndarray) -> ndarray:
-    resulting_matrix = numpy.zeros_like(noise_matrix)
+    # Multiply by 2 to ensure the outer edges have very low values below the water threshold
+    return noise_matrix - (gradient_matrix * 2)
+
+
+@dataclass(frozen=True)
+class TerrainStatistics:
+    """
+    The statistics of a whole map that the tiles of every window depend on.
+    """
+
+    base: int
+    noise_minimum: float
+    noise_range: float
+    max_height: float
+
+
+def estimate_terrain_statistics(
+    width: int, height: int, noise_mode: NoiseMode = NoiseMode.EXACT, seed: Optional[int] = None
+) -> TerrainStatistics:
+    """
+    Estimates the terrain statistics of a map from the noise at an evenly spaced sample of its tiles, so windows of the
+    map can be generated without generating the rest of it.
+
+    The noise is smooth, so the estimates are close to the real statistics. Tiles right at the edge of a threshold can
+    still differ from a map generated in one piece. The exact noise is sampled in every noise mode.
+    """
+    base = _generate_noise_base(seed)
+    sample_step = max(1, max(width, height) // TERRAIN_STATISTICS_SAMPLES)
+    return _sample_terrain(width, height, base, sample_step)[1]
+
+
+def _sample_terrain(width: int, height: int, base: int, sample_step: int) -> tuple[ndarray, TerrainStatistics]:
+    """
+    Computes the heights of every sample_step-th tile along each side of a map and the terrain statistics of the
+    samples.
+    """
+    x_indices = numpy.arange(0, width, sample_step)
+    y_indices = numpy.arange(0, height, sample_step)
+
+    noise_matrix = snoise2_grid(x_indices / NOISE_SCALE, y_indices / NOISE_SCALE, **_get_noise_arguments(width, base))
+    noise_minimum = float(numpy.min(noise_matrix))
+    noise_range = float(numpy.ptp(noise_matrix))
+
+    noise_matrix = _normalize_noise(noise_matrix, noise_minimum, noise_range)
+    heights = _apply_gradient(noise_matrix, _calculate_square_gradient(width, height, x_indices, y_indices))
+    return heights, TerrainStatistics(base, noise_minimum, noise_range, float(numpy.max(heights)))
+
+
+def generate_map_previews(
+    width: int,
+    height: int,
+    seed: Optional[int] = None,
+    minimum_size: int = MAP_PREVIEW_MINIMUM_SIZE,
+    maximum_size: int = MAP_PREVIEW_MAXIMUM_SIZE,
+) -> Iterator[ndarray]:
+    """
+    Generates previews of the tiles of a map from coarse to fine while the map itself is generated.
+
+    Each preview samples evenly spaced tiles of the map and has twice the resolution of the previous one, from about
+    minimum_size to at most maximum_size tiles along the longest side. The first preview is small enough to be ready
+    almost immediately. The exact noise is sampled in every noise mode. Previews skip at least every other tile, so the
+    map itself is never computed twice.
+    """
+    base = _generate_noise_base(seed)
+    longest_side = max(width, height)
+    sample_step = max(2, longest_side // minimum_size)
+    while True:
+        heights, statistics = _sample_terrain(width, height, base, sample_step)
+        yield _calculate_tiles(heights, max_height=statistics.max_height)
+
+        # Stop at the finest step that still skips tiles and fits the maximum size
+        if sample_step // 2 < 2 or math.ceil(longest_side / (sample_step // 2)) > maximum_size:
+            return
+        sample_step //= 2
+
+
+def generate_map_window(
+    width: int, height: int, window: MapWindow, statistics: TerrainStatistics, noise_mode: NoiseMode = NoiseMode.EXACT
+) -> ndarray:
+    """
+    Generates the tiles of one window of a map using statistics from estimate_terrain_statistics.
+
+    Every tile only depends on its position and the statistics, so separately generated windows line up exactly.
+    """
+    noise_matrix = _generate_raw_noise(width, height, statistics.base, noise_mode, window)
+    noise_matrix = _normalize_noise(noise_matrix, statistics.noise_minimum, statistics.noise_range)
+    heights = _apply_gradient(noise_matrix, _generate_square_gradient(width, height, window))
+    return _calculate_tiles(heights, max_height=statistics.max_height)
+
+
+def downsample_map(map_tiles: ndarray, maximum_size: int = MAP_PREVIEW_MAXIMUM_SIZE) -> ndarray:
+    """
+    Returns evenly spaced tiles of a map with at most maximum_size tiles along each side, for previews of the map.
+    """
+    step = max(1, math.ceil(max(map_tiles.shape) / maximum_size))
+    return numpy.asarray(map_tiles[::step, ::step])
+
+
+@dataclass
+class _TerrainTask:
+    """
+    Work for one window of a map that is generated by multiple processes.
+
+    The matrices are shared between the processes so only these parameters and the window statistics are pickled.
+    """
+
+    heights_memory_name: str
+    tiles_memory_name: str
+    heights_dtype: type
+    width: int
+    height: int
+    window: MapWindow
+    base: int
+    noise_mode: NoiseMode
+    noise_minimum: float = 0.0
+    noise_range: float = 1.0
+    max_height: float = 0.0
+
+
+def _generate_noise_in_window(
+    heights: ndarray, width: int, height: int, base: int, noise_mode: NoiseMode, window: MapWindow
+) -> tuple[float, float]:
+    noise_matrix = _generate_raw_noise(width, height, base, noise_mode, window)
+    heights[window.slices] = noise_matrix
+    return numpy.min(noise_matrix), numpy.max(noise_matrix)
+
+
+def _apply_gradient_in_window(
+    heights: ndarray, width: int, height: int, window: MapWindow, noise_minimum: float, noise_range: float
+) -> float:
+    noise_matrix = _normalize_noise(heights[window.slices], noise_minimum, noise_range)
+    square_gradient_matrix = _generate_square_gradient(width, height, window)
+    heights[window.slices] = _apply_gradient(noise_matrix, square_gradient_matrix)
+    return numpy.max(heights[window.slices])
+
+
+def _calculate_tiles_in_window(heights: ndarray, map_tiles: ndarray, window: MapWindow, max_height: float):
+    map_tiles[window.slices] = _calculate_tiles(heights[window.slices], max_height=max_height)
+
+
+def _attach_shared_matrix(memory_name: str, width: int, height: int, dtype) -> tuple[SharedMemory, ndarray]:
+    shared_memory = SharedMemory(name=memory_name)
+    return shared_memory, numpy.ndarray((width, height), dtype=dtype, buffer=shared_memory.buf)
+
+
+def _generate_noise_for_window(task: _TerrainTask) -> tuple[float, float]:
+    shared_memory, heights = _attach_shared_matrix(
+        task.heights_memory_name, task.width, task.height, task.heights_dtype
+    )
+    try:
+        noise_statistics = _generate_noise_in_window(
+            heights, task.width, task.height, task.base, task.noise_mode, task.window
+        )
+        del heights
+    finally:
+        shared_memory.close()
+
+    return noise_statistics
+
+
+def _apply_gradient_for_window(task: _TerrainTask) -> float:
+    shared_memory, heights = _attach_shared_matrix(
+        task.heights_memory_name, task.width, task.height, task.heights_dtype
+    )
+    try:
+        max_height = _apply_gradient_in_window(
+            heights, task.width, task.height, task.window, task.noise_minimum, task.noise_range
+        )
+        del heights
+    finally:
+        shared_memory.close()
+
+    return max_height
+
+
+def _calculate_tiles_for_window(task: _TerrainTask):
+    heights_memory, heights = _attach_shared_matrix(
+        task.heights_memory_name, task.width, task.height, task.heights_dtype
+    )
+    tiles_memory, map_tiles = _attach_shared_matrix(task.tiles_memory_name, task.width, task.height, TILES_DTYPE)
+    try:
+        _calculate_tiles_in_window(heights, map_tiles, task.window, task.max_height)
+        del heights, map_tiles
+    finally:
+        heights_memory.close()
+        tiles_memory.close()
+
+
+def _generate_map_in_parallel(
+    width: int,
+    height: int,
+    base: int,
+    noise_mode: NoiseMode,
+    windows: List[MapWindow],
+    processes: int,
+    heights_dtype: type,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    erosion: bool = False,
+    rivers: bool = False,
+) -> ndarray:
+    """
+    Generates the map tiles with a pool of processes that each work on separate windows of the map.
+
+    Every stage that needs a statistic of the whole map (the noise range and the maximum height) waits for all windows
+    to finish the previous stage. The output is identical to generating the map in a single process.
+    """
+    heights_memory = SharedMemory(create=True, size=width * height * numpy.dtype(heights_dtype).itemsize)
+    tiles_memory = SharedMemory(create=True, size=width * height * numpy.dtype(TILES_DTYPE).itemsize)
+    try:
+        tasks = [
+            _TerrainTask(heights_memory.name, tiles_memory.name, heights_dtype, width, height, window, base, noise_mode)
+            for window in windows
+        ]
+
+        with Pool(processes) as pool:
+            LOG.info("Generating noise...")
+            noise_statistics = _map_with_progress(
+                pool.imap, _generate_noise_for_window, tasks, progress_callback, 0.0, NOISE_PROGRESS
+            )
+            noise_minimum = min(statistics[0] for statistics in noise_statistics)
+            noise_maximum = max(statistics[1] for statistics in noise_statistics)
+
+            LOG.info("Applying gradient...")
+            for task in tasks:
+                task.noise_minimum = noise_minimum
+                task.noise_range = noise_maximum - noise_minimum
+            max_height = max(
+                _map_with_progress(
+                    pool.imap,
+                    _apply_gradient_for_window,
+                    tasks,
+                    progress_callback,
+                    NOISE_PROGRESS,
+                    NOISE_PROGRESS + GRADIENT_PROGRESS,
+                )
+            )
+
+            if erosion:
+                # Droplets run across windows, so the whole map is eroded by this process
+                heights = numpy.ndarray((width, height), dtype=heights_dtype, buffer=heights_memory.buf)
+                max_height = _erode_in_windows(heights, base, windows)
+                del heights
+
+            LOG.info("Calculating tiles...")
+            for task in tasks:
+                task.max_height = max_height
+            _map_with_progress(
+                pool.imap,
+                _calculate_tiles_for_window,
+                tasks,
+                progress_callback,
+                NOISE_PROGRESS + GRADIENT_PROGRESS,
+                1.0,
+            )
+
+        if rivers:
+            heights = numpy.ndarray((width, height), dtype=heights_dtype, buffer=heights_memory.buf)
+            shared_tiles = numpy.ndarray((width, height), dtype=TILES_DTYPE, buffer=tiles_memory.buf)
+            _add_rivers(heights, shared_tiles)
+            del heights, shared_tiles
+
+        map_tiles = numpy.ndarray((width, height), dtype=TILES_DTYPE, buffer=tiles_memory.buf).copy()
+    finally:
+        for shared_memory in (heights_memory, tiles_memory):
+            shared_memory.close()
+            shared_memory.unlink()
+
+    return map_tiles
 
-    for x in range(noise_matrix.shape[0]):
-        for y in range(noise_matrix.shape[1]):
-            # Multiply by 2 to ensure the outer edges have very low values below the water threshold
-            resulting_matrix[x][y] = noise_matrix[x][y] - (gradient_matrix[x][y] * 2)
 
-    return resulting_matrix
+def _generate_map_in_windows(
+    width: int,
+    height: int,
+    base: int,
+    noise_mode: NoiseMode,
+    windows: List[MapWindow],
+    heights: ndarray,
+    map_tiles: ndarray,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    erosion: bool = False,
+    rivers: bool = False,
+):
+    """
+    Generates the map tiles into map_tiles one window at a time.
+
+    Each stage works on one window of the heights in place, so the temporary matrices of a stage are the size of a
+    window instead of the whole map. The heights and tiles can be memory-mapped files.
+    """
+    LOG.info(f"Generating noise ({noise_mode.name})...")
+    noise_statistics = _map_with_progress(
+        map,
+        lambda window: _generate_noise_in_window(heights, width, height, base, noise_mode, window),
+        windows,
+        progress_callback,
+        0.0,
+        NOISE_PROGRESS,
+    )
+    noise_minimum = min(statistics[0] for statistics in noise_statistics)
+    noise_maximum = max(statistics[1] for statistics in noise_statistics)
 
+    LOG.info("Applying gradient...")
+    max_height = max(
+        _map_with_progress(
+            map,
+            lambda window: _apply_gradient_in_window(
+                heights, width, height, window, noise_minimum, noise_maximum - noise_minimum
+            ),
+            windows,
+            progress_callback,
+            NOISE_PROGRESS,
+            NOISE_PROGRESS + GRADIENT_PROGRESS,
+        )
+    )
+
+    if erosion:
+        max_height = _erode_in_windows(heights, base, windows)
 
-def generate_map(width: int, height: int) -> ndarray:
+    LOG.info("Calculating tiles...")
+    _map_with_progress(
+        map,
+        lambda window: _calculate_tiles_in_window(heights, map_tiles, window, max_height),
+        windows,
+        progress_callback,
+        NOISE_PROGRESS + GRADIENT_PROGRESS,
+        1.0,
+    )
+
+    if rivers:
+        _add_rivers(heights, map_tiles)
+
+
+def _erode_in_windows(heights: ndarray, base: int, windows: List[MapWindow]) -> float:
+    """
+    Erodes the whole map and returns its new maximum height, which is found one window at a time.
+    """
+    LOG.info("Eroding terrain...")
+    erode(heights, seed=base)
+    return max(numpy.max(heights[window.slices]) for window in windows)
+
+
+def _add_rivers(heights: ndarray, map_tiles: ndarray):
+    """
+    Turns the land tiles that enough of the map drains through into rivers.
+    """
+    LOG.info("Adding rivers...")
+    map_tiles[calculate_rivers(heights, WATER_THRESHOLD)] = MapTile.RIVER.value
+
+
+def _map_with_progress(
+    map_function: Callable,
+    function: Callable,
+    items: list,
+    progress_callback: Optional[Callable[[float], None]],
+    progress_start: float,
+    progress_end: float,
+) -> list:
+    """
+    Applies function to every item with map_function, reporting the progress from progress_start to progress_end as
+    the results come in.
+    """
+    results = []
+    for result in map_function(function, items):
+        results.append(result)
+        if progress_callback is not None:
+            progress_callback(progress_start + (progress_end - progress_start) * len(results) / len(items))
+    return results
+
+
+def _generate_map_to_file(
+    width: int,
+    height: int,
+    base: int,
+    noise_mode: NoiseMode,
+    heights_dtype: type,
+    output_path: str,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    erosion: bool = False,
+    rivers: bool = False,
+) -> ndarray:
+    """
+    Generates the map tiles into a .npy file one band of rows at a time.
+
+    The heights are kept in a temporary file next to the output, so neither matrix has to fit in memory.
+    """
+    windows = split_into_row_bands(width, height, STREAMING_BAND_SIZE)
+    with tempfile.TemporaryFile(dir=os.path.dirname(os.path.abspath(output_path))) as heights_file:
+        heights = numpy.memmap(heights_file, dtype=heights_dtype, mode="w+", shape=(width, height))
+        map_tiles = numpy.lib.format.open_memmap(output_path, mode="w+", dtype=TILES_DTYPE, shape=(width, height))
+        _generate_map_in_windows(
+            width, height, base, noise_mode, windows, heights, map_tiles, progress_callback, erosion, rivers
+        )
+        map_tiles.flush()
+        del heights, map_tiles
+
+    return numpy.load(output_path, mmap_mode="r")
+
+
+def generate_map(
+    width: int,
+    height: int,
+    noise_mode: NoiseMode = NoiseMode.EXACT,
+    processes: int = 1,
+    seed: Optional[int] = None,
+    low_memory: bool = False,
+    output_path: Optional[str] = None,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    erosion: bool = False,
+    rivers: bool = False,
+) -> ndarray:
+    """
+    Generates the tiles of a new map.
+
+    Args:
+        width: the width of the map
+        height: the height of the map
+        noise_mode: how the noise is computed
+        processes: the most processes to split the work across. Maps too small to give each process
+            MINIMUM_CHUNKS_PER_PROCESS chunks use fewer processes. The result does not depend on this value.
+        seed: the seed of the noise. The same seed always generates the same map. A random seed is used if not given.
+        low_memory: store the heights as float32 and work on one window of the map at a time. This uses several times
+            less memory, but tiles right at the edge of a threshold can differ from a map generated without it.
+        output_path: stream the map to a .npy file at this path one band of rows at a time instead of generating it in
+            memory. This allows maps larger than memory. The processes are not used in this mode.
+        progress_callback: called with the share of the map that has been generated, between 0 and 1, as the map is
+            generated. The map is generated one window at a time to report the progress, which does not change it.
+        erosion: erode the heights with water droplets before calculating the tiles, which carves valleys and
+            smooths coastlines and mountains. The erosion is seeded by the map seed, and does not depend on the
+            processes or on where the map is generated.
+        rivers: turn land tiles that a large part of the map drains through into rivers. The flow is calculated for
+            the whole map at once, so this needs several matrices the size of the map in memory even when streaming
+            the map.
+
+    Returns:
+        A matrix of MapTile values indexed by [x][y]. It is a read-only memory-mapped file if output_path was given.
+    """
     LOG.info(f"Creating new map with dimensions {width}x{height}")
-    LOG.info("Generating noise...")
-    noise_matrix = _generate_noise(width, height)
+    base = _generate_noise_base(seed)
+
+    windows = _split_into_windows(width, height, PARALLEL_CHUNK_SIZE)
+    heights_dtype = LOW_MEMORY_HEIGHTS_DTYPE if low_memory else HEIGHTS_DTYPE
+    if output_path is not None:
+        LOG.info(f"Streaming map to {output_path}...")
+        return _generate_map_to_file(
+            width, height, base, noise_mode, heights_dtype, output_path, progress_callback, erosion, rivers
+        )
+
+    processes = min(processes, len(windows) // MINIMUM_CHUNKS_PER_PROCESS)
+    if processes > 1:
+        LOG.info(f"Generating map with {processes} processes...")
+        return _generate_map_in_parallel(
+            width, height, base, noise_mode, windows, processes, heights_dtype, progress_callback, erosion, rivers
+        )
+
+    if low_memory or progress_callback is not None:
+        if low_memory:
+            LOG.info("Generating map in low-memory mode...")
+        map_tiles = numpy.empty((width, height), dtype=TILES_DTYPE)
+        heights = numpy.empty((width, height), dtype=heights_dtype)
+        _generate_map_in_windows(
+            width, height, base, noise_mode, windows, heights, map_tiles, progress_callback, erosion, rivers
+        )
+        return map_tiles
+
+    LOG.info(f"Generating noise ({noise_mode.name})...")
+    noise_matrix = _generate_raw_noise(width, height, base, noise_mode)
+    noise_matrix = _normalize_noise(noise_matrix, numpy.min(noise_matrix), numpy.ptp(noise_matrix))
     LOG.info("Generating gradient...")
     square_gradient_matrix = _generate_square_gradient(width, height)
     LOG.info("Applying gradient...")
     gradient_applied_matrix = _apply_gradient(noise_matrix, square_gradient_matrix)
+    if erosion:
+        LOG.info("Eroding terrain...")
+        erode(gradient_applied_matrix, seed=base)
     LOG.info("Calculating tiles...")
     map_tiles = _calculate_tiles(gradient_applied_matrix)
+    if rivers:
+        _add_rivers(gradient_applied_matrix, map_tiles)
 
     # If you want to save the map in a compressed form:
     # numpy.savez_compressed("map", map_tiles, fmt='%i')
 
     return map_tiles
-
-
-def main():
-    logging.basicConfig(level=logging.INFO)
-    size = 1024
-    map_tiles = generate_map(size, size)
-
-    LOG.info("Done!")
-
-    rgb_value_matrix = numpy.zeros(map_tiles.shape + (3,))
-    for x in range(rgb_value_matrix.shape[0]):
-        for y in range(rgb_value_matrix.shape[1]):
-            rgb_value_matrix[x][y] = MapTile.get_rgb_value(map_tiles[x][y])
-
-    image = Image.fromarray(rgb_value_matrix.astype("uint8"), "RGB")
-    image.show()
-
-
-if __name__ == "__main__":
-    main()
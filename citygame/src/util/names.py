@@ -0,0 +1,188 @@
+"""
+Names for the locations and heroes of a world.
+
+Names are made up one character at a time by a Markov model trained on example words: each character is picked with
+the probability that it follows the characters before it in the examples. Every name of a batch gets its next character
+in the same step, so making up many names takes one step per character instead of one per name.
+"""
+
+import itertools
+import logging
+import sys
+from typing import List, Optional, Sequence, Set
+
+import numpy
+from numpy import ndarray
+
+from citygame.src.constants.name_constants import (
+    HERO_NAME_VARIANTS,
+    HERO_NAME_WORDS,
+    LOCATION_NAME_VARIANTS,
+    LOCATION_NAME_WORDS,
+)
+
+LOG = logging.getLogger("names")
+
+# Number of characters before a character that the probability of the character depends on
+NAME_MODEL_ORDER = 2
+MINIMUM_NAME_LENGTH = 4
+MAXIMUM_NAME_LENGTH = 12
+
+# Number of entries of the table that the next character is drawn from for each context. Probabilities are rounded to
+# multiples of one over the size.
+SAMPLING_TABLE_SIZE = 1024
+
+# Number of names made up for each name that is needed, since names that are too short, too long or already used are
+# thrown away
+NAME_BATCH_OVERSAMPLING = 2
+# Number of batches of names made up before the names that are still needed are made from variants of the names. Fewer
+# batches are made up once the model runs out of names.
+MAXIMUM_NAME_BATCHES = 4
+
+# Character code of the end of a name, which is also used for the characters before the start and after the end
+_END = 0
+
+
+class NameModel:
+    """
+    Character-level Markov model of a list of words.
+
+    Characters are coded as their index in the alphabet plus one. The context of a character is the previous
+    NAME_MODEL_ORDER codes as one number in base len(alphabet) + 1. Each context has a table of SAMPLING_TABLE_SIZE
+    codes where each code appears as often as its probability, so the next code is the entry at a random index.
+
+    variants are format strings that make other names out of a name, which are used once the made-up names run out.
+    """
+
+    def __init__(self, words: Sequence[str], variants: Sequence[str] = (), order: int = NAME_MODEL_ORDER):
+        self.variants = variants
+        alphabet = sorted(set("".join(words)))
+        self._base = len(alphabet) + 1
+        self._number_of_contexts = self._base**order
+        # The end of a name is the character \0, which numpy drops from the end of strings
+        self._characters = numpy.array([_END] + [ord(character) for character in alphabet], dtype=numpy.uint8)
+        self._capital_characters = numpy.char.upper(self._characters.view("S1")).view(numpy.uint8)
+        if self._base**MAXIMUM_NAME_LENGTH >= numpy.iinfo(numpy.int64).max:
+            raise ValueError(f"Names of {len(alphabet)} characters are too long to be numbered")
+
+        codes = {character: code for code, character in enumerate(alphabet, start=1)}
+        counts = numpy.zeros((self._number_of_contexts, self._base))
+        for word in words:
+            context = 0
+            for code in [codes[character] for character in word] + [_END]:
+                counts[context, code] += 1
+                context = self._get_next_contexts(context, code)
+
+        # Contexts that never happen in the words are never reached, so they simply end the name
+        counts[numpy.sum(counts, axis=1) == 0, _END] = 1
+        cumulative_probabilities = numpy.cumsum(counts, axis=1) / numpy.sum(counts, axis=1, keepdims=True)
+        table_positions = (numpy.arange(SAMPLING_TABLE_SIZE) + 0.5) / SAMPLING_TABLE_SIZE
+        # The table of context i starts at i * SAMPLING_TABLE_SIZE
+        self._sampling_table = numpy.concatenate(
+            [numpy.searchsorted(probabilities, table_positions) for probabilities in cumulative_probabilities]
+        ).astype(numpy.uint8)
+
+    def _get_next_contexts(self, contexts, codes):
+        return (contexts * self._base + codes) % self._number_of_contexts
+
+    def generate(self, count: int, random_generator: numpy.random.Generator) -> ndarray:
+        """
+        Makes up names that are between MINIMUM_NAME_LENGTH and MAXIMUM_NAME_LENGTH characters long. Fewer than count
+        names are returned, since the others are too short or too long.
+
+        Returns:
+            The codes of the names, of shape (names, MAXIMUM_NAME_LENGTH) with _END after the end of each name. Names
+            can be repeated.
+        """
+        table_offsets = random_generator.integers(
+            0, SAMPLING_TABLE_SIZE, (MAXIMUM_NAME_LENGTH + 1, count), dtype=numpy.int64
+        )
+        codes = numpy.zeros((MAXIMUM_NAME_LENGTH + 1, count), dtype=numpy.uint8)
+        contexts = numpy.zeros(count, dtype=numpy.int64)
+        is_finished = numpy.zeros(count, dtype=bool)
+        for position in range(MAXIMUM_NAME_LENGTH + 1):
+            next_codes = self._sampling_table[contexts * SAMPLING_TABLE_SIZE + table_offsets[position]]
+            codes[position] = numpy.where(is_finished, _END, next_codes)
+            is_finished |= codes[position] == _END
+            contexts = self._get_next_contexts(contexts, codes[position])
+
+        # Names that did not end by the last position are too long
+        is_kept = (codes[MAXIMUM_NAME_LENGTH] == _END) & (codes[MINIMUM_NAME_LENGTH - 1] != _END)
+        return numpy.ascontiguousarray(codes[slice(MAXIMUM_NAME_LENGTH), is_kept].T)
+
+    def get_keys(self, codes: ndarray) -> ndarray:
+        """
+        Returns a number for each name that is different for every name.
+        """
+        keys = numpy.zeros(len(codes), dtype=numpy.int64)
+        for position in range(MAXIMUM_NAME_LENGTH):
+            keys = keys * self._base + codes[:, position]
+        return keys
+
+    def get_names(self, codes: ndarray) -> List[str]:
+        """
+        Returns the names as strings with the first letter in upper case.
+        """
+        characters = self._characters[codes]
+        characters[:, 0] = self._capital_characters[codes[:, 0]]
+        return characters.view(f"S{MAXIMUM_NAME_LENGTH}").ravel().astype(str).tolist()
+
+
+LOCATION_NAME_MODEL = NameModel(LOCATION_NAME_WORDS, LOCATION_NAME_VARIANTS)
+HERO_NAME_MODEL = NameModel(HERO_NAME_WORDS, HERO_NAME_VARIANTS)
+
+
+class NameGenerator:
+    """
+    Makes up names that are unique within a world. The same seed makes up the same names in the same order.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._random_generator = numpy.random.default_rng(seed)
+        self._used_names: Set[str] = set()
+
+    def generate(self, count: int, model: NameModel) -> List[str]:
+        """
+        Makes up names that have not been used before. Once the model stops making up new names, the rest are variants
+        of the names, and then numbered names.
+
+        The names are interned, since they are compared and hashed as often as the locations and heroes are.
+        """
+        names: List[str] = []
+        for _ in range(MAXIMUM_NAME_BATCHES):
+            if len(names) == count:
+                break
+
+            needed_names = count - len(names)
+            codes = model.generate(needed_names * NAME_BATCH_OVERSAMPLING, self._random_generator)
+            # Keep the first of each name in the order they were made up
+            _, first_indices = numpy.unique(model.get_keys(codes), return_index=True)
+            added_names = self._add_unused_names(names, model.get_names(codes[numpy.sort(first_indices)]), count)
+            # The model is running out of names once most of a batch are names that were already made up
+            if added_names < needed_names // 2:
+                break
+
+        made_up_names = list(names)
+        for variant in model.variants:
+            if len(names) == count:
+                break
+            self._add_unused_names(names, [variant.format(name) for name in made_up_names], count)
+
+        if len(names) < count:
+            LOG.info(f"Numbering {count - len(names)} names that could not be made up")
+            base_names = made_up_names if len(made_up_names) > 0 else ["Name"]
+            for number in itertools.count(2):
+                if len(names) == count:
+                    break
+                self._add_unused_names(names, [f"{name} {number}" for name in base_names], count)
+
+        return names
+
+    def _add_unused_names(self, names: List[str], candidates: List[str], count: int) -> int:
+        # Adds the candidates that are not used yet until there are count names, and returns the number added. The
+        # candidates must be different from each other.
+        unused_names = [candidate for candidate in candidates if candidate not in self._used_names]
+        added_names = [sys.intern(name) for name in unused_names[slice(count - len(names))]]
+        self._used_names.update(added_names)
+        names.extend(added_names)
+        return len(added_names)
@@ -3,7 +3,7 @@ import os.path
 import pathlib
 import sys
 
-from citygame.src.constants.game_constants import SAVE_FOLDER_NAME
+from citygame.src.constants.game_constants import SAVE_FOLDER_NAME, WORLD_CACHE_FOLDER_NAME
 
 LOG = logging.getLogger("PathsUtil")
 
@@ -24,3 +24,7 @@ def get_save_file_directory() -> str:
         LOG.warning("Could not determine OS!")
 
     return save_file_directory
+
+
+def get_world_cache_directory() -> str:
+    return os.path.join(get_save_file_directory(), WORLD_CACHE_FOLDER_NAME)
@@ -0,0 +1,81 @@
+"""
+PNG files written one strip of rows at a time.
+
+Pillow needs the whole image in memory to save it. A PNG is a header followed by one zlib stream of the image rows,
+which can be split across any number of chunks, so rows can be compressed and written as they are produced instead.
+"""
+
+import struct
+import zlib
+
+import numpy
+from numpy import ndarray
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# Color type of RGB images. Every image written has 8 bits per channel, no interlacing and the default compression and
+# filter methods.
+_RGB_COLOR_TYPE = 2
+
+
+class PngWriter:
+    """
+    Writes an RGB image to a PNG file from top to bottom.
+
+    The image rows are passed as arrays of shape (rows, width, 3). The file is only valid once every row was written
+    and the writer was closed.
+    """
+
+    def __init__(self, path: str, width: int, height: int, compression_level: int = 6):
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Invalid image size {width}x{height}")
+
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(compression_level)
+        self._file = open(path, "wb")
+
+        self._file.write(_PNG_SIGNATURE)
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, _RGB_COLOR_TYPE, 0, 0, 0))
+
+    def __enter__(self) -> "PngWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+
+    def write_rows(self, rows: ndarray):
+        if rows.ndim != 3 or rows.shape[1:] != (self.width, 3):
+            raise ValueError(f"Expected rows of shape (rows, {self.width}, 3), got {rows.shape}")
+        if self.rows_written + len(rows) > self.height:
+            raise ValueError(f"Image only has {self.height} rows")
+
+        # Every row starts with the filter type, which is 0 for no filtering
+        filtered_rows = numpy.zeros((len(rows), self.width * 3 + 1), dtype=numpy.uint8)
+        filtered_rows[:, 1:] = rows.reshape(len(rows), -1)
+        self._write_chunk(b"IDAT", self._compressor.compress(filtered_rows.tobytes()))
+        self.rows_written += len(rows)
+
+    def close(self):
+        if self._file.closed:
+            return
+
+        try:
+            if self.rows_written != self.height:
+                raise ValueError(f"Only {self.rows_written} of {self.height} rows were written")
+            self._write_chunk(b"IDAT", self._compressor.flush())
+            self._write_chunk(b"IEND", b"")
+        finally:
+            self._file.close()
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        # The compressor buffers its input, so it does not always have data to write
+        if chunk_type == b"IDAT" and len(data) == 0:
+            return
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
@@ -1,3 +1,8 @@
+from typing import Callable, Optional
+
+from numpy import ndarray
+
+
 class ProgressBar:
     """
     Class to track progress of a set of tasks.
@@ -7,6 +12,26 @@ class ProgressBar:
         self.current_task = ""
         self.progress = 0.0
 
+        # Picture of what is being created as RGB values indexed by [x][y], which is replaced as it gets more detailed
+        self.preview: Optional[ndarray] = None
+
     def set_progress(self, progress: float, current_task: str):
         self.progress = progress
         self.current_task = current_task
+
+    def track_task(self, start: float, end: float, current_task: str) -> Callable[[float], None]:
+        """
+        Starts a task that takes the progress from start to end.
+
+        Returns:
+            A callback that sets the progress of the task, between 0 and 1
+        """
+        self.set_progress(start, current_task)
+
+        def set_task_progress(task_progress: float):
+            self.set_progress(start + (end - start) * task_progress, current_task)
+
+        return set_task_progress
+
+    def set_preview(self, preview: ndarray):
+        self.preview = preview
@@ -0,0 +1,118 @@
+"""
+Adjacency of the regions of a map.
+
+Two regions are adjacent when a tile of one is next to a tile of the other. Comparing the region matrix with itself
+shifted by one tile along each axis finds every pair of neighbouring tiles in different regions at once, so the graph
+is built in one pass over the tiles whatever the number of regions.
+"""
+
+import logging
+from dataclasses import dataclass
+
+import numpy
+from numpy import ndarray
+
+from citygame.src.util.maps import STREAMING_BAND_SIZE, split_into_row_bands
+
+LOG = logging.getLogger("maps")
+
+
+@dataclass
+class RegionAdjacency:
+    """
+    The pairs of adjacent regions of a map.
+
+    pairs has shape (pairs, 2) with the smaller region first, sorted by the first and then the second region.
+    border_lengths has the number of tile sides that the regions of each pair share.
+    """
+
+    pairs: ndarray
+    border_lengths: ndarray
+
+    def get_neighbors(self, region: int) -> ndarray:
+        """
+        Returns the regions adjacent to a region, sorted.
+        """
+        return numpy.sort(
+            numpy.concatenate((self.pairs[self.pairs[:, 0] == region, 1], self.pairs[self.pairs[:, 1] == region, 0]))
+        )
+
+    def get_adjacency_arrays(self, number_of_regions: int) -> tuple[ndarray, ndarray]:
+        """
+        Returns the regions adjacent to every region as arrays in the format of build_adjacency_arrays.
+        """
+        return build_adjacency_arrays(self.pairs, number_of_regions)
+
+    def get_border_length(self, first_region: int, second_region: int) -> int:
+        """
+        Returns the number of tile sides shared by two regions, which is 0 if they are not adjacent.
+        """
+        pair = (min(first_region, second_region), max(first_region, second_region))
+        is_pair = (self.pairs[:, 0] == pair[0]) & (self.pairs[:, 1] == pair[1])
+        return int(numpy.sum(self.border_lengths[is_pair]))
+
+
+def build_adjacency_arrays(pairs: ndarray, number_of_nodes: int) -> tuple[ndarray, ndarray]:
+    """
+    Turns the pairs of an undirected graph into compressed sparse rows.
+
+    Args:
+        pairs: the pairs of adjacent nodes, of shape (pairs, 2). Each pair is only listed once.
+        number_of_nodes: the number of nodes of the graph
+
+    Returns:
+        The offsets and the neighbors, where the sorted neighbors of node i are
+        neighbors[offsets[i]:offsets[i + 1]]
+    """
+    pairs = numpy.asarray(pairs, dtype=numpy.int64).reshape(-1, 2)
+    directed_pairs = numpy.concatenate((pairs, pairs[:, ::-1]))
+    directed_pairs = directed_pairs[numpy.lexsort((directed_pairs[:, 1], directed_pairs[:, 0]))]
+    neighbor_counts = numpy.bincount(directed_pairs[:, 0], minlength=number_of_nodes)
+    offsets = numpy.concatenate(([0], numpy.cumsum(neighbor_counts))).astype(numpy.int64)
+    return offsets, directed_pairs[:, 1].astype(numpy.int32)
+
+
+def _get_pair_keys(regions: ndarray, shifted_regions: ndarray, number_of_regions: int) -> ndarray:
+    # Tiles that are not in a region have region -1 and are never adjacent to anything
+    is_pair = (regions != shifted_regions) & (regions != -1) & (shifted_regions != -1)
+    first_regions = regions[is_pair].astype(numpy.int64)
+    second_regions = shifted_regions[is_pair].astype(numpy.int64)
+    return numpy.minimum(first_regions, second_regions) * number_of_regions + numpy.maximum(
+        first_regions, second_regions
+    )
+
+
+def calculate_region_adjacency(region_matrix: ndarray, number_of_regions: int) -> RegionAdjacency:
+    """
+    Finds the pairs of adjacent regions and the length of the border between them one band of rows at a time.
+
+    Args:
+        region_matrix: the regions of the map indexed by [x][y], with -1 for tiles that are not in a region. It can be a
+            memory-mapped file.
+        number_of_regions: the number of regions, which is the number of locations
+    """
+    LOG.info("Calculating region adjacency...")
+    width, height = region_matrix.shape
+
+    band_keys = []
+    band_counts = []
+    for band in split_into_row_bands(width, height, STREAMING_BAND_SIZE):
+        # Include the first row of the next band so the pairs between the bands are found once
+        regions = numpy.asarray(region_matrix[slice(band.x_start, min(band.x_end + 1, width))])
+        band_regions = regions[slice(band.x_end - band.x_start)]
+        keys = numpy.concatenate(
+            (
+                _get_pair_keys(regions[:-1], regions[1:], number_of_regions),
+                _get_pair_keys(band_regions[:, :-1], band_regions[:, 1:], number_of_regions),
+            )
+        )
+        keys, counts = numpy.unique(keys, return_counts=True)
+        band_keys.append(keys)
+        band_counts.append(counts)
+
+    keys, inverse = numpy.unique(numpy.concatenate(band_keys), return_inverse=True)
+    border_lengths = numpy.bincount(inverse, weights=numpy.concatenate(band_counts), minlength=len(keys))
+    pairs = numpy.stack((keys // number_of_regions, keys % number_of_regions), axis=1).astype(numpy.int32)
+    LOG.info(f"Adjacent region pairs found: {len(pairs)}")
+
+    return RegionAdjacency(pairs=pairs, border_lengths=border_lengths.astype(numpy.int64))
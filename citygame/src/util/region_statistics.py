@@ -0,0 +1,142 @@
+"""
+Statistics of the terrain of every region of a map.
+
+Each statistic is a sum over the tiles of a region, so numpy.bincount with the regions as bins gets it for every region
+in one pass over the tiles. Bounding boxes are the minimum and maximum coordinates of each region instead.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy
+from numpy import ndarray
+
+from citygame.src.util.map_tile import MapTile, MOVEMENT_COST
+from citygame.src.util.maps import MapWindow, STREAMING_BAND_SIZE, split_into_row_bands
+
+LOG = logging.getLogger("maps")
+
+# Number of columns of the terrain counts, which are indexed by tile value like the lookup arrays of MapTile
+_TERRAIN_COLUMNS = len(MOVEMENT_COST)
+
+
+@dataclass
+class RegionStatistics:
+    """
+    The statistics of every region of a map, indexed by region.
+
+    areas has the number of tiles of each region, and terrain_counts has shape (regions, tile values) with the number of
+    tiles of each tile value. centroids has the average x and y of the tiles of each region. bounding_boxes has the
+    x_start, x_end, y_start and y_end of each region, with exclusive ends like MapWindow. Regions without tiles have a
+    centroid of NaN and an empty bounding box.
+    """
+
+    areas: ndarray
+    terrain_counts: ndarray
+    centroids: ndarray
+    bounding_boxes: ndarray
+
+    @staticmethod
+    def empty(number_of_regions: int) -> "RegionStatistics":
+        """
+        Returns the statistics of regions that do not have any tiles yet, which are filled in with set_region.
+        """
+        return RegionStatistics(
+            areas=numpy.zeros(number_of_regions, dtype=numpy.int64),
+            terrain_counts=numpy.zeros((number_of_regions, _TERRAIN_COLUMNS), dtype=numpy.int64),
+            centroids=numpy.full((number_of_regions, 2), numpy.nan),
+            bounding_boxes=numpy.zeros((number_of_regions, 4), dtype=numpy.int64),
+        )
+
+    def set_region(self, region: int, statistics: "RegionStatistics", statistics_region: int):
+        """
+        Replaces the statistics of a region with the statistics of a region of other statistics.
+        """
+        self.areas[region] = statistics.areas[statistics_region]
+        self.terrain_counts[region] = statistics.terrain_counts[statistics_region]
+        self.centroids[region] = statistics.centroids[statistics_region]
+        self.bounding_boxes[region] = statistics.bounding_boxes[statistics_region]
+
+    def get_terrain_count(self, region: int, tile: MapTile) -> int:
+        return int(self.terrain_counts[region, tile.value])
+
+    def get_terrain_shares(self, region: int) -> List[tuple[MapTile, float]]:
+        """
+        Returns the share of the tiles of a region that each tile makes up, from the largest share to the smallest.
+        Tiles that are not in the region are left out.
+        """
+        if self.areas[region] == 0:
+            return []
+
+        shares = [(tile, self.get_terrain_count(region, tile) / int(self.areas[region])) for tile in MapTile]
+        return sorted([(tile, share) for tile, share in shares if share > 0], key=lambda item: item[1], reverse=True)
+
+    def get_bounding_box(self, region: int) -> MapWindow:
+        return MapWindow(*self.bounding_boxes[region].tolist())
+
+    def get_average_movement_costs(self) -> ndarray:
+        """
+        Returns the average cost of moving across the tiles of each region, or NaN for regions without tiles.
+        """
+        # Regions only have land, so the infinite cost of water never counts
+        finite_costs = numpy.where(numpy.isfinite(MOVEMENT_COST), MOVEMENT_COST, 0)
+        with numpy.errstate(invalid="ignore", divide="ignore"):
+            return self.terrain_counts @ finite_costs / self.areas
+
+
+def calculate_region_statistics(
+    region_matrix: ndarray, map_tiles: ndarray, number_of_regions: int, window: Optional[MapWindow] = None
+) -> RegionStatistics:
+    """
+    Calculates the statistics of every region one band of rows at a time.
+
+    Args:
+        region_matrix: the regions of the map indexed by [x][y], with -1 for tiles that are not in a region. It can be a
+            memory-mapped file.
+        map_tiles: the tiles of the map, which can be a memory-mapped file
+        number_of_regions: the number of regions, which is the number of locations
+        window: the window of the map that the regions and tiles are of, or the whole map if not given. Centroids and
+            bounding boxes are in map coordinates.
+    """
+    LOG.info("Calculating region statistics...")
+    width, height = region_matrix.shape
+    offset = (0, 0) if window is None else (window.x_start, window.y_start)
+
+    terrain_counts = numpy.zeros(number_of_regions * _TERRAIN_COLUMNS, dtype=numpy.int64)
+    coordinate_sums = numpy.zeros((number_of_regions, 2))
+    minimum_coordinates = numpy.full((number_of_regions, 2), numpy.iinfo(numpy.int64).max)
+    maximum_coordinates = numpy.full((number_of_regions, 2), -1)
+    for band in split_into_row_bands(width, height, STREAMING_BAND_SIZE):
+        band_regions = numpy.asarray(region_matrix[band.slices])
+        is_in_region = band_regions != -1
+        regions = band_regions[is_in_region].astype(numpy.int64)
+        tiles = numpy.minimum(numpy.asarray(map_tiles[band.slices])[is_in_region], _TERRAIN_COLUMNS - 1)
+        coordinates = numpy.argwhere(is_in_region) + (band.x_start + offset[0], band.y_start + offset[1])
+
+        terrain_counts += numpy.bincount(
+            regions * _TERRAIN_COLUMNS + tiles, minlength=number_of_regions * _TERRAIN_COLUMNS
+        )
+        for axis in range(2):
+            coordinate_sums[:, axis] += numpy.bincount(
+                regions, weights=coordinates[:, axis], minlength=number_of_regions
+            )
+            numpy.minimum.at(minimum_coordinates[:, axis], regions, coordinates[:, axis])
+            numpy.maximum.at(maximum_coordinates[:, axis], regions, coordinates[:, axis])
+
+    terrain_counts = terrain_counts.reshape(number_of_regions, _TERRAIN_COLUMNS)
+    areas = numpy.sum(terrain_counts, axis=1)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        centroids = coordinate_sums / areas[:, None]
+
+    # Regions without tiles get the empty bounding box (0, 0, 0, 0)
+    has_tiles = areas > 0
+    bounding_boxes = numpy.zeros((number_of_regions, 4), dtype=numpy.int64)
+    bounding_boxes[has_tiles, 0] = minimum_coordinates[has_tiles, 0]
+    bounding_boxes[has_tiles, 1] = maximum_coordinates[has_tiles, 0] + 1
+    bounding_boxes[has_tiles, 2] = minimum_coordinates[has_tiles, 1]
+    bounding_boxes[has_tiles, 3] = maximum_coordinates[has_tiles, 1] + 1
+
+    return RegionStatistics(
+        areas=areas, terrain_counts=terrain_counts, centroids=centroids, bounding_boxes=bounding_boxes
+    )
@@ -0,0 +1,171 @@
+"""
+Rivers from the flow of water over heightmaps.
+
+Water runs off every land tile to its steepest downhill neighbour until it reaches an outlet, which is water or the
+edge of the map. Pits and flat areas would trap the water, so they are filled first with a priority-flood: starting
+from the outlets, tiles are visited from the lowest to the highest with a heap, and every tile that is lower than the
+tile it was reached from is raised just above it. Afterwards every land tile has a lower neighbour. The number of tiles
+that drain through each tile is then added up one wave of tiles at a time, and tiles draining enough of the map become
+rivers.
+"""
+
+import heapq
+import logging
+import math
+from array import array
+from collections import deque
+
+import numpy
+from numpy import ndarray
+
+LOG = logging.getLogger("maps")
+
+# Number of tiles that have to drain through a tile, including itself, for it to become a river
+RIVER_MINIMUM_DRAINAGE = 500
+
+# Offsets of the eight neighbours of a tile and the distance to each of them
+_NEIGHBOR_OFFSETS = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+_NEIGHBOR_DISTANCES = [math.hypot(x_offset, y_offset) for x_offset, y_offset in _NEIGHBOR_OFFSETS]
+
+
+def calculate_rivers(
+    heights: ndarray, water_threshold: float, minimum_drainage: int = RIVER_MINIMUM_DRAINAGE
+) -> ndarray:
+    """
+    Returns a mask indexed by [x][y] of the land tiles that rivers run through.
+
+    Args:
+        heights: the heights of the map. Tiles below the water threshold are water.
+        water_threshold: the height below which tiles are water
+        minimum_drainage: the number of tiles that have to drain through a tile for it to become a river
+    """
+    outlet_mask = heights < water_threshold
+    LOG.info("Filling depressions...")
+    filled_heights = fill_depressions(heights, outlet_mask)
+    LOG.info("Calculating flow...")
+    receivers = calculate_flow_directions(filled_heights, outlet_mask)
+    drainage = calculate_flow_accumulation(receivers, ~outlet_mask)
+    return (drainage >= minimum_drainage) & ~outlet_mask
+
+
+def _get_neighbor_slices(width: int, height: int, x_offset: int, y_offset: int) -> tuple[slice, slice]:
+    """
+    Returns the slices of a matrix padded by one tile that line up the neighbour at the offset with every tile.
+    """
+    return slice(1 + x_offset, 1 + x_offset + width), slice(1 + y_offset, 1 + y_offset + height)
+
+
+def fill_depressions(heights: ndarray, outlet_mask: ndarray) -> ndarray:
+    """
+    Raises the heights of pits and flat areas so every tile that is not an outlet has a strictly lower neighbour.
+
+    The heights of the outlets are not changed. Tiles that cannot reach an outlet drain off the edge of the map.
+
+    Returns:
+        The filled heights as float64, indexed by [x][y]
+    """
+    width, height = heights.shape
+    padded_height = height + 2
+
+    # Pad the map with outlets so the neighbours of a tile can be found without checking the edges of the map
+    closed = numpy.pad(outlet_mask, 1, constant_values=True)
+    filled = numpy.pad(heights.astype(numpy.float64), 1, constant_values=-numpy.inf)
+
+    # Start from the tiles next to an outlet
+    open_tiles = numpy.zeros_like(closed)
+    for x_offset, y_offset in _NEIGHBOR_OFFSETS:
+        if x_offset == 0 or y_offset == 0:
+            open_tiles[1:-1, 1:-1] |= closed[_get_neighbor_slices(width, height, x_offset, y_offset)]
+    open_tiles &= ~closed
+    open_indices = numpy.flatnonzero(open_tiles)
+
+    flat_closed = closed.reshape(-1)
+    flat_closed[open_indices] = True
+    heap = list(zip(filled.reshape(-1)[open_indices].tolist(), open_indices.tolist()))
+    heapq.heapify(heap)
+    closed = bytearray(flat_closed.tobytes())
+    # Arrays of doubles take a quarter of the memory of a list of floats
+    filled_values = array("d", filled.tobytes())
+    neighbor_offsets = (-padded_height, padded_height, -1, 1)
+
+    # Tiles raised to the level of a depression are visited in the order they were reached, which is cheaper than the
+    # heap and still visits them from the lowest to the highest
+    pits = deque()
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    nextafter = math.nextafter
+    infinity = math.inf
+    while heap or pits:
+        if pits:
+            index = pits.popleft()
+            level = filled_values[index]
+        else:
+            level, index = heappop(heap)
+
+        for offset in neighbor_offsets:
+            neighbor = index + offset
+            if closed[neighbor]:
+                continue
+            closed[neighbor] = True
+            if filled_values[neighbor] <= level:
+                filled_values[neighbor] = nextafter(level, infinity)
+                pits.append(neighbor)
+            else:
+                heappush(heap, (filled_values[neighbor], neighbor))
+
+    filled = numpy.frombuffer(filled_values, dtype=numpy.float64).reshape(width + 2, padded_height)
+    return filled[1:-1, 1:-1]
+
+
+def calculate_flow_directions(filled_heights: ndarray, outlet_mask: ndarray) -> ndarray:
+    """
+    Returns the flat index of the steepest downhill neighbour of every tile, or -1 for outlets and for tiles that drain
+    off the edge of the map.
+    """
+    width, height = filled_heights.shape
+    padded_heights = numpy.pad(filled_heights, 1, constant_values=-numpy.inf)
+
+    steepest_drop = numpy.zeros(filled_heights.shape)
+    receivers = numpy.full(filled_heights.shape, -1, dtype=numpy.int64)
+    flat_indices = numpy.arange(width * height).reshape(filled_heights.shape)
+    for (x_offset, y_offset), distance in zip(_NEIGHBOR_OFFSETS, _NEIGHBOR_DISTANCES):
+        neighbor_heights = padded_heights[_get_neighbor_slices(width, height, x_offset, y_offset)]
+        drop = (filled_heights - neighbor_heights) / distance
+        steeper = drop > steepest_drop
+        steepest_drop[steeper] = drop[steeper]
+
+        # Only the padding outside of the map is infinitely low
+        on_map = numpy.isfinite(neighbor_heights[steeper])
+        receivers[steeper] = numpy.where(on_map, flat_indices[steeper] + x_offset * height + y_offset, -1)
+
+    receivers[outlet_mask] = -1
+    return receivers
+
+
+def calculate_flow_accumulation(receivers: ndarray, source_mask: ndarray) -> ndarray:
+    """
+    Returns the number of source tiles that drain through every tile, including the tile itself.
+
+    Tiles are added to their receivers in waves: a tile is added once every tile draining into it has been added, so
+    the number of waves is the length of the longest flow path rather than the number of tiles.
+
+    Args:
+        receivers: the flat index of the tile each tile drains into, or -1 if it does not drain into a tile. The
+            receivers must not form a cycle.
+        source_mask: the tiles that water starts from
+    """
+    flat_receivers = receivers.reshape(-1)
+    drainage = source_mask.reshape(-1).astype(numpy.int64)
+    draining = flat_receivers >= 0
+    remaining_donors = numpy.bincount(flat_receivers[draining], minlength=len(flat_receivers))
+
+    wave = numpy.flatnonzero(draining & (remaining_donors == 0))
+    while len(wave) > 0:
+        wave_receivers = flat_receivers[wave]
+        numpy.add.at(drainage, wave_receivers, drainage[wave])
+        numpy.subtract.at(remaining_donors, wave_receivers, 1)
+
+        candidates = numpy.unique(wave_receivers)
+        wave = candidates[(remaining_donors[candidates] == 0) & draining[candidates]]
+
+    return drainage.reshape(receivers.shape)
@@ -0,0 +1,377 @@
+"""
+Vectorized simplex noise.
+
+This is a NumPy port of the tileable variant of ``noise.snoise2`` (``noise._simplex.noise2`` called with ``repeatx``
+and ``repeaty``). The C implementation maps each 2D coordinate onto a torus in 4D space and samples 4D simplex noise
+there. The same float32 operations are performed here, in the same order, so that a field computed here matches the
+per-pixel C calls for the same ``base``.
+"""
+
+import math
+
+import numpy
+from numpy import ndarray
+
+# Tables copied from the noise library (_noise.h)
+# fmt: off
+_PERMUTATION = [
+    151, 160, 137, 91, 90, 15, 131, 13, 201, 95, 96, 53, 194, 233, 7, 225,
+    140, 36, 103, 30, 69, 142, 8, 99, 37, 240, 21, 10, 23, 190, 6, 148,
+    247, 120, 234, 75, 0, 26, 197, 62, 94, 252, 219, 203, 117, 35, 11, 32,
+    57, 177, 33, 88, 237, 149, 56, 87, 174, 20, 125, 136, 171, 168, 68, 175,
+    74, 165, 71, 134, 139, 48, 27, 166, 77, 146, 158, 231, 83, 111, 229, 122,
+    60, 211, 133, 230, 220, 105, 92, 41, 55, 46, 245, 40, 244, 102, 143, 54,
+    65, 25, 63, 161, 1, 216, 80, 73, 209, 76, 132, 187, 208, 89, 18, 169,
+    200, 196, 135, 130, 116, 188, 159, 86, 164, 100, 109, 198, 173, 186, 3, 64,
+    52, 217, 226, 250, 124, 123, 5, 202, 38, 147, 118, 126, 255, 82, 85, 212,
+    207, 206, 59, 227, 47, 16, 58, 17, 182, 189, 28, 42, 223, 183, 170, 213,
+    119, 248, 152, 2, 44, 154, 163, 70, 221, 153, 101, 155, 167, 43, 172, 9,
+    129, 22, 39, 253, 19, 98, 108, 110, 79, 113, 224, 232, 178, 185, 112, 104,
+    218, 246, 97, 228, 251, 34, 242, 193, 238, 210, 144, 12, 191, 179, 162, 241,
+    81, 51, 145, 235, 249, 14, 239, 107, 49, 192, 214, 31, 181, 199, 106, 157,
+    184, 84, 204, 176, 115, 121, 50, 45, 127, 4, 150, 254, 138, 236, 205, 93,
+    222, 114, 67, 29, 24, 72, 243, 141, 128, 195, 78, 66, 215, 61, 156, 180,
+]
+
+_GRADIENTS_4D = [
+    (0, 1, 1, 1), (0, 1, 1, -1), (0, 1, -1, 1), (0, 1, -1, -1),
+    (0, -1, 1, 1), (0, -1, 1, -1), (0, -1, -1, 1), (0, -1, -1, -1),
+    (1, 0, 1, 1), (1, 0, 1, -1), (1, 0, -1, 1), (1, 0, -1, -1),
+    (-1, 0, 1, 1), (-1, 0, 1, -1), (-1, 0, -1, 1), (-1, 0, -1, -1),
+    (1, 1, 0, 1), (1, 1, 0, -1), (1, -1, 0, 1), (1, -1, 0, -1),
+    (-1, 1, 0, 1), (-1, 1, 0, -1), (-1, -1, 0, 1), (-1, -1, 0, -1),
+    (1, 1, 1, 0), (1, 1, -1, 0), (1, -1, 1, 0), (1, -1, -1, 0),
+    (-1, 1, 1, 0), (-1, 1, -1, 0), (-1, -1, 1, 0), (-1, -1, -1, 0),
+]
+# fmt: on
+
+_PERM = numpy.array(_PERMUTATION * 2, dtype=numpy.intp)
+
+# The gradient lookup GRAD4[PERM[m] & 0x1f] is folded into one table per component, indexed by m
+_GRADIENT_TABLES = [
+    numpy.array([_GRADIENTS_4D[value & 31][axis] for value in _PERMUTATION * 2], dtype=numpy.float32)
+    for axis in range(4)
+]
+
+# 4D simplex skew factors
+_F4 = numpy.float32(0.30901699437494745)
+_G4 = numpy.float32(0.1381966011250105)
+
+# The corner offsets are added to the unskewed position in single precision
+_CORNER_OFFSETS = [
+    numpy.float32(0.0),
+    _G4,
+    numpy.float32(2.0) * _G4,
+    numpy.float32(3.0) * _G4,
+    numpy.float32(4.0) * _G4,
+]
+
+# Magic number used by fast_sin to wrap its input into [-1, 1]
+_SIN_WRAP = numpy.float32(25165824.0)
+
+# Number of noise values computed at once. Working in batches keeps the temporaries small enough to stay in cache.
+BATCH_SIZE = 1 << 14
+
+# Lattice samples per noise unit used when an octave is computed on a coarse grid and upsampled
+MULTIRESOLUTION_SAMPLES_PER_UNIT = 6
+
+
+def _fast_sin(x: ndarray) -> ndarray:
+    # The input is in half-turns, so [0, 2] maps to [0, 2 * PI]
+    x = x - ((x + _SIN_WRAP) - _SIN_WRAP)
+    y = x - x * numpy.abs(x)
+    return y * (numpy.float32(3.1) + numpy.float32(3.6) * numpy.abs(y))
+
+
+def _fast_cos(x: ndarray) -> ndarray:
+    return _fast_sin(x + numpy.float32(0.5))
+
+
+def _torus_coordinates(coordinates: ndarray, repeat: float) -> tuple[ndarray, ndarray]:
+    """
+    Maps one axis of 2D coordinates onto a circle so that the noise repeats every ``repeat`` units.
+
+    Args:
+        coordinates: float32 coordinates along the axis
+        repeat: the interval at which the noise repeats
+
+    Returns:
+        The sine and cosine components of the circle, both scaled to the circle radius
+    """
+    repeat = numpy.float32(repeat)
+    angle = (coordinates.astype(numpy.float64) * 2.0 / float(repeat)).astype(numpy.float32)
+    radius = numpy.float32(float(repeat) * (1.0 / math.pi) * 0.5)
+    return _fast_sin(angle) * radius, _fast_cos(angle) * radius
+
+
+def noise4(x: ndarray, y: ndarray, z: ndarray, w: ndarray) -> ndarray:
+    """
+    Computes 4D simplex noise for arrays of float32 coordinates.
+
+    The arguments are broadcast against each other.
+
+    Returns:
+        A float32 array of noise values
+    """
+    s = (x + y + z + w) * _F4
+    i = numpy.floor(x + s)
+    j = numpy.floor(y + s)
+    k = numpy.floor(z + s)
+    l = numpy.floor(w + s)  # noqa: E741
+    t = (i + j + k + l) * _G4
+
+    positions = (x - (i - t), y - (j - t), z - (k - t), w - (l - t))
+    hashes = [value.astype(numpy.intp) & 255 for value in (i, j, k, l)]
+
+    # Rank the magnitudes of the unskewed coordinates to find which simplex we are in. This gives the same result as
+    # the SIMPLEX lookup table in the C implementation, including its tie breaking.
+    x0, y0, z0, w0 = positions
+    xy = x0 > y0
+    xz = x0 > z0
+    yz = y0 > z0
+    xw = x0 > w0
+    yw = y0 > w0
+    zw = z0 > w0
+    ranks = (
+        xy.astype(numpy.int8) + xz + xw,
+        numpy.int8(1) - xy + yz + yw,
+        numpy.int8(2) - xz - yz + zw,
+        numpy.int8(3) - xw - yw - zw,
+    )
+
+    total = None
+    for corner in range(5):
+        # Offsets of this corner from the first one along each axis
+        if corner == 0:
+            offsets = [0, 0, 0, 0]
+        elif corner == 4:
+            offsets = [1, 1, 1, 1]
+        else:
+            offsets = [rank >= 4 - corner for rank in ranks]
+
+        corner_positions = []
+        for axis in range(4):
+            if corner == 0:
+                corner_positions.append(positions[axis])
+            elif corner == 4:
+                corner_positions.append((positions[axis] - numpy.float32(1.0)) + _CORNER_OFFSETS[corner])
+            else:
+                corner_positions.append((positions[axis] - offsets[axis]) + _CORNER_OFFSETS[corner])
+        cx, cy, cz, cw = corner_positions
+
+        # PERM[I + i1 + PERM[J + j1 + PERM[K + k1 + PERM[L + l1]]]], leaving the outermost lookup to the gradient tables
+        gradient_index = _PERM[hashes[3] + offsets[3]]
+        gradient_index = _PERM[hashes[2] + offsets[2] + gradient_index]
+        gradient_index = _PERM[hashes[1] + offsets[1] + gradient_index]
+        gradient_index += hashes[0] + offsets[0]
+
+        falloff = numpy.float32(0.6) - cx * cx - cy * cy - cz * cz - cw * cw
+        numpy.maximum(falloff, numpy.float32(0.0), out=falloff)
+        falloff *= falloff
+        falloff *= falloff
+
+        dot = _GRADIENT_TABLES[0][gradient_index] * cx
+        dot += _GRADIENT_TABLES[1][gradient_index] * cy
+        dot += _GRADIENT_TABLES[2][gradient_index] * cz
+        dot += _GRADIENT_TABLES[3][gradient_index] * cw
+
+        falloff *= dot
+        if total is None:
+            total = falloff
+        else:
+            total += falloff
+
+    # The C implementation scales by a double constant before converting back to a float
+    return (total.astype(numpy.float64) * 27.0).astype(numpy.float32)
+
+
+def snoise2_grid(
+    x_coordinates: ndarray,
+    y_coordinates: ndarray,
+    octaves: int = 1,
+    persistence: float = 0.5,
+    lacunarity: float = 2.0,
+    repeatx: float = 1024.0,
+    repeaty: float = 1024.0,
+    base: float = 0.0,
+) -> ndarray:
+    """
+    Computes tileable fractal simplex noise for every combination of the given x and y coordinates.
+
+    The value at ``[i][j]`` matches ``noise.snoise2(x_coordinates[i], y_coordinates[j], ...)`` called with the same
+    keyword arguments.
+
+    Args:
+        x_coordinates: 1D array of x coordinates
+        y_coordinates: 1D array of y coordinates
+        octaves: the number of passes
+        persistence: the amplitude of each successive octave relative to the one below it
+        lacunarity: the frequency of each successive octave relative to the one below it
+        repeatx: the interval along x at which the noise repeats
+        repeaty: the interval along y at which the noise repeats
+        base: fixed offset for the noise coordinates
+
+    Returns:
+        A float64 matrix with shape ``(len(x_coordinates), len(y_coordinates))``
+    """
+    if octaves <= 0:
+        raise ValueError("Expected octaves value > 0")
+
+    base = numpy.float32(base)
+    persistence = numpy.float32(persistence)
+    lacunarity = numpy.float32(lacunarity)
+
+    # The 4D sample point for (x, y) is (x_sin, y_sin, base + x_cos, base + y_cos)
+    y_sin, y_cos = _torus_coordinates(numpy.asarray(y_coordinates, dtype=numpy.float32), repeaty)
+    x_sin, x_cos = _torus_coordinates(numpy.asarray(x_coordinates, dtype=numpy.float32), repeatx)
+    y_w = base + y_cos
+    x_z = base + x_cos
+
+    noise_matrix = numpy.empty((len(x_sin), len(y_sin)), dtype=numpy.float64)
+    rows_per_batch = max(1, BATCH_SIZE // max(1, len(y_sin)))
+    for start in range(0, len(x_sin), rows_per_batch):
+        end = min(start + rows_per_batch, len(x_sin))
+        x = x_sin[start:end, None]
+        z = x_z[start:end, None]
+        y = y_sin[None, :]
+        w = y_w[None, :]
+
+        frequency = numpy.float32(1.0)
+        amplitude = numpy.float32(1.0)
+        maximum = numpy.float32(1.0)
+        total = noise4(x, y, z, w)
+        for _ in range(1, octaves):
+            frequency *= lacunarity
+            amplitude *= persistence
+            maximum += amplitude
+            total += noise4(x * frequency, y * frequency, z * frequency, w * frequency) * amplitude
+
+        noise_matrix[start:end] = total / maximum
+
+    return noise_matrix
+
+
+def _octave_grid(x_sin: ndarray, x_z: ndarray, y_sin: ndarray, y_w: ndarray, frequency: numpy.float32) -> ndarray:
+    octave_matrix = numpy.empty((len(x_sin), len(y_sin)), dtype=numpy.float32)
+    rows_per_batch = max(1, BATCH_SIZE // max(1, len(y_sin)))
+    for start in range(0, len(x_sin), rows_per_batch):
+        end = min(start + rows_per_batch, len(x_sin))
+        octave_matrix[start:end] = noise4(
+            x_sin[start:end, None] * frequency,
+            y_sin[None, :] * frequency,
+            x_z[start:end, None] * frequency,
+            y_w[None, :] * frequency,
+        )
+    return octave_matrix
+
+
+def _catmull_rom_weights(indices: range, step: int) -> tuple[ndarray, list[ndarray]]:
+    """
+    Calculates cubic interpolation weights for upsampling a lattice with points at every ``step``-th index.
+
+    The lattice covers the given indices plus one point before and two after, so every index has two lattice points on
+    either side.
+
+    Returns:
+        The position in the lattice of the first of the four points around each index, and the weights of those points
+    """
+    positions = numpy.arange(indices.start, indices.stop)
+    segments = positions // step
+    t = ((positions - segments * step) / step).astype(numpy.float32)
+    t2 = t * t
+    t3 = t2 * t
+    weights = [
+        (-t3 + 2 * t2 - t) * numpy.float32(0.5),
+        (3 * t3 - 5 * t2 + 2) * numpy.float32(0.5),
+        (-3 * t3 + 4 * t2 + t) * numpy.float32(0.5),
+        (t3 - t2) * numpy.float32(0.5),
+    ]
+    return segments - indices.start // step, weights
+
+
+def _lattice_indices(indices: range, step: int) -> ndarray:
+    return numpy.arange(indices.start // step - 1, (indices.stop - 1) // step + 3) * step
+
+
+def _upsample(lattice_matrix: ndarray, x_indices: range, y_indices: range, x_step: int, y_step: int) -> ndarray:
+    x_segments, x_weights = _catmull_rom_weights(x_indices, x_step)
+    y_segments, y_weights = _catmull_rom_weights(y_indices, y_step)
+
+    columns = sum(lattice_matrix[:, y_segments + offset] * y_weights[offset] for offset in range(4))
+    return sum(columns[x_segments + offset] * x_weights[offset][:, None] for offset in range(4))
+
+
+def snoise2_grid_multiresolution(
+    x_indices: range,
+    y_indices: range,
+    scale: float,
+    octaves: int = 1,
+    persistence: float = 0.5,
+    lacunarity: float = 2.0,
+    repeatx: float = 1024.0,
+    repeaty: float = 1024.0,
+    base: float = 0.0,
+    samples_per_unit: int = MULTIRESOLUTION_SAMPLES_PER_UNIT,
+) -> ndarray:
+    """
+    Approximates ``snoise2_grid`` over the coordinates ``index / scale`` by computing each octave on a lattice sized to
+    its frequency.
+
+    Low-frequency octaves change very little between neighbouring samples, so they are computed on a coarse lattice
+    with about ``samples_per_unit`` points per noise unit and upsampled with cubic interpolation. Octaves too fine for
+    that are computed at full resolution. Lattice points sit at fixed indices, so separately computed windows of a
+    larger grid line up exactly with the grid computed in one piece.
+
+    With the default settings the result differs from ``snoise2_grid`` by less than 0.01 on average and by less than
+    0.15 at worst. Most of the worst case is float32 rounding jitter in the exact noise, which interpolation smooths
+    out.
+
+    Args:
+        x_indices: indices of the samples along x
+        y_indices: indices of the samples along y
+        scale: the number of samples per noise unit
+        See ``snoise2_grid`` for the remaining noise arguments.
+        samples_per_unit: lattice points per noise unit for coarse octaves. Higher values are slower but closer.
+
+    Returns:
+        A float64 matrix with shape ``(len(x_indices), len(y_indices))``
+    """
+    if octaves <= 0:
+        raise ValueError("Expected octaves value > 0")
+
+    base = numpy.float32(base)
+    persistence = numpy.float32(persistence)
+    lacunarity = numpy.float32(lacunarity)
+
+    frequency = numpy.float32(1.0)
+    amplitude = numpy.float32(1.0)
+    maximum = numpy.float32(1.0)
+    total = None
+    for octave in range(octaves):
+        if octave > 0:
+            frequency *= lacunarity
+            amplitude *= persistence
+            maximum += amplitude
+
+        step = max(1, int(scale / float(frequency) / samples_per_unit))
+        if step == 1:
+            x_lattice = numpy.arange(x_indices.start, x_indices.stop)
+            y_lattice = numpy.arange(y_indices.start, y_indices.stop)
+        else:
+            x_lattice = _lattice_indices(x_indices, step)
+            y_lattice = _lattice_indices(y_indices, step)
+
+        x_sin, x_cos = _torus_coordinates((x_lattice / scale).astype(numpy.float32), repeatx)
+        y_sin, y_cos = _torus_coordinates((y_lattice / scale).astype(numpy.float32), repeaty)
+        octave_matrix = _octave_grid(x_sin, base + x_cos, y_sin, base + y_cos, frequency)
+
+        if step != 1:
+            octave_matrix = _upsample(octave_matrix, x_indices, y_indices, step, step)
+
+        if total is None:
+            total = octave_matrix
+        else:
+            octave_matrix *= amplitude
+            total += octave_matrix
+
+    return (total / maximum).astype(numpy.float64)
@@ -0,0 +1,103 @@
+"""
+Precomputed answers to questions about the tiles around a position.
+
+A Euclidean distance transform of the buildable tiles gives the nearest buildable tile of every tile, and one of the
+land tiles gives the distance of every tile to the nearest water, so both can then be looked up in constant time.
+"""
+
+import math
+from typing import Callable, Optional
+
+import numpy
+from numpy import ndarray
+from scipy import ndimage
+
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.maps import MapWindow
+
+# Half the size of the first window searched for the nearest buildable tile when there is no index of the whole map
+NEAREST_TILE_SEARCH_RADIUS = 64
+
+
+class TileIndex:
+    """
+    Nearest buildable tile and distance to water of every tile of a window of a map.
+
+    Positions are map coordinates and must be inside of the window. Tiles outside of the window are not known, so they
+    are never the nearest buildable tile and never count as water.
+    """
+
+    def __init__(self, buildable_mask: ndarray, land_mask: ndarray, window: Optional[MapWindow] = None):
+        self.window = MapWindow.full(*buildable_mask.shape) if window is None else window
+        self.has_buildable_tiles = bool(numpy.any(buildable_mask))
+
+        # The transforms measure the distance to the nearest zero, so buildable tiles and water are the zeros
+        if self.has_buildable_tiles:
+            nearest_indices = ndimage.distance_transform_edt(
+                ~buildable_mask, return_distances=False, return_indices=True
+            )
+            self._nearest_buildable_x = (nearest_indices[0] + self.window.x_start).astype(numpy.int32)
+            self._nearest_buildable_y = (nearest_indices[1] + self.window.y_start).astype(numpy.int32)
+        self._water_distances = ndimage.distance_transform_edt(land_mask).astype(numpy.float32)
+        if numpy.all(land_mask):
+            self._water_distances[...] = numpy.inf
+
+    @staticmethod
+    def from_tiles(map_tiles: ndarray, window: Optional[MapWindow] = None) -> "TileIndex":
+        """
+        Indexes tiles, which are the tiles of the window of the map if a window is given.
+        """
+        return TileIndex(MapTile.get_buildable_mask(map_tiles), MapTile.get_land_mask(map_tiles), window)
+
+    def get_nearest_buildable_tile(self, x: int, y: int) -> Optional[tuple[int, int]]:
+        """
+        Returns the buildable tile closest to the position, which is the position itself if it is buildable, or None if
+        no tile is buildable.
+        """
+        if not self.has_buildable_tiles:
+            return None
+
+        index = (x - self.window.x_start, y - self.window.y_start)
+        return int(self._nearest_buildable_x[index]), int(self._nearest_buildable_y[index])
+
+    def get_distance_to_water(self, x: int, y: int) -> float:
+        """
+        Returns the distance from the position to the closest water tile, which is 0 for water and infinite if there
+        is no water.
+        """
+        return float(self._water_distances[x - self.window.x_start, y - self.window.y_start])
+
+
+def find_nearest_buildable_tile(
+    get_tiles: Callable[[MapWindow], ndarray], width: int, height: int, x: int, y: int
+) -> Optional[tuple[int, int]]:
+    """
+    Finds the buildable tile closest to a position without indexing the whole map.
+
+    Windows around the position that double in size are indexed until the nearest buildable tile in a window is closer
+    than the edges of the window, since every tile outside of the window is further away than its edges.
+
+    Args:
+        get_tiles: returns the tiles of a window of the map
+        width: the width of the map
+        height: the height of the map
+        x: the x coordinate of the position
+        y: the y coordinate of the position
+
+    Returns:
+        The closest buildable tile, or None if no tile of the map is buildable
+    """
+    radius = NEAREST_TILE_SEARCH_RADIUS
+    while True:
+        window = MapWindow(
+            max(x - radius, 0), min(x + radius + 1, width), max(y - radius, 0), min(y + radius + 1, height)
+        )
+        nearest_tile = TileIndex.from_tiles(get_tiles(window), window).get_nearest_buildable_tile(x, y)
+
+        covers_map = window == MapWindow.full(width, height)
+        if nearest_tile is not None and (covers_map or math.dist(nearest_tile, (x, y)) <= radius):
+            return nearest_tile
+        if covers_map:
+            return None
+
+        radius *= 2
@@ -0,0 +1,321 @@
+"""
+On-disk cache of generated worlds.
+
+Each world is stored in its own directory named after a hash of everything that changes the generated world, so the
+same seed and parameters always find the same entry. The arrays are memory-mapped when loaded so opening a cached world
+does not need to read it into memory first. The landmasses, region adjacency and region statistics are stored with the
+world, so a game opening it does not have to go over every tile to calculate them again.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy
+from numpy import ndarray
+
+from citygame.src.constants import world_constants
+from citygame.src.constants.noise_mode_enum import NoiseMode
+from citygame.src.util import maps
+from citygame.src.util.landmasses import Landmasses, label_landmasses
+from citygame.src.util.locations import calculate_border_arrays, calculate_locations, calculate_regions
+from citygame.src.util.maps import MapWindow, generate_map
+from citygame.src.util.paths import get_world_cache_directory
+from citygame.src.util.region_graph import RegionAdjacency, calculate_region_adjacency
+from citygame.src.util.region_statistics import RegionStatistics, calculate_region_statistics
+
+LOG = logging.getLogger("WorldCache")
+
+# Increase this whenever the generation algorithms change so that worlds cached by older versions are not used
+WORLD_CACHE_VERSION = 7
+
+# World constants that do not change the generated world and so should not invalidate the cache
+IGNORED_WORLD_CONSTANTS = {
+    "WORLD_GENERATION_PROCESSES",
+    # Neighbors are found when a world is opened
+    "REGION_NEIGHBORS",
+    # Chunked worlds are not cached
+    "CHUNKED_WORLD_MAP_SIZE",
+    "WORLD_CHUNK_SIZE",
+    "MAXIMUM_LOADED_WORLD_CHUNKS",
+}
+
+TILES_FILE_NAME = "tiles.npy"
+LOCATIONS_FILE_NAME = "locations.npy"
+REGIONS_FILE_NAME = "regions.npy"
+BORDER_POINTS_FILE_NAME = "border_points.npy"
+BORDER_OFFSETS_FILE_NAME = "border_offsets.npy"
+LANDMASSES_FILE_NAME = "landmasses.npy"
+# The small arrays of the landmasses, region adjacency and region statistics, which are read into memory when loaded
+SUMMARY_FILE_NAME = "summary.npz"
+
+
+@dataclass
+class CachedWorld:
+    """
+    The generated parts of a world.
+
+    The border points of every location are stored one after another in a single array. The border points of location i
+    are border_points[border_offsets[i]:border_offsets[i + 1]].
+    """
+
+    map_tiles: ndarray
+    location_points: ndarray
+    region_matrix: ndarray
+    border_points: ndarray
+    border_offsets: ndarray
+    landmasses: Landmasses
+    region_adjacency: RegionAdjacency
+    region_statistics: RegionStatistics
+
+    @staticmethod
+    def from_generated_world(
+        map_tiles: ndarray,
+        location_points: List[tuple[int, int]],
+        region_matrix: ndarray,
+        border_points: ndarray,
+        border_offsets: ndarray,
+        landmasses: Optional[Landmasses] = None,
+    ) -> "CachedWorld":
+        """
+        Returns a generated world with its region adjacency and region statistics. The landmasses are labelled if they
+        are not given.
+        """
+        return CachedWorld(
+            map_tiles=map_tiles,
+            location_points=numpy.asarray(location_points, dtype=int).reshape(-1, 2),
+            region_matrix=region_matrix,
+            border_points=border_points,
+            border_offsets=border_offsets,
+            landmasses=label_landmasses(map_tiles) if landmasses is None else landmasses,
+            region_adjacency=calculate_region_adjacency(region_matrix, len(location_points)),
+            region_statistics=calculate_region_statistics(region_matrix, map_tiles, len(location_points)),
+        )
+
+    def get_location_points(self) -> List[tuple[int, int]]:
+        return [(x, y) for x, y in self.location_points.tolist()]
+
+    def get_border_points(self, location_index: int) -> ndarray:
+        # A view of the border points so nothing is copied, even when they are a memory-mapped file
+        start, end = self.border_offsets[location_index], self.border_offsets[location_index + 1]
+        return self.border_points[start:end]
+
+
+def get_world_cache_key(seed: int, width: int, height: int, noise_mode: NoiseMode = NoiseMode.EXACT) -> str:
+    """
+    Returns a hash of every parameter that changes the world generated from the given seed.
+    """
+    parameters = {
+        "version": WORLD_CACHE_VERSION,
+        "seed": seed,
+        "width": width,
+        "height": height,
+        "noise_mode": noise_mode.name,
+        "noise": [maps.NOISE_SCALE, maps.NOISE_PERSISTENCE, maps.NOISE_LACUNARITY, maps.NOISE_REPEAT],
+        "world_constants": {
+            name: value
+            for name, value in vars(world_constants).items()
+            if name.isupper() and name not in IGNORED_WORLD_CONSTANTS
+        },
+    }
+    return hashlib.sha256(json.dumps(parameters, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def load_world(seed: int, width: int, height: int, noise_mode: NoiseMode = NoiseMode.EXACT) -> Optional[CachedWorld]:
+    """
+    Opens the cached world generated from the given seed and parameters.
+
+    Returns:
+        The world with read-only memory-mapped arrays, or None if the world has not been cached
+    """
+    world_directory = os.path.join(get_world_cache_directory(), get_world_cache_key(seed, width, height, noise_mode))
+    if not os.path.isdir(world_directory):
+        return None
+
+    try:
+        map_tiles, location_points, region_matrix, border_points, border_offsets, landmass_labels = (
+            numpy.load(os.path.join(world_directory, file_name), mmap_mode="r")
+            for file_name in (
+                TILES_FILE_NAME,
+                LOCATIONS_FILE_NAME,
+                REGIONS_FILE_NAME,
+                BORDER_POINTS_FILE_NAME,
+                BORDER_OFFSETS_FILE_NAME,
+                LANDMASSES_FILE_NAME,
+            )
+        )
+        with numpy.load(os.path.join(world_directory, SUMMARY_FILE_NAME)) as summary:
+            cached_world = CachedWorld(
+                map_tiles=map_tiles,
+                location_points=location_points,
+                region_matrix=region_matrix,
+                border_points=border_points,
+                border_offsets=border_offsets,
+                landmasses=Landmasses(
+                    landmass_labels,
+                    [MapWindow(*bounding_box) for bounding_box in summary["landmass_bounding_boxes"].tolist()],
+                ),
+                region_adjacency=RegionAdjacency(
+                    pairs=summary["region_pairs"], border_lengths=summary["region_border_lengths"]
+                ),
+                region_statistics=RegionStatistics(
+                    areas=summary["region_areas"],
+                    terrain_counts=summary["region_terrain_counts"],
+                    centroids=summary["region_centroids"],
+                    bounding_boxes=summary["region_bounding_boxes"],
+                ),
+            )
+    except (OSError, ValueError, KeyError):
+        LOG.warning(f"Could not load cached world from {world_directory}", exc_info=True)
+        return None
+
+    LOG.info(f"Loaded cached world from {world_directory}")
+    return cached_world
+
+
+def _write_world(seed: int, width: int, height: int, noise_mode: NoiseMode, write_files: Callable[[str], None]) -> str:
+    """
+    Writes the files of a world with write_files and moves them into the cache.
+
+    The files are written to a temporary directory first and then moved into place, so a world that is only partially
+    written is never loaded.
+    """
+    cache_directory = get_world_cache_directory()
+    world_directory = os.path.join(cache_directory, get_world_cache_key(seed, width, height, noise_mode))
+    os.makedirs(cache_directory, exist_ok=True)
+
+    temporary_directory = tempfile.mkdtemp(dir=cache_directory)
+    try:
+        write_files(temporary_directory)
+        os.replace(temporary_directory, world_directory)
+    except OSError:
+        # Another game may have cached the same world first
+        if not os.path.isdir(world_directory):
+            raise
+    finally:
+        shutil.rmtree(temporary_directory, ignore_errors=True)
+
+    LOG.info(f"Cached world in {world_directory}")
+    return world_directory
+
+
+def _save_summary(
+    directory: str, landmasses: Landmasses, region_adjacency: RegionAdjacency, region_statistics: RegionStatistics
+):
+    numpy.savez(
+        os.path.join(directory, SUMMARY_FILE_NAME),
+        landmass_bounding_boxes=numpy.array(
+            [
+                (bounding_box.x_start, bounding_box.x_end, bounding_box.y_start, bounding_box.y_end)
+                for bounding_box in landmasses.bounding_boxes
+            ],
+            dtype=numpy.int64,
+        ).reshape(-1, 4),
+        region_pairs=region_adjacency.pairs,
+        region_border_lengths=region_adjacency.border_lengths,
+        region_areas=region_statistics.areas,
+        region_terrain_counts=region_statistics.terrain_counts,
+        region_centroids=region_statistics.centroids,
+        region_bounding_boxes=region_statistics.bounding_boxes,
+    )
+
+
+def save_world(
+    seed: int, width: int, height: int, cached_world: CachedWorld, noise_mode: NoiseMode = NoiseMode.EXACT
+) -> str:
+    """
+    Stores a generated world so it can be loaded with load_world.
+
+    Returns:
+        The directory of the cached world
+    """
+
+    def write_files(directory: str):
+        numpy.save(os.path.join(directory, TILES_FILE_NAME), cached_world.map_tiles)
+        numpy.save(os.path.join(directory, LOCATIONS_FILE_NAME), cached_world.location_points)
+        numpy.save(os.path.join(directory, REGIONS_FILE_NAME), cached_world.region_matrix)
+        numpy.save(os.path.join(directory, BORDER_POINTS_FILE_NAME), cached_world.border_points)
+        numpy.save(os.path.join(directory, BORDER_OFFSETS_FILE_NAME), cached_world.border_offsets)
+        numpy.save(os.path.join(directory, LANDMASSES_FILE_NAME), cached_world.landmasses.labels)
+        _save_summary(directory, cached_world.landmasses, cached_world.region_adjacency, cached_world.region_statistics)
+
+    return _write_world(seed, width, height, noise_mode, write_files)
+
+
+def prepare_world(
+    seed: int, width: int, height: int, noise_mode: NoiseMode = NoiseMode.EXACT, low_memory: bool = False
+) -> str:
+    """
+    Generates a world straight into the cache one band of rows at a time, so worlds larger than memory can be prepared
+    ahead of time. A game then opens the world with load_world without reading it into memory.
+
+    Labelling the landmasses and placing the locations still need five bytes per tile of memory.
+
+    Args:
+        seed: the seed of the world
+        width: the width of the map
+        height: the height of the map
+        noise_mode: how the noise is computed
+        low_memory: store the heights as float32 while generating, which halves the size of the temporary heights file
+
+    Returns:
+        The directory of the cached world
+    """
+
+    def write_files(directory: str):
+        map_tiles = generate_map(
+            width,
+            height,
+            noise_mode,
+            seed=seed,
+            low_memory=low_memory,
+            output_path=os.path.join(directory, TILES_FILE_NAME),
+            erosion=world_constants.ERODE_TERRAIN,
+            rivers=world_constants.ADD_RIVERS,
+        )
+        landmasses = label_landmasses(map_tiles)
+        numpy.save(os.path.join(directory, LANDMASSES_FILE_NAME), landmasses.labels)
+        location_points = calculate_locations(map_tiles, seed=seed, landmasses=landmasses)
+        numpy.save(
+            os.path.join(directory, LOCATIONS_FILE_NAME), numpy.asarray(location_points, dtype=int).reshape(-1, 2)
+        )
+
+        region_matrix = calculate_regions(
+            location_points, map_tiles, output_path=os.path.join(directory, REGIONS_FILE_NAME), landmasses=landmasses
+        )
+        _, border_offsets = calculate_border_arrays(
+            location_points,
+            region_matrix,
+            output_path=os.path.join(directory, BORDER_POINTS_FILE_NAME),
+            landmasses=landmasses,
+        )
+        numpy.save(os.path.join(directory, BORDER_OFFSETS_FILE_NAME), border_offsets)
+
+        _save_summary(
+            directory,
+            landmasses,
+            calculate_region_adjacency(region_matrix, len(location_points)),
+            calculate_region_statistics(region_matrix, map_tiles, len(location_points)),
+        )
+
+    return _write_world(seed, width, height, noise_mode, write_files)
+
+
+def main():
+    """
+    Prepares a world in the cache, for example: python -m citygame.src.util.world_cache <seed> <map size>
+    """
+    logging.basicConfig(level=logging.INFO)
+    seed = int(sys.argv[1])
+    map_size = int(sys.argv[2])
+    prepare_world(seed, map_size, map_size, low_memory=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""
+Worlds that are generated lazily one chunk at a time.
+
+The tiles of a chunk only depend on its position and the terrain statistics of the whole map, which are estimated up
+front, so chunks generated at different times line up exactly. Regions and borders are calculated together with the
+tiles of each chunk. Only the most recently used chunks are kept, and evicted chunks are generated again when needed.
+
+Unlike whole worlds, chunked worlds do not restrict locations and regions to the landmass of the starting location.
+Labelling the landmasses needs the tiles of the whole map, and labelling only the loaded chunks would make the regions
+depend on which chunks happen to be loaded.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, List, Optional
+
+import numpy
+from numpy import ndarray
+from scipy.spatial import cKDTree
+
+from citygame.src.constants.noise_mode_enum import NoiseMode
+from citygame.src.constants.world_constants import MAXIMUM_LOADED_WORLD_CHUNKS, WORLD_CHUNK_SIZE
+from citygame.src.util.locations import (
+    OUTSIDE_OF_MAP_REGION,
+    calculate_padded_border_mask,
+    find_closest_locations,
+    place_locations,
+)
+from citygame.src.util.lru_cache import LruCache
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.maps import MapWindow, estimate_terrain_statistics, generate_map_window
+from citygame.src.util.tile_index import find_nearest_buildable_tile
+
+LOG = logging.getLogger("maps")
+
+
+@dataclass
+class WorldChunk:
+    """
+    The generated parts of one chunk of a world.
+
+    The matrices are indexed by [x - window.x_start][y - window.y_start]. The border points are map coordinates, and
+    border_regions has the region of each border point. Tiles at the edge of the map are always border points.
+    """
+
+    window: MapWindow
+    map_tiles: ndarray
+    region_matrix: ndarray
+    border_points: ndarray
+    border_regions: ndarray
+
+
+class _LazyBuildableMask:
+    """
+    Buildable mask of a chunked world that generates the tiles of a chunk the first time one of its tiles is read.
+
+    The masks are kept until placement finishes, so they need one byte for every tile of the chunks that were read.
+    """
+
+    def __init__(self, world_chunks: "WorldChunks"):
+        self.world_chunks = world_chunks
+        self.shape = (world_chunks.map_size, world_chunks.map_size)
+        self._chunk_masks = dict()
+
+    def __getitem__(self, points: tuple[ndarray, ndarray]) -> ndarray:
+        x, y = (numpy.asarray(coordinates) for coordinates in points)
+        chunk_size = self.world_chunks.chunk_size
+        chunk_x = x // chunk_size
+        chunk_y = y // chunk_size
+
+        is_buildable = numpy.zeros(x.shape, dtype=bool)
+        for chunk_key in set(zip(chunk_x.reshape(-1).tolist(), chunk_y.reshape(-1).tolist())):
+            in_chunk = (chunk_x == chunk_key[0]) & (chunk_y == chunk_key[1])
+            is_buildable[in_chunk] = self._get_chunk_mask(chunk_key)[x[in_chunk] % chunk_size, y[in_chunk] % chunk_size]
+        return is_buildable
+
+    def _get_chunk_mask(self, chunk_key: tuple[int, int]) -> ndarray:
+        if chunk_key not in self._chunk_masks:
+            chunk_window = self.world_chunks.get_chunk_window(*chunk_key)
+            self._chunk_masks[chunk_key] = MapTile.get_buildable_mask(self.world_chunks.generate_tiles(chunk_window))
+        return self._chunk_masks[chunk_key]
+
+
+def _get_relative_window(window: MapWindow, outer_window: MapWindow) -> MapWindow:
+    # The part of an array of the outer window that the window covers
+    return MapWindow(
+        window.x_start - outer_window.x_start,
+        window.x_end - outer_window.x_start,
+        window.y_start - outer_window.y_start,
+        window.y_end - outer_window.y_start,
+    )
+
+
+class WorldChunks:
+    """
+    A square world whose tiles, regions and borders are generated one chunk at a time when they are first used.
+    """
+
+    def __init__(
+        self,
+        map_size: int,
+        seed: Optional[int] = None,
+        noise_mode: NoiseMode = NoiseMode.EXACT,
+        chunk_size: int = WORLD_CHUNK_SIZE,
+        maximum_chunks: int = MAXIMUM_LOADED_WORLD_CHUNKS,
+    ):
+        self.map_size = map_size
+        self.seed = seed
+        self.noise_mode = noise_mode
+        self.chunk_size = chunk_size
+
+        LOG.info(f"Estimating terrain of chunked map with dimensions {map_size}x{map_size}...")
+        self.statistics = estimate_terrain_statistics(map_size, map_size, noise_mode, seed)
+
+        self.location_points = numpy.zeros((0, 2), dtype=int)
+        self._location_tree: Optional[cKDTree] = None
+        self._chunks: LruCache[WorldChunk] = LruCache(maximum_chunks)
+
+    def calculate_locations(self, progress_callback: Optional[Callable[[float], None]] = None) -> list[tuple[int, int]]:
+        """
+        Places the locations of the world and uses them for the regions of every chunk.
+
+        Placing the locations reads the tiles around every location, so it generates the tiles of every chunk with
+        buildable land. Only the tiles are generated, and they are not kept afterwards. While placing, the tiles too
+        close to the placed locations are kept in a mask with one byte for every tile of the map.
+        """
+        center = self.map_size // 2
+        starting_position = find_nearest_buildable_tile(
+            self.generate_tiles, self.map_size, self.map_size, center, center
+        )
+        if starting_position is None:
+            raise ValueError("The map has no buildable tiles")
+
+        location_points = place_locations(_LazyBuildableMask(self), starting_position, self.seed, progress_callback)
+        self.set_location_points(location_points)
+        return location_points
+
+    def set_location_points(self, location_points: List[tuple[int, int]]):
+        self.location_points = numpy.asarray(location_points, dtype=int).reshape(-1, 2)
+        self._location_tree = cKDTree(self.location_points) if len(self.location_points) > 0 else None
+
+        # The regions of chunks generated so far were calculated for the old locations
+        self._chunks = LruCache(self._chunks.maximum_size)
+
+    def generate_tiles(self, window: MapWindow) -> ndarray:
+        return generate_map_window(self.map_size, self.map_size, window, self.statistics, self.noise_mode)
+
+    def get_chunk_window(self, chunk_x: int, chunk_y: int) -> MapWindow:
+        x_start = chunk_x * self.chunk_size
+        y_start = chunk_y * self.chunk_size
+        return MapWindow(
+            x_start,
+            min(x_start + self.chunk_size, self.map_size),
+            y_start,
+            min(y_start + self.chunk_size, self.map_size),
+        )
+
+    def get_chunk(self, chunk_x: int, chunk_y: int) -> WorldChunk:
+        return self._chunks.get(
+            (chunk_x, chunk_y), lambda: self._generate_chunk(self.get_chunk_window(chunk_x, chunk_y))
+        )
+
+    def get_chunks_in_window(self, window: MapWindow) -> List[WorldChunk]:
+        """
+        Returns every chunk that overlaps the window, generating the ones that are not loaded.
+        """
+        first_chunk_x = max(window.x_start, 0) // self.chunk_size
+        last_chunk_x = (min(window.x_end, self.map_size) - 1) // self.chunk_size
+        first_chunk_y = max(window.y_start, 0) // self.chunk_size
+        last_chunk_y = (min(window.y_end, self.map_size) - 1) // self.chunk_size
+        return [
+            self.get_chunk(chunk_x, chunk_y)
+            for chunk_x in range(first_chunk_x, last_chunk_x + 1)
+            for chunk_y in range(first_chunk_y, last_chunk_y + 1)
+        ]
+
+    def get_region(self, x: int, y: int) -> int:
+        chunk = self.get_chunk(x // self.chunk_size, y // self.chunk_size)
+        return int(chunk.region_matrix[x - chunk.window.x_start, y - chunk.window.y_start])
+
+    def get_region_matrix(self, window: MapWindow) -> ndarray:
+        """
+        Returns the regions of a window of the map indexed by [x - window.x_start][y - window.y_start], generating the
+        chunks that overlap it. The window must be inside of the map.
+        """
+        region_matrix = numpy.empty((window.x_end - window.x_start, window.y_end - window.y_start), dtype=numpy.int32)
+        for chunk in self.get_chunks_in_window(window):
+            overlap = MapWindow(
+                max(window.x_start, chunk.window.x_start),
+                min(window.x_end, chunk.window.x_end),
+                max(window.y_start, chunk.window.y_start),
+                min(window.y_end, chunk.window.y_end),
+            )
+            region_matrix[_get_relative_window(overlap, window).slices] = chunk.region_matrix[
+                _get_relative_window(overlap, chunk.window).slices
+            ]
+        return region_matrix
+
+    def get_border_points(self, region: int, window: MapWindow) -> ndarray:
+        """
+        Returns the border points of a region in the chunks that overlap the window.
+        """
+        chunk_border_points = [
+            chunk.border_points[chunk.border_regions == region] for chunk in self.get_chunks_in_window(window)
+        ]
+        if len(chunk_border_points) == 0:
+            return numpy.zeros((0, 2), dtype=numpy.int32)
+        return numpy.concatenate(chunk_border_points)
+
+    def _generate_chunk(self, window: MapWindow) -> WorldChunk:
+        # Include the tiles just outside of the chunk so borders with the neighbouring chunks can be found
+        halo_window = MapWindow(
+            max(window.x_start - 1, 0),
+            min(window.x_end + 1, self.map_size),
+            max(window.y_start - 1, 0),
+            min(window.y_end + 1, self.map_size),
+        )
+        halo_tiles = self.generate_tiles(halo_window)
+
+        land_mask = MapTile.get_land_mask(halo_tiles)
+        halo_regions = numpy.full(halo_tiles.shape, -1, dtype=numpy.int32)
+        if self._location_tree is not None:
+            land_points = numpy.argwhere(land_mask) + (halo_window.x_start, halo_window.y_start)
+            halo_regions[land_mask] = find_closest_locations(land_points, self._location_tree)
+
+        # Pad with the outside of the map where the chunk is at the edge of the map
+        padding = (
+            (int(window.x_start == 0), int(window.x_end == self.map_size)),
+            (int(window.y_start == 0), int(window.y_end == self.map_size)),
+        )
+        border_mask = calculate_padded_border_mask(
+            numpy.pad(halo_regions, padding, constant_values=OUTSIDE_OF_MAP_REGION)
+        )
+
+        chunk_slices = _get_relative_window(window, halo_window).slices
+        region_matrix = halo_regions[chunk_slices].copy()
+        border_points = (numpy.argwhere(border_mask) + (window.x_start, window.y_start)).astype(numpy.int32)
+
+        return WorldChunk(
+            window=window,
+            map_tiles=halo_tiles[chunk_slices].copy(),
+            region_matrix=region_matrix,
+            border_points=border_points,
+            border_regions=region_matrix[border_mask],
+        )
@@ -0,0 +1,25 @@
+from citygame.src.state.game_state import GameState
+from citygame.src.state.hero_actor import Hero
+from citygame.src.state.location_actor import Locations
+from citygame.src.state.location_table import LocationTable
+
+
+class TestHeroActor:
+    def test_heroes_have_integer_ids(self):
+        game_state = GameState()
+        starting_location = Locations(LocationTable([(0, 0)]), None)[0]
+
+        heroes = [Hero(starting_location, game_state, f"Hero {i}") for i in range(3)]
+
+        assert [hero.id for hero in heroes] == [0, 1, 2]
+        assert game_state.create_hero_id() == 3
+        assert not hasattr(heroes[0], "__dict__")
+
+    def test_heroes_are_hashed_by_identity(self):
+        game_state = GameState()
+        starting_location = Locations(LocationTable([(0, 0)]), None)[0]
+        hero = Hero(starting_location, game_state)
+        other_hero = Hero(starting_location, game_state)
+
+        assert len({hero, other_hero, hero}) == 2
+        assert hero != other_hero
@@ -0,0 +1,58 @@
+import pickle
+
+import numpy
+
+from citygame.src.constants.location_state_enum import LocationState
+from citygame.src.state.location_actor import Location, Locations
+from citygame.src.state.location_table import LocationTable
+
+
+class TestLocationTable:
+    def test_locations_are_views_of_rows(self):
+        location_table = LocationTable([(1, 2), (3, 4), (5, 6)])
+        locations = Locations(location_table, None)
+
+        location = locations[1]
+        location.set_name("Ashford")
+        location.set_location_state(LocationState.DISCOVERED)
+        location.danger_points = 42
+
+        assert (location.x, location.y) == (3, 4)
+        assert location_table.names[1] == "Ashford"
+        assert location_table.get_state(1) == LocationState.DISCOVERED
+        assert location_table.danger_points[1] == 42
+        assert locations[0].name == "(1,2)"
+        assert locations[1] is location
+        assert locations[-1] is locations[2]
+        # Locations are compared by identity, so another view of the same row is another location
+        assert locations[1] != Location(1, location_table, None)
+
+    def test_get_ids_in_states(self):
+        location_table = LocationTable([(0, 0), (1, 1), (2, 2), (3, 3)])
+        location_table.set_state(1, LocationState.DISCOVERED)
+        location_table.set_state(2, LocationState.CONQUERED)
+        location_table.set_state(3, LocationState.EXPLORED)
+
+        assert location_table.get_ids_in_states(LocationState.DISCOVERED, LocationState.EXPLORED).tolist() == [1, 3]
+        assert location_table.get_ids_in_states(LocationState.HIDDEN).tolist() == [0]
+
+    def test_set_levels_and_movement_costs(self):
+        location_table = LocationTable([(0, 0), (1, 1), (2, 2)])
+
+        location_table.set_region_movement_costs(slice(None), [1.0, 3.0, numpy.nan])
+        location_table.set_levels([0, 1, 2], [2, 2, 2])
+
+        assert location_table.get_levels([0, 2]).tolist() == [2, 2]
+        assert location_table.terrain_difficulties.tolist() == [1.0, 1.5, 1.0]
+        assert location_table.danger_points.tolist() == [300, 450, 300]
+        assert location_table.initial_danger_points.tolist() == [300, 450, 300]
+
+    def test_pickle_locations(self):
+        location_table = LocationTable([(1, 2), (3, 4)])
+        locations = Locations(location_table, None)
+        locations[0].set_level(3)
+
+        unpickled_locations = pickle.loads(pickle.dumps(locations))
+
+        assert unpickled_locations[0].level == 3
+        assert unpickled_locations[0].location_table is unpickled_locations[1].location_table
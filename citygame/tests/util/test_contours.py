@@ -0,0 +1,59 @@
+import numpy
+
+from citygame.src.util.contours import simplify_polyline, trace_contours, trace_region_contours
+from citygame.src.util.maps import MapWindow
+
+
+class TestContours:
+    def test_trace_contours(self):
+        mask = numpy.zeros((5, 5), dtype=bool)
+        mask[1:3, 1:4] = True
+
+        polylines = trace_contours(mask)
+
+        # The outline runs halfway between the tiles inside and outside of the rectangle, cutting its corners
+        assert len(polylines) == 1
+        assert sorted(map(tuple, polylines[0].tolist())) == [
+            (0.5, 1.0),
+            (0.5, 2.0),
+            (0.5, 3.0),
+            (1.0, 0.5),
+            (1.0, 3.5),
+            (2.0, 0.5),
+            (2.0, 3.5),
+            (2.5, 1.0),
+            (2.5, 2.0),
+            (2.5, 3.0),
+        ]
+        # Consecutive points are next to each other, including the last and the first point
+        steps = numpy.abs(numpy.diff(numpy.concatenate((polylines[0], polylines[0][:1])), axis=0))
+        assert numpy.all(numpy.sum(steps, axis=1) == 1)
+
+    def test_trace_contours_of_separate_areas(self):
+        # Tiles that only touch at a corner are separate areas, and a hole has its own outline
+        diagonal_mask = numpy.array([[True, False], [False, True]])
+        ring_mask = numpy.ones((5, 5), dtype=bool)
+        ring_mask[2, 2] = False
+
+        assert len(trace_contours(diagonal_mask)) == 2
+        assert sorted(len(polyline) for polyline in trace_contours(ring_mask)) == [4, 20]
+        assert trace_contours(numpy.zeros((3, 3), dtype=bool)) == []
+
+    def test_simplify_polyline(self):
+        line = numpy.array([[0.0, 0.0], [1.0, 0.1], [2.0, -0.1], [3.0, 0.0], [3.0, 2.0]])
+
+        assert simplify_polyline(line, 0.5, closed=False).tolist() == [[0.0, 0.0], [3.0, 0.0], [3.0, 2.0]]
+        assert simplify_polyline(line, 0.05, closed=False).tolist() == line.tolist()
+
+    def test_trace_region_contours(self):
+        region_matrix = numpy.full((20, 30), -1)
+        region_matrix[2:12, 5:25] = 3
+        region_matrix[12:18, 5:25] = 4
+
+        polylines = trace_region_contours(region_matrix[slice(1, 19), slice(4, 26)], 3, MapWindow(1, 19, 4, 26))
+
+        # The straight sides are simplified to their ends, within half a tile of the outline of the region
+        assert len(polylines) == 1
+        assert len(polylines[0]) == 4
+        assert numpy.all((polylines[0] >= (1.5, 4.5)) & (polylines[0] <= (11.5, 24.5)))
+        assert numpy.all(numpy.ptp(polylines[0], axis=0) >= (9.5, 19.5))
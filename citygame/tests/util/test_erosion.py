@@ -0,0 +1,49 @@
+import numpy
+import pytest
+
+from citygame.src.util.erosion import ErosionParameters, erode
+
+
+def _generate_slope(size: int) -> numpy.ndarray:
+    # A bumpy slope so droplets have somewhere to go
+    random_generator = numpy.random.default_rng(0)
+    return numpy.add.outer(numpy.linspace(1, 0, size), numpy.zeros(size)) + random_generator.normal(
+        0, 0.05, (size, size)
+    )
+
+
+class TestErosion:
+    def test_erode_with_seed(self):
+        first_heights = _generate_slope(64)
+        second_heights = first_heights.copy()
+        other_heights = first_heights.copy()
+        original_heights = first_heights.copy()
+
+        erode(first_heights, seed=1)
+        erode(second_heights, seed=1)
+        erode(other_heights, seed=2)
+
+        assert numpy.array_equal(first_heights, second_heights)
+        assert not numpy.array_equal(first_heights, other_heights)
+        assert not numpy.array_equal(first_heights, original_heights)
+        assert numpy.all(numpy.isfinite(first_heights))
+
+    def test_erode_smooths_heights(self):
+        heights = _generate_slope(64)
+        original_roughness = numpy.abs(numpy.diff(heights, axis=1)).mean()
+
+        erode(heights, seed=1, parameters=ErosionParameters(droplets_per_tile=1.0))
+
+        assert numpy.abs(numpy.diff(heights, axis=1)).mean() < original_roughness
+
+    def test_erode_float32(self):
+        heights = _generate_slope(64).astype(numpy.float32)
+
+        erode(heights, seed=1)
+
+        assert heights.dtype == numpy.float32
+        assert numpy.all(numpy.isfinite(heights))
+
+    def test_erode_requires_contiguous_heights(self):
+        with pytest.raises(ValueError):
+            erode(_generate_slope(64)[:, ::2], seed=1)
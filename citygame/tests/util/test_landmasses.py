@@ -0,0 +1,36 @@
+import numpy
+
+from citygame.src.util.landmasses import NO_LANDMASS, label_landmasses
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.maps import MapWindow
+
+
+class TestLandmasses:
+    def test_label_landmasses(self):
+        water = MapTile.DEEP_WATER.value
+        grassland = MapTile.GRASSLAND.value
+        mountain = MapTile.MOUNTAIN.value
+        map_tiles = numpy.array(
+            [
+                [grassland, mountain, water, water],
+                [water, grassland, water, grassland],
+                [water, water, grassland, water],
+            ]
+        )
+
+        landmasses = label_landmasses(map_tiles)
+
+        # Tiles that only touch at a corner are on different landmasses
+        assert len(landmasses) == 3
+        assert landmasses.get_landmass(0, 0) == landmasses.get_landmass(1, 1)
+        assert landmasses.get_landmass(1, 3) != landmasses.get_landmass(2, 2)
+        assert landmasses.get_landmass(0, 2) == NO_LANDMASS
+
+        first_landmass = landmasses.get_landmass(0, 0)
+        assert landmasses.get_bounding_box(first_landmass) == MapWindow(0, 2, 0, 2)
+        assert landmasses.get_mask(first_landmass).tolist() == [
+            [True, True, False, False],
+            [False, True, False, False],
+            [False, False, False, False],
+        ]
+        assert landmasses.get_mask(first_landmass, MapWindow(1, 3, 1, 3)).tolist() == [[True, False], [False, False]]
@@ -1,4 +1,18 @@
-from citygame.src.util.locations import calculate_locations
+import numpy
+from scipy.spatial import cKDTree
+
+from citygame.src.constants.world_constants import DISTANCE_BETWEEN_LOCATIONS, MINIMUM_DISTANCE_BETWEEN_LOCATIONS
+from citygame.src.util import locations
+from citygame.src.util.landmasses import label_landmasses
+from citygame.src.util.locations import (
+    calculate_border_arrays,
+    calculate_location_region,
+    calculate_locations,
+    calculate_regions,
+    find_close_location_pairs,
+    find_closest_locations,
+)
+from citygame.src.util.map_tile import MapTile
 from citygame.src.util.maps import generate_map
 
 
@@ -9,3 +23,208 @@ class TestLocations:
 
         locations = calculate_locations(map_object)
         assert len(locations) > 0
+
+    def test_location_distances(self):
+        map_size = 300
+        map_object = generate_map(map_size, map_size, seed=42)
+
+        location_points = numpy.asarray(calculate_locations(map_object, seed=7))
+
+        assert numpy.all(MapTile.get_buildable_mask(map_object)[location_points[:, 0], location_points[:, 1]])
+        tree = cKDTree(location_points)
+        assert numpy.min(tree.query(location_points, k=2)[0][:, 1]) >= MINIMUM_DISTANCE_BETWEEN_LOCATIONS
+        # Every location is placed about DISTANCE_BETWEEN_LOCATIONS away from one of the locations before it
+        for i in range(1, len(location_points)):
+            distances = numpy.hypot(*(location_points[:i] - location_points[i]).T)
+            assert numpy.any(numpy.abs(distances - DISTANCE_BETWEEN_LOCATIONS) <= 1.5)
+
+    def test_calculate_regions(self):
+        grassland = MapTile.GRASSLAND.value
+        map_tiles = numpy.full((9, 9), grassland)
+        map_tiles[0, :] = MapTile.DEEP_WATER.value
+        # Tiles on the lines between the locations are as close to two or four of them
+        location_points = [(2, 2), (6, 2), (2, 6), (6, 6)]
+
+        region_matrix = calculate_regions(location_points, map_tiles)
+
+        # Every land tile is in the region of its closest location, and ties go to the location with the highest index
+        squared_distances = numpy.sum(
+            (numpy.argwhere(map_tiles == grassland)[:, None, :] - numpy.asarray(location_points)[None, :, :]) ** 2,
+            axis=2,
+        )
+        last_closest = len(location_points) - 1 - numpy.argmin(squared_distances[:, ::-1], axis=1)
+        assert region_matrix[map_tiles == grassland].tolist() == last_closest.tolist()
+        assert numpy.all(region_matrix[0, :] == -1)
+        assert region_matrix[4, 4] == 3
+
+    def test_calculate_location_region(self):
+        map_size = 200
+        map_object = generate_map(map_size, map_size, seed=42)
+        location_points = calculate_locations(map_object, seed=42)
+        region_matrix = calculate_regions(location_points, map_object)
+        border_points, border_offsets = calculate_border_arrays(location_points, region_matrix)
+        location_tree = cKDTree(location_points)
+
+        # Each region is the same as in the regions of the whole map
+        for i in range(len(location_points)):
+            location_region = calculate_location_region(
+                i, location_tree, lambda window: MapTile.get_land_mask(map_object[window.slices]), map_size, map_size
+            )
+            region_mask = numpy.zeros((map_size, map_size), dtype=bool)
+            region_mask[location_region.window.slices] = location_region.region_matrix == i
+            assert numpy.array_equal(region_mask, region_matrix == i)
+            assert sorted(location_region.border_points.tolist()) == sorted(
+                border_points[slice(border_offsets[i], border_offsets[i + 1])].tolist()
+            )
+
+    def test_calculate_location_region_on_starting_landmass(self):
+        map_size = 300
+        map_object = generate_map(map_size, map_size, seed=42)
+        landmasses = label_landmasses(map_object)
+        location_points = calculate_locations(map_object, seed=42, landmasses=landmasses)
+        region_matrix = calculate_regions(location_points, map_object, landmasses=landmasses)
+        location_tree = cKDTree(location_points)
+        starting_landmass = landmasses.get_landmass(*location_points[0])
+        bounding_box = landmasses.get_bounding_box(starting_landmass)
+
+        # Each region is the same as in the regions of the whole map, and its window stays in the landmass
+        for i in range(len(location_points)):
+            location_region = calculate_location_region(
+                i,
+                location_tree,
+                lambda window: landmasses.get_mask(starting_landmass, window),
+                map_size,
+                map_size,
+                bounding_box=bounding_box,
+            )
+            window = location_region.window
+            assert bounding_box.x_start <= window.x_start and window.x_end <= bounding_box.x_end
+            assert bounding_box.y_start <= window.y_start and window.y_end <= bounding_box.y_end
+            region_mask = numpy.zeros((map_size, map_size), dtype=bool)
+            region_mask[window.slices] = location_region.region_matrix == i
+            assert numpy.array_equal(region_mask, region_matrix == i)
+
+    def test_find_closest_locations_with_many_ties(self):
+        # Every location is 5 away from (10, 10), so the one with the highest index is the closest
+        location_points = [(15, 10), (10, 15), (13, 14), (14, 13), (5, 10), (10, 5), (7, 14), (30, 30)]
+
+        closest_locations = find_closest_locations(numpy.array([[10, 10], [29, 30]]), cKDTree(location_points))
+
+        assert closest_locations.tolist() == [6, 7]
+
+    def test_calculate_regions_with_many_ties(self):
+        location_points = [(15, 10), (10, 15), (13, 14), (14, 13), (5, 10), (10, 5), (7, 14)]
+        map_tiles = numpy.full((20, 20), MapTile.GRASSLAND.value)
+
+        region_matrix = calculate_regions(location_points, map_tiles)
+
+        # Every tile is in the region of the closest location with the highest index
+        points = numpy.argwhere(numpy.ones((20, 20), dtype=bool))
+        squared_distances = numpy.sum((points[:, None, :] - numpy.array(location_points)[None, :, :]) ** 2, axis=2)
+        is_closest = squared_distances == numpy.min(squared_distances, axis=1, keepdims=True)
+        expected_regions = len(location_points) - 1 - numpy.argmax(is_closest[:, ::-1], axis=1)
+        assert numpy.array_equal(region_matrix.reshape(-1), expected_regions)
+        assert region_matrix[10, 10] == 6
+
+    def test_find_close_location_pairs(self):
+        location_points = numpy.random.default_rng(3).integers(0, 200, (300, 2))
+        # Points exactly at the maximum distance are not close
+        location_points[:2] = [[0, 0], [3, 4]]
+
+        pairs = find_close_location_pairs(location_points, 5)
+
+        squared_distances = numpy.sum((location_points[:, None, :] - location_points[None, :, :]) ** 2, axis=2)
+        expected_pairs = numpy.argwhere(numpy.triu(squared_distances < 25, k=1))
+        assert sorted(map(tuple, pairs.tolist())) == sorted(map(tuple, expected_pairs.tolist()))
+
+    def test_calculate_locations_with_seed(self):
+        map_size = 200
+        map_object = generate_map(map_size, map_size, seed=42)
+
+        assert calculate_locations(map_object, seed=7) == calculate_locations(map_object, seed=7)
+
+    def test_calculate_locations_with_progress(self):
+        map_size = 200
+        map_object = generate_map(map_size, map_size, seed=42)
+        progress_values = []
+
+        locations = calculate_locations(map_object, seed=7, progress_callback=progress_values.append)
+
+        assert locations == calculate_locations(map_object, seed=7)
+        assert progress_values == sorted(progress_values)
+        assert progress_values[-1] == 1.0
+
+    def test_calculate_regions_and_borders_to_file(self, monkeypatch, tmp_path):
+        map_size = 100
+        # Use small bands so the regions and borders are streamed in several parts
+        monkeypatch.setattr(locations, "STREAMING_BAND_SIZE", 1000)
+        map_object = generate_map(map_size, map_size, seed=42)
+        location_points = calculate_locations(map_object, seed=42)
+
+        region_matrix = calculate_regions(location_points, map_object)
+        streamed_region_matrix = calculate_regions(location_points, map_object, str(tmp_path / "regions.npy"))
+        assert isinstance(streamed_region_matrix, numpy.memmap)
+        assert numpy.array_equal(streamed_region_matrix, region_matrix)
+
+        border_points, border_offsets = calculate_border_arrays(location_points, region_matrix)
+        streamed_border_points, streamed_border_offsets = calculate_border_arrays(
+            location_points, streamed_region_matrix, str(tmp_path / "borders.npy")
+        )
+        assert isinstance(streamed_border_points, numpy.memmap)
+        assert numpy.array_equal(streamed_border_points, border_points)
+        assert numpy.array_equal(streamed_border_offsets, border_offsets)
+        # Every border point is in its region and next to another region or the edge of the map
+        padded_regions = numpy.pad(region_matrix, 1, constant_values=-2)
+        for i, (start, end) in enumerate(zip(border_offsets[:-1], border_offsets[1:])):
+            x, y = border_points[start:end].T + 1
+            assert numpy.all(padded_regions[x, y] == i)
+            assert numpy.all(
+                (padded_regions[x - 1, y] != i)
+                | (padded_regions[x + 1, y] != i)
+                | (padded_regions[x, y - 1] != i)
+                | (padded_regions[x, y + 1] != i)
+            )
+        assert border_offsets[-1] < numpy.sum(region_matrix != -1)
+
+    def test_calculate_border_arrays_at_map_edges(self):
+        region_matrix = numpy.array(
+            [
+                [0, 0, 0, -1],
+                [0, 0, 1, 1],
+                [0, 0, 1, 1],
+            ]
+        )
+
+        border_points, border_offsets = calculate_border_arrays([(0, 0), (2, 3)], region_matrix)
+
+        # Every tile is a border point because it is either at the edge of the map or next to another region
+        assert border_offsets.tolist() == [0, 7, 11]
+        assert border_points[:7].tolist() == [[0, 0], [0, 1], [0, 2], [1, 0], [1, 1], [2, 0], [2, 1]]
+        assert border_points[7:].tolist() == [[1, 2], [1, 3], [2, 2], [2, 3]]
+
+    def test_locations_and_regions_on_starting_landmass(self, monkeypatch, tmp_path):
+        map_size = 300
+        monkeypatch.setattr(locations, "STREAMING_BAND_SIZE", 10000)
+        map_object = generate_map(map_size, map_size, seed=42)
+        landmasses = label_landmasses(map_object)
+
+        location_points = calculate_locations(map_object, seed=42, landmasses=landmasses)
+        starting_landmass = landmasses.get_landmass(*location_points[0])
+        assert all(landmasses.get_landmass(x, y) == starting_landmass for x, y in location_points)
+        # Without the landmasses some locations are placed on other landmasses
+        unrestricted_points = calculate_locations(map_object, seed=42)
+        assert any(landmasses.get_landmass(x, y) != starting_landmass for x, y in unrestricted_points)
+
+        region_matrix = calculate_regions(location_points, map_object, landmasses=landmasses)
+        assert numpy.array_equal(region_matrix != -1, landmasses.get_mask(starting_landmass))
+        streamed_region_matrix = calculate_regions(
+            location_points, map_object, str(tmp_path / "regions.npy"), landmasses=landmasses
+        )
+        assert numpy.array_equal(streamed_region_matrix, region_matrix)
+
+        border_points, border_offsets = calculate_border_arrays(location_points, region_matrix, landmasses=landmasses)
+        unrestricted_border_points, unrestricted_border_offsets = calculate_border_arrays(
+            location_points, region_matrix
+        )
+        assert numpy.array_equal(border_points, unrestricted_border_points)
+        assert numpy.array_equal(border_offsets, unrestricted_border_offsets)
@@ -0,0 +1,36 @@
+import pickle
+
+import pytest
+
+from citygame.src.util.lru_cache import LruCache
+
+
+class TestLruCache:
+    def test_get_creates_value_once(self):
+        cache = LruCache(2)
+        assert cache.get("a", lambda: 1) == 1
+        assert cache.get("a", lambda: 2) == 1
+
+    def test_least_recently_used_value_is_evicted(self):
+        cache = LruCache(2)
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        cache.get("a", lambda: 1)
+        cache.get("c", lambda: 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert len(cache) == 2
+
+    def test_pickled_empty(self):
+        cache = LruCache(2)
+        cache.get("a", lambda: 1)
+
+        unpickled_cache = pickle.loads(pickle.dumps(cache))
+        assert len(unpickled_cache) == 0
+        assert unpickled_cache.maximum_size == 2
+
+    def test_invalid_maximum_size(self):
+        with pytest.raises(ValueError):
+            LruCache(0)
@@ -0,0 +1,62 @@
+import numpy
+from PIL import Image
+
+from citygame.src.util import map_export, world_cache
+from citygame.src.util.locations import calculate_border_arrays
+from citygame.src.util.map_export import export_world, get_region_palette
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.world_cache import load_world
+
+
+def _read_image(image_path: str) -> numpy.ndarray:
+    # Images are indexed by [y][x]
+    with Image.open(image_path) as image:
+        return numpy.asarray(image).transpose(1, 0, 2)
+
+
+class TestMapExport:
+    def test_export_world(self, monkeypatch, tmp_path):
+        monkeypatch.setattr(world_cache, "get_world_cache_directory", lambda: str(tmp_path / "cache"))
+        map_export.main(["42", "100", "--output", str(tmp_path / "export")])
+        world = load_world(42, 100, 100)
+
+        # Export in strips that do not divide the map evenly
+        image_paths = export_world(world, str(tmp_path), seed=42, strip_rows=7)
+        assert [path.split("/")[-1] for path in image_paths] == [
+            "tiles.png",
+            "regions.png",
+            "borders.png",
+            "locations.png",
+        ]
+        for image_path in image_paths:
+            exported_image = _read_image(str(tmp_path / "export" / image_path.split("/")[-1]))
+            assert numpy.array_equal(_read_image(image_path), exported_image)
+
+        tiles_image = _read_image(image_paths[0])
+        assert numpy.array_equal(tiles_image, MapTile.get_rgb_image(world.map_tiles))
+
+        region_palette = get_region_palette(len(world.location_points), seed=42)
+        assert numpy.array_equal(_read_image(image_paths[1]), region_palette[world.region_matrix])
+
+        borders_image = _read_image(image_paths[2])
+        border_points, border_offsets = calculate_border_arrays(world.location_points, world.region_matrix)
+        changed_points = numpy.argwhere(numpy.any(borders_image != tiles_image, axis=2))
+        assert set(map(tuple, changed_points.tolist())) <= set(map(tuple, border_points.tolist()))
+
+        locations_image = _read_image(image_paths[3])
+        for x, y in world.location_points:
+            assert locations_image[x, y].tolist() == map_export.LOCATION_RGB_VALUE
+
+    def test_export_layers(self, tmp_path):
+        world = world_cache.CachedWorld.from_generated_world(
+            map_tiles=numpy.full((20, 10), MapTile.GRASSLAND.value, dtype=numpy.uint8),
+            location_points=[(5, 5)],
+            region_matrix=numpy.zeros((20, 10), dtype=numpy.int16),
+            border_points=numpy.zeros((0, 2), dtype=numpy.int32),
+            border_offsets=numpy.array([0, 0]),
+        )
+
+        image_paths = export_world(world, str(tmp_path), layers=["regions"])
+
+        assert image_paths == [str(tmp_path / "regions.png")]
+        assert _read_image(image_paths[0]).shape == (20, 10, 3)
@@ -0,0 +1,40 @@
+import numpy
+
+from citygame.src.util.map_tile import MapTile
+
+
+class TestMapTile:
+    def test_whole_array_helpers_match_single_tiles(self):
+        map_tiles = numpy.array([[tile.value for tile in MapTile] + [0, 99, -1]])
+
+        rgb_image = MapTile.get_rgb_image(map_tiles)
+        land_mask = MapTile.get_land_mask(map_tiles)
+        buildable_mask = MapTile.get_buildable_mask(map_tiles)
+        movement_costs = MapTile.get_movement_cost_matrix(map_tiles)
+
+        assert rgb_image.shape == map_tiles.shape + (3,)
+        for y, tile in enumerate(map_tiles[0]):
+            assert rgb_image[0][y].tolist() == MapTile.get_rgb_value(tile)
+            assert land_mask[0][y] == MapTile.is_land(tile)
+            assert buildable_mask[0][y] == MapTile.is_buildable_tile(tile)
+            assert movement_costs[0][y] == MapTile.get_movement_cost(tile)
+
+    def test_single_tiles(self):
+        assert MapTile.get_rgb_value(MapTile.DEEP_WATER.value) == [0, 62, 173]
+        assert MapTile.get_rgb_value(99) == [255, 0, 0]
+        assert not MapTile.is_land(MapTile.SHALLOW_WATER.value)
+        assert MapTile.is_land(MapTile.BEACH.value)
+        assert MapTile.is_buildable_tile(float(MapTile.GRASSLAND.value))
+        assert not MapTile.is_buildable_tile(MapTile.MOUNTAIN.value)
+        assert MapTile.is_land(MapTile.RIVER.value)
+        assert not MapTile.is_buildable_tile(MapTile.RIVER.value)
+        assert MapTile.get_movement_cost(MapTile.RIVER.value) > MapTile.get_movement_cost(MapTile.GRASSLAND.value)
+        assert MapTile.get_movement_cost(MapTile.DEEP_WATER.value) == float("inf")
+
+    def test_from_thresholds(self):
+        values = numpy.array([-1.0, 0.0, 0.5, 1.0, 2.0])
+
+        map_tiles = MapTile.from_thresholds(values, [0.0, 1.0], [MapTile.DEEP_WATER, MapTile.BEACH, MapTile.SNOW])
+
+        expected_tiles = [MapTile.DEEP_WATER, MapTile.BEACH, MapTile.BEACH, MapTile.SNOW, MapTile.SNOW]
+        assert map_tiles.tolist() == [tile.value for tile in expected_tiles]
@@ -1,12 +1,142 @@
+import random
+
 import numpy
+import pytest
 
+from citygame.src.constants.noise_mode_enum import NoiseMode
+from citygame.src.util import maps
+from citygame.src.util.map_tile import MapTile
 from citygame.src.util.maps import generate_map
 
 
 class TestMaps:
-    def test_generate_map(self):
+    @pytest.mark.parametrize("noise_mode", list(NoiseMode))
+    def test_generate_map(self, noise_mode: NoiseMode):
         map_size = 100
-        map_object = generate_map(map_size, map_size)
+        map_object = generate_map(map_size, map_size, noise_mode)
 
         assert not numpy.isnan(map_object).any()
         assert not numpy.isinf(map_object).any()
+
+    @pytest.mark.parametrize("noise_mode", list(NoiseMode))
+    def test_generate_map_in_parallel_matches_single_process(self, monkeypatch, noise_mode: NoiseMode):
+        map_size = 100
+        # Use small chunks so the map is split across several windows
+        monkeypatch.setattr(maps, "PARALLEL_CHUNK_SIZE", 32)
+
+        random.seed(1)
+        single_process_map = generate_map(map_size, map_size, noise_mode)
+        random.seed(1)
+        parallel_map = generate_map(map_size, map_size, noise_mode, processes=3)
+
+        assert numpy.array_equal(single_process_map, parallel_map)
+
+    def test_generate_small_map_in_one_process(self, monkeypatch):
+        def fail_to_start_pool(processes: int):
+            raise AssertionError(f"Started a pool of {processes} processes")
+
+        monkeypatch.setattr(maps, "Pool", fail_to_start_pool)
+
+        # A 300 map only has 4 chunks, which is not enough for more than one process
+        small_map = generate_map(300, 300, seed=42, processes=8)
+
+        assert numpy.array_equal(small_map, generate_map(300, 300, seed=42))
+
+    def test_generate_map_with_seed(self):
+        map_size = 100
+
+        first_map = generate_map(map_size, map_size, seed=42)
+        second_map = generate_map(map_size, map_size, seed=42)
+        other_map = generate_map(map_size, map_size, seed=43)
+
+        assert numpy.array_equal(first_map, second_map)
+        assert not numpy.array_equal(first_map, other_map)
+
+    @pytest.mark.parametrize("processes", [1, 3])
+    def test_generate_map_low_memory(self, monkeypatch, processes: int):
+        map_size = 100
+        monkeypatch.setattr(maps, "PARALLEL_CHUNK_SIZE", 32)
+
+        map_object = generate_map(map_size, map_size, seed=42)
+        low_memory_map = generate_map(map_size, map_size, seed=42, processes=processes, low_memory=True)
+
+        assert low_memory_map.dtype == numpy.uint8
+        # Only tiles right at a threshold can change with float32 heights
+        assert numpy.mean(low_memory_map != map_object) < 0.001
+
+    def test_generate_map_to_file(self, monkeypatch, tmp_path):
+        map_size = 100
+        # Use small bands so the map is streamed in several parts
+        monkeypatch.setattr(maps, "STREAMING_BAND_SIZE", 1000)
+
+        map_object = generate_map(map_size, map_size, seed=42)
+        streamed_map = generate_map(map_size, map_size, seed=42, output_path=str(tmp_path / "tiles.npy"))
+
+        assert isinstance(streamed_map, numpy.memmap)
+        assert numpy.array_equal(streamed_map, map_object)
+
+    @pytest.mark.parametrize("processes", [1, 3])
+    def test_generate_map_with_progress(self, monkeypatch, processes: int):
+        map_size = 100
+        monkeypatch.setattr(maps, "PARALLEL_CHUNK_SIZE", 32)
+        progress_values = []
+
+        map_object = generate_map(map_size, map_size, seed=42)
+        progress_map = generate_map(
+            map_size, map_size, seed=42, processes=processes, progress_callback=progress_values.append
+        )
+
+        assert numpy.array_equal(progress_map, map_object)
+        assert progress_values == sorted(progress_values)
+        assert progress_values[-1] == pytest.approx(1.0)
+
+    def test_generate_map_previews(self):
+        map_size = 300
+
+        previews = list(maps.generate_map_previews(map_size, map_size, seed=42, minimum_size=64, maximum_size=512))
+
+        # The last preview is coarser than the map, which is generated after the previews
+        assert [preview.shape for preview in previews] == [(75, 75), (150, 150)]
+
+    def test_generate_map_previews_small_map(self):
+        previews = list(maps.generate_map_previews(50, 50, seed=42, minimum_size=64, maximum_size=512))
+
+        assert [preview.shape for preview in previews] == [(25, 25)]
+
+    def test_generate_map_previews_maximum_size(self):
+        previews = list(maps.generate_map_previews(1000, 1000, seed=42, minimum_size=64, maximum_size=512))
+
+        assert [preview.shape for preview in previews] == [(67, 67), (143, 143), (334, 334)]
+
+    def test_generate_map_with_erosion(self, monkeypatch, tmp_path):
+        map_size = 100
+        monkeypatch.setattr(maps, "PARALLEL_CHUNK_SIZE", 32)
+
+        map_object = generate_map(map_size, map_size, seed=42)
+        eroded_map = generate_map(map_size, map_size, seed=42, erosion=True)
+        assert not numpy.array_equal(eroded_map, map_object)
+
+        # Erosion does not depend on how the map is generated
+        assert numpy.array_equal(generate_map(map_size, map_size, seed=42, erosion=True), eroded_map)
+        assert numpy.array_equal(generate_map(map_size, map_size, seed=42, processes=3, erosion=True), eroded_map)
+        streamed_map = generate_map(map_size, map_size, seed=42, output_path=str(tmp_path / "tiles.npy"), erosion=True)
+        assert numpy.array_equal(streamed_map, eroded_map)
+
+    def test_generate_map_with_rivers(self, monkeypatch, tmp_path):
+        map_size = 300
+        monkeypatch.setattr(maps, "PARALLEL_CHUNK_SIZE", 64)
+
+        map_object = generate_map(map_size, map_size, seed=42)
+        river_map = generate_map(map_size, map_size, seed=42, rivers=True)
+        river_mask = river_map == MapTile.RIVER.value
+        assert numpy.any(river_mask)
+        # Rivers only replace land tiles
+        assert numpy.all(MapTile.get_land_mask(map_object[river_mask]))
+        assert numpy.array_equal(river_map[~river_mask], map_object[~river_mask])
+
+        # Rivers do not depend on how the map is generated
+        assert numpy.array_equal(generate_map(map_size, map_size, seed=42, processes=3, rivers=True), river_map)
+        windows_map = generate_map(map_size, map_size, seed=42, progress_callback=lambda progress: None, rivers=True)
+        assert numpy.array_equal(windows_map, river_map)
+        streamed_map = generate_map(map_size, map_size, seed=42, output_path=str(tmp_path / "tiles.npy"), rivers=True)
+        assert numpy.array_equal(streamed_map, river_map)
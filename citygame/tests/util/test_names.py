@@ -0,0 +1,48 @@
+import sys
+
+from citygame.src.util import names
+from citygame.src.util.names import (
+    HERO_NAME_MODEL,
+    LOCATION_NAME_MODEL,
+    MAXIMUM_NAME_LENGTH,
+    MINIMUM_NAME_LENGTH,
+    NameGenerator,
+    NameModel,
+)
+
+
+class TestNames:
+    def test_generate_names(self):
+        location_names = NameGenerator(42).generate(1000, LOCATION_NAME_MODEL)
+
+        assert len(location_names) == 1000
+        assert len(set(location_names)) == 1000
+        for name in location_names:
+            assert MINIMUM_NAME_LENGTH <= len(name) <= MAXIMUM_NAME_LENGTH
+            assert name[0].isupper() and name[1:].islower()
+            assert sys.intern(name) is name
+
+    def test_names_are_reproducible_from_seed(self):
+        assert NameGenerator(42).generate(100, LOCATION_NAME_MODEL) == NameGenerator(42).generate(
+            100, LOCATION_NAME_MODEL
+        )
+        assert NameGenerator(42).generate(100, LOCATION_NAME_MODEL) != NameGenerator(43).generate(
+            100, LOCATION_NAME_MODEL
+        )
+
+    def test_names_are_unique_across_batches(self):
+        name_generator = NameGenerator(42)
+        location_names = name_generator.generate(500, LOCATION_NAME_MODEL)
+        hero_names = name_generator.generate(500, HERO_NAME_MODEL)
+        more_hero_names = name_generator.generate(500, HERO_NAME_MODEL)
+
+        assert len(set(location_names + hero_names + more_hero_names)) == 1500
+
+    def test_names_run_out(self, monkeypatch):
+        monkeypatch.setattr(names, "MINIMUM_NAME_LENGTH", 1)
+        # The model can only make up the words it was trained on
+        model = NameModel(["ab", "cd"], variants=["Old {}"], order=2)
+
+        model_names = NameGenerator(42).generate(6, model)
+
+        assert sorted(model_names) == ["Ab", "Ab 2", "Cd", "Cd 2", "Old Ab", "Old Cd"]
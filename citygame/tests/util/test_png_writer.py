@@ -0,0 +1,34 @@
+import numpy
+import pytest
+from PIL import Image
+
+from citygame.src.util.png_writer import PngWriter
+
+
+class TestPngWriter:
+    def test_write_in_strips(self, tmp_path):
+        image = numpy.random.default_rng(0).integers(0, 256, (50, 30, 3), dtype=numpy.uint8)
+        image_path = str(tmp_path / "image.png")
+
+        with PngWriter(image_path, 30, 50) as png_writer:
+            for strip in numpy.array_split(image, [16, 32, 48]):
+                png_writer.write_rows(strip)
+
+        with Image.open(image_path) as written_image:
+            assert written_image.mode == "RGB"
+            assert numpy.array_equal(numpy.asarray(written_image), image)
+
+    def test_write_wrong_rows(self, tmp_path):
+        with PngWriter(str(tmp_path / "image.png"), 30, 50) as png_writer:
+            with pytest.raises(ValueError):
+                png_writer.write_rows(numpy.zeros((10, 20, 3), dtype=numpy.uint8))
+            with pytest.raises(ValueError):
+                png_writer.write_rows(numpy.zeros((60, 30, 3), dtype=numpy.uint8))
+            png_writer.write_rows(numpy.zeros((50, 30, 3), dtype=numpy.uint8))
+
+    def test_close_before_every_row_is_written(self, tmp_path):
+        png_writer = PngWriter(str(tmp_path / "image.png"), 30, 50)
+        png_writer.write_rows(numpy.zeros((10, 30, 3), dtype=numpy.uint8))
+
+        with pytest.raises(ValueError):
+            png_writer.close()
@@ -0,0 +1,51 @@
+import numpy
+
+from citygame.src.util import region_graph
+from citygame.src.util.locations import calculate_locations, calculate_regions
+from citygame.src.util.maps import generate_map
+from citygame.src.util.region_graph import calculate_region_adjacency
+
+
+class TestRegionGraph:
+    def test_calculate_region_adjacency(self):
+        region_matrix = numpy.array(
+            [
+                [0, 0, 1, 1],
+                [0, 0, 1, 1],
+                [-1, -1, -1, 3],
+                [2, 2, -1, 3],
+            ]
+        )
+
+        region_adjacency = calculate_region_adjacency(region_matrix, 4)
+
+        # Regions that only touch at a corner or through tiles without a region are not adjacent
+        assert region_adjacency.pairs.tolist() == [[0, 1], [1, 3]]
+        assert region_adjacency.border_lengths.tolist() == [2, 1]
+        assert region_adjacency.get_neighbors(1).tolist() == [0, 3]
+        assert region_adjacency.get_neighbors(2).tolist() == []
+        offsets, neighbors = region_adjacency.get_adjacency_arrays(4)
+        assert offsets.tolist() == [0, 1, 3, 3, 4]
+        assert neighbors.tolist() == [1, 0, 3, 1]
+        assert region_adjacency.get_border_length(3, 1) == 1
+        assert region_adjacency.get_border_length(0, 2) == 0
+
+    def test_calculate_region_adjacency_in_bands(self, monkeypatch):
+        map_tiles = generate_map(150, 150, seed=42)
+        location_points = calculate_locations(map_tiles, seed=42)
+        region_matrix = calculate_regions(location_points, map_tiles)
+
+        region_adjacency = calculate_region_adjacency(region_matrix, len(location_points))
+        monkeypatch.setattr(region_graph, "STREAMING_BAND_SIZE", 1000)
+        banded_region_adjacency = calculate_region_adjacency(region_matrix, len(location_points))
+
+        assert numpy.array_equal(banded_region_adjacency.pairs, region_adjacency.pairs)
+        assert numpy.array_equal(banded_region_adjacency.border_lengths, region_adjacency.border_lengths)
+        # Every pair of neighbouring tiles in different regions counts towards the border of their regions
+        is_x_pair = (region_matrix[:-1] != region_matrix[1:]) & (region_matrix[:-1] != -1) & (region_matrix[1:] != -1)
+        is_y_pair = (
+            (region_matrix[:, :-1] != region_matrix[:, 1:])
+            & (region_matrix[:, :-1] != -1)
+            & (region_matrix[:, 1:] != -1)
+        )
+        assert numpy.sum(region_adjacency.border_lengths) == numpy.sum(is_x_pair) + numpy.sum(is_y_pair)
@@ -0,0 +1,81 @@
+import numpy
+
+from citygame.src.util import region_statistics
+from citygame.src.util.locations import calculate_locations, calculate_regions
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.maps import MapWindow, generate_map
+from citygame.src.util.region_statistics import RegionStatistics, calculate_region_statistics
+
+
+class TestRegionStatistics:
+    def test_calculate_region_statistics(self):
+        water = MapTile.DEEP_WATER.value
+        grassland = MapTile.GRASSLAND.value
+        mountain = MapTile.MOUNTAIN.value
+        map_tiles = numpy.array(
+            [
+                [grassland, grassland, water],
+                [grassland, mountain, water],
+                [mountain, mountain, water],
+            ]
+        )
+        region_matrix = numpy.array(
+            [
+                [0, 0, -1],
+                [0, 1, -1],
+                [1, 1, -1],
+            ]
+        )
+
+        statistics = calculate_region_statistics(region_matrix, map_tiles, 3)
+
+        assert statistics.areas.tolist() == [3, 3, 0]
+        assert statistics.get_terrain_count(0, MapTile.GRASSLAND) == 3
+        assert statistics.get_terrain_count(1, MapTile.MOUNTAIN) == 3
+        assert statistics.get_terrain_shares(1) == [(MapTile.MOUNTAIN, 1.0)]
+        assert statistics.get_terrain_shares(2) == []
+        assert numpy.allclose(statistics.centroids[0], [1 / 3, 1 / 3])
+        assert numpy.all(numpy.isnan(statistics.centroids[2]))
+        assert statistics.get_bounding_box(0) == MapWindow(0, 2, 0, 2)
+        assert statistics.get_bounding_box(1) == MapWindow(1, 3, 0, 2)
+        movement_costs = statistics.get_average_movement_costs()
+        assert movement_costs[:2].tolist() == [1.0, 4.0]
+        assert numpy.isnan(movement_costs[2])
+
+    def test_calculate_region_statistics_in_bands(self, monkeypatch):
+        map_tiles = generate_map(150, 150, seed=42)
+        location_points = calculate_locations(map_tiles, seed=42)
+        region_matrix = calculate_regions(location_points, map_tiles)
+
+        statistics = calculate_region_statistics(region_matrix, map_tiles, len(location_points))
+        monkeypatch.setattr(region_statistics, "STREAMING_BAND_SIZE", 1000)
+        banded_statistics = calculate_region_statistics(region_matrix, map_tiles, len(location_points))
+
+        assert numpy.array_equal(banded_statistics.terrain_counts, statistics.terrain_counts)
+        assert numpy.allclose(banded_statistics.centroids, statistics.centroids)
+        assert numpy.array_equal(banded_statistics.bounding_boxes, statistics.bounding_boxes)
+        assert numpy.sum(statistics.areas) == numpy.sum(region_matrix != -1)
+        for i, (x, y) in enumerate(location_points):
+            bounding_box = statistics.get_bounding_box(i)
+            assert bounding_box.x_start <= x < bounding_box.x_end and bounding_box.y_start <= y < bounding_box.y_end
+
+    def test_set_region_from_window(self):
+        map_tiles = generate_map(100, 100, seed=42)
+        location_points = calculate_locations(map_tiles, seed=42)
+        region_matrix = calculate_regions(location_points, map_tiles)
+        statistics = calculate_region_statistics(region_matrix, map_tiles, len(location_points))
+
+        # The statistics of a region in a window around it are the same as in the whole map
+        region = len(location_points) - 1
+        window = statistics.get_bounding_box(region)
+        window_statistics = calculate_region_statistics(
+            numpy.where(region_matrix[window.slices] == region, 0, -1), map_tiles[window.slices], 1, window
+        )
+        lazy_statistics = RegionStatistics.empty(len(location_points))
+        lazy_statistics.set_region(region, window_statistics, 0)
+
+        assert lazy_statistics.areas[region] == statistics.areas[region]
+        assert numpy.array_equal(lazy_statistics.terrain_counts[region], statistics.terrain_counts[region])
+        assert numpy.allclose(lazy_statistics.centroids[region], statistics.centroids[region])
+        assert lazy_statistics.get_bounding_box(region) == window
+        assert numpy.sum(lazy_statistics.areas) == lazy_statistics.areas[region]
@@ -0,0 +1,68 @@
+import numpy
+
+from citygame.src.util.rivers import (
+    calculate_flow_accumulation,
+    calculate_flow_directions,
+    calculate_rivers,
+    fill_depressions,
+)
+
+
+def _generate_valley(size: int) -> numpy.ndarray:
+    # Land sloping down towards a sea along the bottom edge and towards a valley in the middle, with a pit in it
+    x_indices, y_indices = numpy.indices((size, size))
+    heights = numpy.abs(x_indices - size // 2) * 0.1 + (size - y_indices) * 0.01
+    heights[size // 2, size // 2] = -5.0
+    heights[:, -2:] = -1.0
+    return heights
+
+
+class TestRivers:
+    def test_fill_depressions(self):
+        heights = _generate_valley(21)
+        outlet_mask = heights == -1.0
+
+        filled_heights = fill_depressions(heights, outlet_mask)
+
+        assert numpy.array_equal(filled_heights[outlet_mask], heights[outlet_mask])
+        assert numpy.all(filled_heights >= heights)
+        # The pit is filled just above the tile it spills over
+        assert filled_heights[10, 10] > filled_heights[10, 11]
+        assert filled_heights[10, 10] < heights[10, 9]
+
+    def test_every_land_tile_drains_to_an_outlet(self):
+        heights = _generate_valley(21)
+        outlet_mask = heights == -1.0
+
+        receivers = calculate_flow_directions(fill_depressions(heights, outlet_mask), outlet_mask)
+
+        assert numpy.all(receivers[outlet_mask] == -1)
+        flat_receivers = receivers.reshape(-1)
+        for index in numpy.flatnonzero(~outlet_mask):
+            steps = 0
+            while flat_receivers[index] != -1:
+                index = flat_receivers[index]
+                steps += 1
+                assert steps <= heights.size
+            # Tiles that do not end in an outlet drain off the edge of the map
+            x, y = divmod(index, 21)
+            assert outlet_mask[x, y] or x in (0, 20) or y == 0
+
+    def test_flow_accumulation(self):
+        # 0 -> 1 -> 3 and 2 -> 3, and 4 does not drain anywhere
+        receivers = numpy.array([1, 3, 3, -1, -1])
+        source_mask = numpy.array([True, True, True, False, True])
+
+        drainage = calculate_flow_accumulation(receivers, source_mask)
+
+        assert drainage.tolist() == [1, 2, 1, 3, 1]
+
+    def test_calculate_rivers(self):
+        heights = _generate_valley(21)
+
+        river_mask = calculate_rivers(heights, water_threshold=-0.5, minimum_drainage=30)
+
+        assert numpy.any(river_mask)
+        # Rivers run along the bottom of the valley and never through the sea
+        assert numpy.all(numpy.argwhere(river_mask)[:, 0] == 10)
+        assert not numpy.any(river_mask[:, -2:])
@@ -0,0 +1,43 @@
+import noise
+import numpy
+import pytest
+
+from citygame.src.util.simplex import snoise2_grid, snoise2_grid_multiresolution
+
+
+class TestSimplex:
+    @pytest.mark.parametrize("base", [0, 1, 777, 10485])
+    def test_snoise2_grid_matches_noise_library(self, base: int):
+        x_coordinates = numpy.arange(-20, 40) / 100.0
+        y_coordinates = numpy.arange(0, 50) / 7.0
+        kwargs = dict(octaves=6, persistence=0.5, lacunarity=2.0, repeatx=1048576, repeaty=1048576, base=base)
+
+        noise_matrix = snoise2_grid(x_coordinates, y_coordinates, **kwargs)
+
+        assert noise_matrix.shape == (len(x_coordinates), len(y_coordinates))
+        for i, x in enumerate(x_coordinates):
+            for j, y in enumerate(y_coordinates):
+                assert noise_matrix[i][j] == noise._simplex.noise2(x, y, **kwargs)
+
+    def test_snoise2_grid_invalid_octaves(self):
+        with pytest.raises(ValueError):
+            snoise2_grid(numpy.arange(2), numpy.arange(2), octaves=0)
+
+    def test_snoise2_grid_multiresolution_error_bound(self):
+        coordinates = numpy.arange(256) / 100.0
+        kwargs = dict(octaves=8, persistence=0.5, lacunarity=2.0, repeatx=1048576, repeaty=1048576, base=4321)
+
+        exact_matrix = snoise2_grid(coordinates, coordinates, **kwargs)
+        approximate_matrix = snoise2_grid_multiresolution(range(256), range(256), 100.0, **kwargs)
+
+        error = numpy.abs(approximate_matrix - exact_matrix)
+        assert numpy.mean(error) < 0.01
+        assert numpy.max(error) < 0.15
+
+    def test_snoise2_grid_multiresolution_windows_line_up(self):
+        kwargs = dict(octaves=8, persistence=0.5, lacunarity=2.0, repeatx=1048576, repeaty=1048576, base=4321)
+
+        full_matrix = snoise2_grid_multiresolution(range(200), range(150), 100.0, **kwargs)
+        window_matrix = snoise2_grid_multiresolution(range(37, 141), range(90, 150), 100.0, **kwargs)
+
+        assert numpy.array_equal(full_matrix[37:141, 90:150], window_matrix)
@@ -0,0 +1,61 @@
+import math
+
+import numpy
+
+from citygame.src.util.map_tile import MapTile
+from citygame.src.util.maps import MapWindow
+from citygame.src.util.tile_index import TileIndex, find_nearest_buildable_tile
+
+
+class TestTileIndex:
+    def test_get_nearest_buildable_tile(self):
+        buildable_mask = numpy.zeros((5, 5), dtype=bool)
+        buildable_mask[0, 4] = True
+        buildable_mask[4, 1] = True
+
+        tile_index = TileIndex(buildable_mask, buildable_mask)
+
+        assert tile_index.get_nearest_buildable_tile(0, 4) == (0, 4)
+        assert tile_index.get_nearest_buildable_tile(1, 3) == (0, 4)
+        assert tile_index.get_nearest_buildable_tile(3, 0) == (4, 1)
+
+    def test_get_nearest_buildable_tile_in_window(self):
+        buildable_mask = numpy.zeros((3, 3), dtype=bool)
+        buildable_mask[2, 2] = True
+
+        tile_index = TileIndex(buildable_mask, buildable_mask, MapWindow(10, 13, 20, 23))
+
+        assert tile_index.get_nearest_buildable_tile(10, 20) == (12, 22)
+
+    def test_no_buildable_tiles(self):
+        map_tiles = numpy.full((4, 4), MapTile.DEEP_WATER.value)
+
+        assert TileIndex.from_tiles(map_tiles).get_nearest_buildable_tile(1, 1) is None
+        assert find_nearest_buildable_tile(lambda window: map_tiles[window.slices], 4, 4, 2, 2) is None
+
+    def test_get_distance_to_water(self):
+        water = MapTile.DEEP_WATER.value
+        grassland = MapTile.GRASSLAND.value
+        map_tiles = numpy.full((5, 5), grassland)
+        map_tiles[0, 0] = water
+
+        tile_index = TileIndex.from_tiles(map_tiles)
+
+        assert tile_index.get_distance_to_water(0, 0) == 0
+        assert tile_index.get_distance_to_water(0, 3) == 3
+        assert tile_index.get_distance_to_water(3, 4) == numpy.float32(5)
+        assert TileIndex.from_tiles(numpy.full((3, 3), grassland)).get_distance_to_water(1, 1) == math.inf
+
+    def test_find_nearest_buildable_tile(self):
+        random = numpy.random.default_rng(3)
+        # Few buildable tiles, so the nearest ones are often outside of the first window searched
+        map_tiles = numpy.where(random.random((300, 200)) < 0.0002, MapTile.GRASSLAND.value, MapTile.DEEP_WATER.value)
+        map_tiles[299, 199] = MapTile.GRASSLAND.value
+        tile_index = TileIndex.from_tiles(map_tiles)
+
+        for x, y in [(150, 100), (0, 0), (299, 0), (20, 180)]:
+            nearest_tile = find_nearest_buildable_tile(lambda window: map_tiles[window.slices], 300, 200, x, y)
+
+            # Ties can be broken differently, but the distance has to be the same
+            assert map_tiles[nearest_tile] == MapTile.GRASSLAND.value
+            assert math.dist(nearest_tile, (x, y)) == math.dist(tile_index.get_nearest_buildable_tile(x, y), (x, y))
@@ -0,0 +1,130 @@
+import numpy
+import pytest
+
+from citygame.src.constants import world_constants
+from citygame.src.constants.noise_mode_enum import NoiseMode
+from citygame.src.util import world_cache
+from citygame.src.util.landmasses import label_landmasses
+from citygame.src.util.locations import calculate_border_arrays, calculate_locations, calculate_regions
+from citygame.src.util.maps import generate_map
+from citygame.src.util.world_cache import CachedWorld, get_world_cache_key, load_world, prepare_world, save_world
+
+
+@pytest.fixture(autouse=True)
+def world_cache_directory(monkeypatch, tmp_path):
+    monkeypatch.setattr(world_cache, "get_world_cache_directory", lambda: str(tmp_path))
+    return tmp_path
+
+
+class TestWorldCache:
+    def test_save_and_load_world(self):
+        map_size = 100
+        map_tiles = generate_map(map_size, map_size, seed=42)
+        location_points = calculate_locations(map_tiles, seed=42)
+        region_matrix = calculate_regions(location_points, map_tiles)
+        border_points, border_offsets = calculate_border_arrays(location_points, region_matrix)
+
+        save_world(
+            42,
+            map_size,
+            map_size,
+            CachedWorld.from_generated_world(map_tiles, location_points, region_matrix, border_points, border_offsets),
+        )
+        cached_world = load_world(42, map_size, map_size)
+
+        assert isinstance(cached_world.map_tiles, numpy.memmap)
+        assert numpy.array_equal(cached_world.map_tiles, map_tiles)
+        assert numpy.array_equal(cached_world.region_matrix, region_matrix)
+        assert cached_world.get_location_points() == location_points
+        assert numpy.array_equal(cached_world.border_points, border_points)
+        for i, (start, end) in enumerate(zip(border_offsets[:-1], border_offsets[1:])):
+            assert numpy.array_equal(cached_world.get_border_points(i), border_points[start:end])
+
+    def test_save_and_load_world_summary(self):
+        map_size = 100
+        map_tiles = generate_map(map_size, map_size, seed=42)
+        landmasses = label_landmasses(map_tiles)
+        location_points = calculate_locations(map_tiles, seed=42, landmasses=landmasses)
+        region_matrix = calculate_regions(location_points, map_tiles, landmasses=landmasses)
+        border_points, border_offsets = calculate_border_arrays(location_points, region_matrix, landmasses=landmasses)
+        generated_world = CachedWorld.from_generated_world(
+            map_tiles, location_points, region_matrix, border_points, border_offsets, landmasses=landmasses
+        )
+
+        save_world(42, map_size, map_size, generated_world)
+        cached_world = load_world(42, map_size, map_size)
+
+        assert isinstance(cached_world.landmasses.labels, numpy.memmap)
+        assert numpy.array_equal(cached_world.landmasses.labels, landmasses.labels)
+        assert cached_world.landmasses.bounding_boxes == landmasses.bounding_boxes
+        assert numpy.array_equal(cached_world.region_adjacency.pairs, generated_world.region_adjacency.pairs)
+        assert numpy.array_equal(
+            cached_world.region_adjacency.border_lengths, generated_world.region_adjacency.border_lengths
+        )
+        assert numpy.array_equal(cached_world.region_statistics.areas, generated_world.region_statistics.areas)
+        assert numpy.array_equal(
+            cached_world.region_statistics.terrain_counts, generated_world.region_statistics.terrain_counts
+        )
+        assert numpy.array_equal(
+            cached_world.region_statistics.centroids, generated_world.region_statistics.centroids, equal_nan=True
+        )
+        assert numpy.array_equal(
+            cached_world.region_statistics.bounding_boxes, generated_world.region_statistics.bounding_boxes
+        )
+
+    def test_load_world_that_is_not_cached(self):
+        assert load_world(42, 100, 100) is None
+
+    def test_save_world_twice(self):
+        map_tiles = numpy.zeros((10, 10), dtype=int)
+        cached_world = CachedWorld.from_generated_world(
+            map_tiles, [(5, 5)], map_tiles, numpy.zeros((0, 2), dtype=numpy.int32), numpy.zeros(2, dtype=int)
+        )
+
+        first_directory = save_world(1, 10, 10, cached_world)
+        second_directory = save_world(1, 10, 10, cached_world)
+
+        assert first_directory == second_directory
+        assert load_world(1, 10, 10).get_border_points(0).shape == (0, 2)
+
+    def test_world_cache_key(self):
+        key = get_world_cache_key(42, 100, 100)
+
+        assert key == get_world_cache_key(42, 100, 100)
+        assert key != get_world_cache_key(43, 100, 100)
+        assert key != get_world_cache_key(42, 200, 100)
+        assert key != get_world_cache_key(42, 100, 100, NoiseMode.MULTI_RESOLUTION)
+
+    def test_world_cache_key_depends_on_world_constants(self, monkeypatch):
+        key = get_world_cache_key(42, 100, 100)
+
+        monkeypatch.setattr(world_cache.world_constants, "DISTANCE_BETWEEN_LOCATIONS", 60)
+
+        assert key != get_world_cache_key(42, 100, 100)
+
+    def test_prepare_world(self):
+        map_size = 100
+        map_tiles = generate_map(
+            map_size,
+            map_size,
+            seed=42,
+            erosion=world_constants.ERODE_TERRAIN,
+            rivers=world_constants.ADD_RIVERS,
+        )
+        landmasses = label_landmasses(map_tiles)
+        location_points = calculate_locations(map_tiles, seed=42, landmasses=landmasses)
+        region_matrix = calculate_regions(location_points, map_tiles, landmasses=landmasses)
+
+        prepare_world(42, map_size, map_size)
+        cached_world = load_world(42, map_size, map_size)
+
+        assert isinstance(cached_world.region_matrix, numpy.memmap)
+        assert numpy.array_equal(cached_world.map_tiles, map_tiles)
+        assert cached_world.get_location_points() == location_points
+        assert numpy.array_equal(cached_world.region_matrix, region_matrix)
+        assert len(cached_world.border_offsets) == len(location_points) + 1
+        assert numpy.array_equal(cached_world.landmasses.labels, landmasses.labels)
+        assert numpy.array_equal(
+            cached_world.region_statistics.areas,
+            numpy.bincount(region_matrix[region_matrix != -1], minlength=len(location_points)),
+        )
@@ -0,0 +1,53 @@
+import numpy
+
+from citygame.src.util.locations import calculate_border_arrays, calculate_locations, calculate_regions
+from citygame.src.util.maps import MapWindow, generate_map_window
+from citygame.src.util.world_chunks import WorldChunks
+
+
+class TestWorldChunks:
+    def test_chunks_match_whole_world(self):
+        size = 150
+        world_chunks = WorldChunks(size, seed=3, chunk_size=64)
+        location_points = world_chunks.calculate_locations()
+
+        map_tiles = generate_map_window(size, size, MapWindow.full(size, size), world_chunks.statistics)
+        assert location_points == calculate_locations(map_tiles, seed=3)
+
+        chunk_tiles = numpy.zeros_like(map_tiles)
+        chunk_regions = numpy.zeros(map_tiles.shape, dtype=int)
+        for chunk in world_chunks.get_chunks_in_window(MapWindow.full(size, size)):
+            chunk_tiles[chunk.window.slices] = chunk.map_tiles
+            chunk_regions[chunk.window.slices] = chunk.region_matrix
+
+        region_matrix = calculate_regions(location_points, map_tiles)
+        assert numpy.array_equal(chunk_tiles, map_tiles)
+        assert numpy.array_equal(chunk_regions, region_matrix)
+        window = MapWindow(30, 100, 50, 140)
+        assert numpy.array_equal(world_chunks.get_region_matrix(window), region_matrix[window.slices])
+
+        border_points, border_offsets = calculate_border_arrays(location_points, region_matrix)
+        for i, (start, end) in enumerate(zip(border_offsets[:-1], border_offsets[1:])):
+            expected_points = set(map(tuple, border_points[start:end].tolist()))
+            chunk_points = world_chunks.get_border_points(i, MapWindow.full(size, size))
+            assert set(map(tuple, chunk_points.tolist())) == expected_points
+
+    def test_get_region(self):
+        world_chunks = WorldChunks(150, seed=3, chunk_size=64)
+        location_points = world_chunks.calculate_locations()
+
+        for i, (x, y) in enumerate(location_points):
+            assert world_chunks.get_region(x, y) == i
+
+    def test_least_recently_used_chunks_are_evicted(self):
+        world_chunks = WorldChunks(150, seed=3, chunk_size=64, maximum_chunks=2)
+
+        first_chunk = world_chunks.get_chunk(0, 0)
+        world_chunks.get_chunk(0, 1)
+        assert world_chunks.get_chunk(0, 0) is first_chunk
+
+        world_chunks.get_chunk(1, 0)
+        world_chunks.get_chunk(1, 1)
+        regenerated_chunk = world_chunks.get_chunk(0, 0)
+        assert regenerated_chunk is not first_chunk
+        assert numpy.array_equal(regenerated_chunk.map_tiles, first_chunk.map_tiles)